@@ -0,0 +1,4 @@
+"""Benchmarks for the integration's hot paths.
+
+Run them with `scripts/benchmark`; see `python3 -m benchmarks --help`.
+"""
@@ -0,0 +1,123 @@
+"""Run the benchmarks and save or compare against a baseline."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.cases import BENCHMARKS, BUDGETS
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+MANIFEST_PATH = (
+    Path(__file__).parent.parent / "custom_components/ecodan_heat_pump/manifest.json"
+)
+
+
+def summarise(samples: list[float]) -> dict:
+    """Summarise a list of samples in seconds."""
+    ordered = sorted(samples)
+    median = statistics.median(ordered)
+    return {
+        "iterations": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "median": median,
+        "p95": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+        "min": ordered[0],
+        "ops_per_second": 1 / median if median > 0 else None,
+    }
+
+
+async def run(names: list[str], iterations: int) -> dict:
+    """Run the named benchmarks and return their summaries."""
+    results = {}
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)  # noqa: T201
+        results[name] = summarise(await BENCHMARKS[name](iterations))
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a description of each benchmark whose median regressed."""
+    regressions = []
+    for name, result in results.items():
+        if (previous := baseline["results"].get(name)) is None:
+            continue
+        ratio = result["median"] / previous["median"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: median {result['median'] * 1e6:.1f}µs is {ratio:.2f}x "
+                f"the baseline of {previous['median'] * 1e6:.1f}µs"
+            )
+    return regressions
+
+
+def over_budget(results: dict, baseline: dict) -> list[str]:
+    """Return a description of each benchmark whose median exceeds its budget."""
+    exceeded = []
+    for name, result in results.items():
+        if name not in BUDGETS or (previous := baseline["results"].get(name)) is None:
+            continue
+        ratio = result["median"] / previous["median"]
+        if ratio > BUDGETS[name]:
+            exceeded.append(
+                f"{name}: median {result['median'] * 1e3:.1f}ms is {ratio:.2f}x the "
+                f"baseline of {previous['median'] * 1e3:.1f}ms, more than the "
+                f"budget of {BUDGETS[name]:.2f}x"
+            )
+    return exceeded
+
+
+def main() -> int:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "names", nargs="*", choices=[[], *BENCHMARKS], help="benchmarks to run"
+    )
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument(
+        "--save", action="store_true", help=f"overwrite the baseline ({BASELINE_PATH})"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help="fail if slower than the baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative slowdown of the median when comparing",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.names or list(BENCHMARKS), args.iterations))
+    report = {
+        "version": json.loads(MANIFEST_PATH.read_text())["version"],
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))  # noqa: T201
+
+    # A new baseline, e.g. for another host, resets the budgets
+    if args.save:
+        BASELINE_PATH.write_text(json.dumps(report, indent=2) + "\n")
+        return 0
+    baseline = json.loads(BASELINE_PATH.read_text())
+    if exceeded := over_budget(results, baseline):
+        print("\n".join(exceeded), file=sys.stderr)  # noqa: T201
+        return 1
+    if args.compare:
+        if regressions := compare(results, baseline, args.tolerance):
+            print("\n".join(regressions), file=sys.stderr)  # noqa: T201
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""The benchmark cases.
+
+Each case is an async function that returns a list of samples, each being the
+duration of a single operation in seconds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import web
+
+from simulator import Simulator, create_app
+from simulator.server import BASE_PATH
+
+# Commands are sent to a local simulator, so redirect the API before the
+# integration is first imported
+SIMULATOR_PORT = 8098
+os.environ["ECODAN_HEAT_PUMP_BASE_URL"] = (
+    f"http://127.0.0.1:{SIMULATOR_PORT}{BASE_PATH}"
+)
+
+BENCHMARKS: dict[str, Callable[[int], Awaitable[list[float]]]] = {}
+
+# The largest ratio of the median to the baseline's median of the benchmarks
+# with a hard budget, which is checked on every run, not only with --compare
+BUDGETS: dict[str, float] = {}
+
+# Home Assistant has already imported these modules when it loads the
+# integration, so they are imported before the integration is timed
+PRELOADED_MODULES = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.entity",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.climate",
+    "homeassistant.components.sensor",
+)
+INTEGRATION_MODULES = (
+    "custom_components.ecodan_heat_pump",
+    "custom_components.ecodan_heat_pump.binary_sensor",
+    "custom_components.ecodan_heat_pump.climate",
+    "custom_components.ecodan_heat_pump.config_flow",
+    "custom_components.ecodan_heat_pump.sensor",
+)
+IMPORT_MARKER = "-- integration --"
+
+
+def benchmark(name: str, budget: float | None = None):
+    """Register a benchmark case under the given name, with an optional budget."""
+
+    def register(function):
+        BENCHMARKS[name] = function
+        if budget is not None:
+            BUDGETS[name] = budget
+        return function
+
+    return register
+
+
+def _payload(device_count: int) -> bytes:
+    """Build an encoded ListDevices response with the given number of devices."""
+    return json.dumps(Simulator(device_count=device_count).buildings()).encode()
+
+
+def _api_client(session: aiohttp.ClientSession | None = None):
+    from custom_components.ecodan_heat_pump.api import ApiClient
+    from custom_components.ecodan_heat_pump.models import Credentials, CredentialsId
+
+    return ApiClient(
+        credentials=[
+            Credentials(credentials_id, "benchmark", "benchmark")
+            for credentials_id in CredentialsId
+        ],
+        session=session,
+    )
+
+
+async def _map_payload(device_count: int, iterations: int) -> list[float]:
+    client = _api_client()
+    payload = _payload(device_count)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        client._map_response_to_heat_pump_state(json.loads(payload))
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@benchmark("map_response_1_device")
+async def map_response_1_device(iterations: int) -> list[float]:
+    """Decode and map a ListDevices payload with a single device."""
+    return await _map_payload(1, iterations)
+
+
+@benchmark("map_response_50_devices")
+async def map_response_50_devices(iterations: int) -> list[float]:
+    """Decode and map a ListDevices payload with 50 devices."""
+    return await _map_payload(50, iterations)
+
+
+@benchmark("map_response_500_devices")
+async def map_response_500_devices(iterations: int) -> list[float]:
+    """Decode and map a ListDevices payload with 500 devices."""
+    return await _map_payload(500, max(iterations // 10, 1))
+
+
+@benchmark("parse_timestamps")
+async def parse_timestamps(iterations: int) -> list[float]:
+    """Parse the two timestamps in each device."""
+    device = json.loads(_payload(1))[0]["Structure"]["Devices"][0]["Device"]
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        datetime.fromisoformat(device["LastTimeStamp"])
+        datetime.fromisoformat(device["DailyEnergyConsumedDate"]).date()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@benchmark("coordinator_update_to_entity_writes")
+async def coordinator_update_to_entity_writes(iterations: int) -> list[float]:
+    """Push a new state through the coordinator to every enabled entity's state write."""
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.ecodan_heat_pump import (
+        binary_sensor,
+        climate,
+        sensor,
+    )
+    from custom_components.ecodan_heat_pump.analytics import CopModel
+    from custom_components.ecodan_heat_pump.anomaly import AnomalyDetector
+    from custom_components.ecodan_heat_pump.backfill import EnergyBackfill
+    from custom_components.ecodan_heat_pump.const import DOMAIN
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
+    from custom_components.ecodan_heat_pump.journal import CommandJournal
+
+    # The entities are not added through an entity platform, which is reported
+    logging.getLogger("homeassistant.helpers.entity").setLevel(logging.ERROR)
+
+    hass = HomeAssistant(tempfile.gettempdir())
+    entry = SimpleNamespace(entry_id="benchmark")
+    client = _api_client()
+    coordinator = Coordinator(
+        hass=hass,
+        client=client,
+        journal=CommandJournal(hass, entry.entry_id),
+        backfill=EnergyBackfill(hass, client, entry.entry_id),
+        cop_model=CopModel(hass, entry.entry_id),
+        anomalies=AnomalyDetector(hass, entry.entry_id),
+    )
+    coordinator.config_entry = entry
+    coordinator.update_interval = None
+    hass.data[DOMAIN] = {entry.entry_id: coordinator}
+
+    states = [
+        client._map_response_to_heat_pump_state(json.loads(_payload(1)))
+        for _ in range(2)
+    ]
+    coordinator.data = states[0]
+
+    entities = []
+    for platform in (sensor, binary_sensor, climate):
+        await platform.async_setup_entry(hass, entry, entities.extend)
+    for entity in entities:
+        # Like the entity registry, leave out the entities the profile disables
+        if not entity.entity_registry_enabled_default:
+            continue
+        entity.hass = hass
+        if entity.entity_id is None:
+            entity.entity_id = f"climate.{DOMAIN}"
+        coordinator.async_add_listener(entity._handle_coordinator_update)
+
+    samples = []
+    for iteration in range(iterations):
+        start = time.perf_counter()
+        coordinator.async_set_updated_data(states[iteration % 2])
+        samples.append(time.perf_counter() - start)
+
+    await hass.async_stop(force=True)
+    return samples
+
+
+@benchmark("command_round_trip")
+async def command_round_trip(iterations: int) -> list[float]:
+    """Set the flow temperature against the local simulator."""
+    from custom_components.ecodan_heat_pump.session import create_session
+
+    runner = web.AppRunner(create_app(Simulator(device_count=1)))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", SIMULATOR_PORT).start()
+    try:
+        async with create_session(credentials_count=3) as session:
+            client = _api_client(session)
+            await client.async_get_data()
+            samples = []
+            for iteration in range(iterations):
+                start = time.perf_counter()
+                await client.async_set_flow_temperature(1, 30 + iteration % 10, 48)
+                samples.append(time.perf_counter() - start)
+    finally:
+        await runner.cleanup()
+    return samples
+
+
+@benchmark("import_integration", budget=1.2)
+async def import_integration(iterations: int) -> list[float]:
+    """Import the integration and its platforms in a fresh interpreter.
+
+    Uses `-X importtime` and adds up the time of every module imported after
+    the Home Assistant modules that are already loaded at that point.
+    """
+    samples = []
+    for _ in range(max(iterations // 20, 1)):
+        samples.append(await _import_time())
+    return samples
+
+
+async def _import_time() -> float:
+    code = "; ".join(
+        [
+            *(f"import {module}" for module in PRELOADED_MODULES),
+            f"import sys; print({IMPORT_MARKER!r}, file=sys.stderr, flush=True)",
+            *(f"import {module}" for module in INTEGRATION_MODULES),
+        ]
+    )
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-X",
+        "importtime",
+        "-c",
+        code,
+        cwd=Path(__file__).parent.parent,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing the integration failed:\n{stderr.decode()}")
+
+    # Each line is "import time: self [us] | cumulative | module"
+    self_time = 0
+    for line in stderr.decode().split(IMPORT_MARKER, 1)[1].splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_time += int(line.split(":", 1)[1].split("|")[0])
+    return self_time / 1e6
@@ -6,14 +6,27 @@ https://github.com/michaelmarconi/ecodan_heat_pump
 
 from __future__ import annotations
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from collections.abc import Mapping
+from datetime import timedelta
+from typing import Any
 
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE, Platform
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.util import dt as dt_util
+
+from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+from custom_components.ecodan_heat_pump.analytics import CopModel
+from custom_components.ecodan_heat_pump.anomaly import AnomalyDetector
 from custom_components.ecodan_heat_pump.api import ApiClient
+from custom_components.ecodan_heat_pump.backfill import EnergyBackfill
 from custom_components.ecodan_heat_pump.const import (
+    BACKFILL_STARTUP_DAYS,
+    CONF_ENTITY_PROFILE,
+    DATA_ACCOUNTS,
     DOMAIN,
+    LOGGER,
     PASSWORD_1,
     PASSWORD_2,
     PASSWORD_3,
@@ -24,8 +37,17 @@ from custom_components.ecodan_heat_pump.const import (
 from custom_components.ecodan_heat_pump.coordinator import (
     Coordinator,
 )
+from custom_components.ecodan_heat_pump.errors import ApiClientAuthenticationException
+from custom_components.ecodan_heat_pump.journal import CommandJournal
 from custom_components.ecodan_heat_pump.models import Credentials, CredentialsId
-
+from custom_components.ecodan_heat_pump.profiles import (
+    EntityProfile,
+    async_apply_entity_profile,
+)
+from custom_components.ecodan_heat_pump.services import (
+    async_setup_services,
+    async_unload_services,
+)
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
@@ -41,31 +63,59 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Set default data for the coordinator
     hass.data.setdefault(DOMAIN, {})
+    accounts: AccountRegistry = hass.data.setdefault(DATA_ACCOUNTS, AccountRegistry())
 
-    # Assemble credentials from pre-existing config
-    credentials_1 = Credentials(
-        CredentialsId.CREDENTIALS_1, entry.data[USERNAME_1], entry.data[PASSWORD_1]
-    )
-    credentials_2 = Credentials(
-        CredentialsId.CREDENTIALS_2, entry.data[USERNAME_2], entry.data[PASSWORD_2]
-    )
-    credentials_3 = Credentials(
-        CredentialsId.CREDENTIALS_3, entry.data[USERNAME_3], entry.data[PASSWORD_3]
-    )
-
-    # Set up data coordinator
+    # Set up data coordinator, sharing the client with entries of the same account
+    client = accounts.client(entry.entry_id, build_credentials(entry.data))
+    client.time_zone = dt_util.get_time_zone(hass.config.time_zone)
     hass.data[DOMAIN][entry.entry_id] = coordinator = Coordinator(
         hass=hass,
-        client=ApiClient(
-            credentials=[credentials_1, credentials_2, credentials_3],
-            session=async_get_clientsession(hass),
-        ),
+        client=client,
+        journal=CommandJournal(hass, entry.entry_id),
+        backfill=EnergyBackfill(hass, client, entry.entry_id),
+        cop_model=CopModel(hass, entry.entry_id),
+        anomalies=AnomalyDetector(hass, entry.entry_id),
+        accounts=accounts,
     )
+    accounts.add_coordinator(entry.entry_id, coordinator)
+
+    # Load any commands queued before a restart, to be replayed on the first refresh
+    await coordinator.journal.async_load()
+    await coordinator.cop_model.async_load()
+    await coordinator.anomalies.async_load()
+    await coordinator.async_apply_options(entry.options)
+
+    # Log in with every set of credentials at once, rather than one per update
+    await _async_login_all(client)
 
     # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
     await coordinator.async_config_entry_first_refresh()
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
+
+    # Close any gaps in the energy statistics from while Home Assistant was down
+    today = dt_util.now().date()
+    coordinator.async_start_backfill(
+        today - timedelta(days=BACKFILL_STARTUP_DAYS), today - timedelta(days=1)
+    )
+
+    # Seed a new COP model from the archived history, if there is any
+    if coordinator.archive is not None and coordinator.cop_model.samples == 0:
+        coordinator.async_start_cop_history_fit()
+
+    # Plan the hot water boosts for the cheapest windows of the price forecast
+    if coordinator.planner is not None:
+        coordinator.planner.async_start()
+
+    # Close the connection to MELCloud when Home Assistant stops
+    async def _async_close(_: Event) -> None:
+        await coordinator.async_shutdown()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+    )
+
+    async_setup_services(hass)
 
     return True
 
@@ -73,11 +123,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle removal of an entry."""
     if unloaded := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        # The coordinator shuts itself down once the entry has been unloaded
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_unload_services(hass)
     return unloaded
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed credentials and options in place, without reloading the entry.
+
+    The coordinator, the access tokens of unchanged credentials and the entities
+    are kept, so nothing becomes unavailable while the change is applied. Only
+    moving the entry to another MELCloud account reloads it.
+    """
+    coordinator: Coordinator = hass.data[DOMAIN][entry.entry_id]
+    accounts: AccountRegistry = hass.data[DATA_ACCOUNTS]
+    if not accounts.update_credentials(entry.entry_id, build_credentials(entry.data)):
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
+    try:
+        await _async_login_all(coordinator.client)
+    except ConfigEntryAuthFailed:
+        entry.async_start_reauth(hass)
+
+    # Enable and disable the registered entities when the entity profile changes
+    entity_profile = EntityProfile(
+        entry.options.get(CONF_ENTITY_PROFILE, EntityProfile.STANDARD.value)
+    )
+    if entity_profile != coordinator.entity_profile:
+        async_apply_entity_profile(hass, entry, entity_profile)
+    await coordinator.async_apply_options(entry.options)
+    coordinator.async_update_listeners()
+
+
+def build_credentials(data: Mapping[str, Any]) -> list[Credentials]:
+    """Assemble credentials from the config entry data or the config flow input."""
+    return [
+        Credentials(CredentialsId.CREDENTIALS_1, data[USERNAME_1], data[PASSWORD_1]),
+        Credentials(CredentialsId.CREDENTIALS_2, data[USERNAME_2], data[PASSWORD_2]),
+        Credentials(CredentialsId.CREDENTIALS_3, data[USERNAME_3], data[PASSWORD_3]),
+    ]
+
+
+async def _async_login_all(client: ApiClient) -> None:
+    """Log in with every set of credentials, failing if any of them is rejected.
+
+    Other failures are left to the lazy log in before each request to retry.
+    """
+    errors = await client.async_login_all()
+    for credentials_id, exception in errors.items():
+        if isinstance(exception, ApiClientAuthenticationException):
+            raise ConfigEntryAuthFailed(exception) from exception
+        LOGGER.warning(
+            f"Failed to log in with credentials '{credentials_id.value}', "
+            f"will retry: {exception}"
+        )
@@ -0,0 +1,156 @@
+"""Share one MELCloud client, and what it fetches, between config entries."""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+
+from custom_components.ecodan_heat_pump.api import ApiClient
+from custom_components.ecodan_heat_pump.const import LOGGER
+from custom_components.ecodan_heat_pump.models import Credentials, HeatPumpState
+from custom_components.ecodan_heat_pump.session import create_session
+
+if TYPE_CHECKING:
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
+
+
+class Account:
+    """A MELCloud client and the coordinators of the config entries using it."""
+
+    def __init__(self, client: ApiClient) -> None:  # noqa: D107
+        self.client = client
+        self.entry_ids: set[str] = set()
+        self.coordinators: dict[str, Coordinator] = {}
+        self.bandwidth_budgets: dict[str, int | None] = {}
+
+    @property
+    def usernames(self) -> set[str]:
+        """Return the usernames of the client's credentials."""
+        return {credentials.username for credentials in self.client.credentials}
+
+    def apply_bandwidth_budget(self) -> None:
+        """Keep the client within the smallest daily bandwidth budget of its config entries."""
+        budgets = [
+            budget for budget in self.bandwidth_budgets.values() if budget is not None
+        ]
+        self.client.bandwidth.daily_budget = min(budgets, default=None)
+
+
+class AccountRegistry:
+    """The accounts of all config entries, keyed by username.
+
+    Config entries with a username in common share one client, i.e. its access
+    tokens, request scheduler, circuit breaker and bandwidth budget, which is
+    the smallest of the budgets set in their options. Each
+    snapshot fetched by one of their coordinators is handed to the others,
+    which postpones their own next poll.
+    """
+
+    def __init__(self) -> None:  # noqa: D107
+        self._accounts: dict[str, Account] = {}
+        self._entries: dict[str, Account] = {}
+
+    def client(self, entry_id: str, credentials: list[Credentials]) -> ApiClient:
+        """Return the client of the account a config entry belongs to, creating it if necessary."""
+        account = next(
+            (
+                self._accounts[known.username]
+                for known in credentials
+                if known.username in self._accounts
+            ),
+            None,
+        )
+        if account is None:
+            account = Account(
+                ApiClient(
+                    credentials=credentials,
+                    session=create_session(credentials_count=len(credentials)),
+                )
+            )
+            for known in credentials:
+                self._accounts[known.username] = account
+        else:
+            LOGGER.debug(f"Sharing the MELCloud client of {account.usernames}")
+        account.entry_ids.add(entry_id)
+        self._entries[entry_id] = account
+        return account.client
+
+    def add_coordinator(self, entry_id: str, coordinator: Coordinator) -> None:
+        """Add the coordinator of a config entry, to share the snapshots with."""
+        self._entries[entry_id].coordinators[entry_id] = coordinator
+
+    def set_bandwidth_budget(self, entry_id: str, daily_budget: int | None) -> None:
+        """Set the daily bandwidth budget of a config entry, in bytes."""
+        account = self._entries[entry_id]
+        account.bandwidth_budgets[entry_id] = daily_budget
+        account.apply_bandwidth_budget()
+
+    def update_credentials(self, entry_id: str, credentials: list[Credentials]) -> bool:
+        """Update the credentials of a config entry in place, if possible.
+
+        Changing the usernames of an account shared with other config entries,
+        or to those of another account, needs the entry to be set up again.
+        """
+        account = self._entries[entry_id]
+        usernames = {known.username for known in credentials}
+        if usernames != account.usernames:
+            if len(account.entry_ids) > 1 or any(
+                self._accounts.get(username, account) is not account
+                for username in usernames
+            ):
+                return False
+            for username in account.usernames:
+                del self._accounts[username]
+            for username in usernames:
+                self._accounts[username] = account
+        account.client.update_credentials(credentials)
+        return True
+
+    @callback
+    def share(self, coordinator: Coordinator, state: HeatPumpState, full: bool) -> None:
+        """Hand a snapshot fetched by a coordinator to the others of its account."""
+        account = self._entries.get(coordinator.config_entry.entry_id)
+        if account is None:
+            return
+        for other in account.coordinators.values():
+            if other is not coordinator and other.data is not None:
+                # Each coordinator overlays its own pending commands on the state
+                other.async_set_shared_data(dataclasses.replace(state), full)
+
+    def compensates(self, coordinator: Coordinator) -> bool:
+        """Return whether a coordinator runs the weather compensation of its account.
+
+        That is the first of the account's coordinators to have it enabled, so
+        that each snapshot leads to at most one flow temperature write.
+        """
+        account = self._entries.get(coordinator.config_entry.entry_id)
+        if account is None:
+            return True
+        return (
+            next(
+                (
+                    other
+                    for other in account.coordinators.values()
+                    if other.compensation is not None
+                ),
+                None,
+            )
+            is coordinator
+        )
+
+    async def async_release(self, entry_id: str) -> None:
+        """Remove a config entry, closing its client if no other entry uses it."""
+        if (account := self._entries.pop(entry_id, None)) is None:
+            return
+        account.entry_ids.discard(entry_id)
+        account.coordinators.pop(entry_id, None)
+        account.bandwidth_budgets.pop(entry_id, None)
+        if account.entry_ids:
+            account.apply_bandwidth_budget()
+            return
+        for username in account.usernames:
+            if self._accounts.get(username) is account:
+                del self._accounts[username]
+        await account.client.async_close()
@@ -0,0 +1,101 @@
+"""Track the time from a command to the device confirming its new state."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from custom_components.ecodan_heat_pump.models import HeatPumpState
+
+# The number of recent actuation latencies used for the percentiles
+ACTUATION_HISTORY = 50
+
+# The minimum number of latencies needed before the schedule adapts to them
+ACTUATION_MIN_SAMPLES = 5
+
+
+@dataclass
+class Actuation:
+    """A command that has been sent but not yet confirmed by the device."""
+
+    command: str
+    field: str
+    value: object
+    last_communication: datetime
+    sent_at: float = field(default_factory=time.monotonic)
+    confirmed: asyncio.Event = field(default_factory=asyncio.Event)
+    latency: float | None = None
+
+
+class ActuationTracker:
+    """Match commands against later device snapshots and keep their latencies."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self.pending: list[Actuation] = []
+        self.latencies: deque[tuple[str, float]] = deque(maxlen=ACTUATION_HISTORY)
+
+    def start(
+        self, command: str, field: str, value: object, state: HeatPumpState
+    ) -> Actuation:
+        """Start tracking a command that has just been posted."""
+        # Only the latest command for each field can still be confirmed
+        self.pending = [
+            actuation for actuation in self.pending if actuation.field != field
+        ]
+        actuation = Actuation(
+            command=command,
+            field=field,
+            value=value,
+            last_communication=state.last_communication,
+        )
+        self.pending.append(actuation)
+        return actuation
+
+    def stop(self, actuation: Actuation) -> None:
+        """Stop tracking a command, e.g. because it was never confirmed."""
+        if actuation in self.pending:
+            self.pending.remove(actuation)
+
+    def observe(self, state: HeatPumpState) -> HeatPumpState:
+        """Confirm pending commands from a new snapshot.
+
+        A command is confirmed by the first snapshot that the device reported
+        after the command was sent (i.e. with a newer `LastTimeStamp`) that shows
+        the new value. Until then, the commanded value is kept in the state so
+        that a stale snapshot does not revert it.
+        """
+        for actuation in list(self.pending):
+            is_newer = state.last_communication > actuation.last_communication
+            if is_newer and getattr(state, actuation.field) == actuation.value:
+                actuation.latency = time.monotonic() - actuation.sent_at
+                self.latencies.append((actuation.command, actuation.latency))
+                self.pending.remove(actuation)
+                actuation.confirmed.set()
+            else:
+                setattr(state, actuation.field, actuation.value)
+        return state
+
+    def percentile(self, percentile: float, command: str | None = None) -> float | None:
+        """Return a percentile of the recent latencies, optionally for one command."""
+        latencies = sorted(
+            latency
+            for latency_command, latency in self.latencies
+            if command is None or latency_command == command
+        )
+        if not latencies:
+            return None
+        index = min(round(percentile / 100 * (len(latencies) - 1)), len(latencies) - 1)
+        return latencies[index]
+
+    def first_delay(self, default: float) -> float:
+        """Return how long to wait before the first confirmation poll.
+
+        Half the commands are confirmed within the median latency, so polling
+        any earlier is likely to be wasted.
+        """
+        if len(self.latencies) < ACTUATION_MIN_SAMPLES:
+            return default
+        return self.percentile(50)
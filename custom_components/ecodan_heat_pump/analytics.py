@@ -0,0 +1,204 @@
+"""A model of the COP to expect at a given outdoor and flow temperature."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from custom_components.ecodan_heat_pump.const import (
+    COP_MIN_SAMPLES,
+    COP_RIDGE,
+    DOMAIN,
+)
+from custom_components.ecodan_heat_pump.models import HeatingStatus, HeatPumpState
+
+if TYPE_CHECKING:
+    import numpy as np
+
+STORAGE_VERSION = 1
+
+# Delay saving so that the model is written at most once a minute
+SAVE_DELAY = 60
+
+# The archive columns needed to fit the model to history
+HISTORY_COLUMNS = (
+    "outdoor_temperature",
+    "flow_temperature",
+    "current_coefficient_of_performance",
+    "rate_of_current_energy_consumption",
+    "rate_of_current_energy_production",
+    "has_power",
+    "is_defrost_mode",
+    "is_forced_to_heat_water",
+    "heating_status",
+)
+
+
+def features(outdoor: np.ndarray, flow: np.ndarray) -> np.ndarray:
+    """Return the quadratic features of the outdoor and flow temperatures."""
+    import numpy as np
+
+    return np.column_stack(
+        (np.ones_like(outdoor), outdoor, flow, outdoor**2, flow**2, outdoor * flow)
+    )
+
+
+class CopModel:
+    """A least squares fit of the COP on the outdoor and flow temperature.
+
+    Only the sufficient statistics (XᵀX, Xᵀy and yᵀy) are kept, so a refit
+    costs the same however many samples have been seen and new samples are
+    added incrementally, in batches of NumPy arrays. NumPy is only imported in
+    the executor, when the model is loaded or first fitted.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:  # noqa: D107
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.cop_model")
+        self.samples = 0
+        self.coefficients: tuple[float, ...] | None = None
+        self.r_squared: float | None = None
+        self._xtx: np.ndarray | None = None
+        self._xty: np.ndarray | None = None
+        self._yty = 0.0
+        self._pending: list[tuple[float, float, float]] = []
+        self._lock = asyncio.Lock()
+
+    async def async_load(self) -> None:
+        """Load the model from storage."""
+        if (data := await self._store.async_load()) is not None:
+            await self._hass.async_add_executor_job(self._restore, data)
+
+    def add(self, state: HeatPumpState) -> None:
+        """Queue a snapshot for the next refit, if it is a steady heating sample."""
+        if (
+            state.has_power
+            and not state.is_defrost_mode
+            and not state.is_forced_to_heat_water
+            and state.heating_status == HeatingStatus.HEATING
+            and state.rate_of_current_energy_consumption > 0
+            and state.current_coefficient_of_performance > 0
+        ):
+            self._pending.append(
+                (
+                    state.outdoor_temperature,
+                    state.flow_temperature,
+                    state.current_coefficient_of_performance,
+                )
+            )
+
+    async def async_refit(self) -> None:
+        """Add the queued samples to the model in the executor."""
+        if not self._pending:
+            return
+        samples, self._pending = self._pending, []
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._fit_samples, samples)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_fit_history(self, blocks: Iterable[dict[str, list]]) -> None:
+        """Add the samples of archived blocks to the model in the executor."""
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._fit_blocks, blocks)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def fit(self, outdoor: np.ndarray, flow: np.ndarray, cop: np.ndarray) -> None:
+        """Add samples to the sufficient statistics and solve for the coefficients."""
+        import numpy as np
+
+        if self._xtx is None:
+            self._xtx, self._xty = np.zeros((6, 6)), np.zeros(6)
+        x = features(outdoor, flow)
+        self._xtx = self._xtx + x.T @ x
+        self._xty = self._xty + x.T @ cop
+        self._yty += float(cop @ cop)
+        self.samples += len(cop)
+        self._solve()
+
+    def expected(self, outdoor: float, flow: float) -> float | None:
+        """Return the expected COP, once enough samples have been seen."""
+        if self.coefficients is None:
+            return None
+        x = (1, outdoor, flow, outdoor**2, flow**2, outdoor * flow)
+        return round(sum(c * v for c, v in zip(self.coefficients, x)), 2)
+
+    def _restore(self, data: dict) -> None:
+        import numpy as np
+
+        self._xtx = np.array(data["xtx"])
+        self._xty = np.array(data["xty"])
+        self._yty = data["yty"]
+        self.samples = data["samples"]
+        self._solve()
+
+    def _fit_samples(self, samples: list[tuple[float, float, float]]) -> None:
+        import numpy as np
+
+        samples = np.array(samples)
+        self.fit(samples[:, 0], samples[:, 1], samples[:, 2])
+
+    def _fit_blocks(self, blocks: Iterable[dict[str, list]]) -> None:
+        import numpy as np
+
+        for block in blocks:
+            columns = {name: np.array(block[name]) for name in HISTORY_COLUMNS}
+            consumption = columns["rate_of_current_energy_consumption"]
+            production = columns["rate_of_current_energy_production"]
+            cop = columns["current_coefficient_of_performance"]
+
+            # The energy values only change on a full refresh, so later snapshots
+            # would pair them with newer temperatures
+            changed = np.ones(len(cop), dtype=bool)
+            changed[1:] = (np.diff(consumption) != 0) | (np.diff(production) != 0)
+
+            steady = (
+                changed
+                & columns["has_power"]
+                & ~columns["is_defrost_mode"]
+                & ~columns["is_forced_to_heat_water"]
+                & (columns["heating_status"] == HeatingStatus.HEATING.value)
+                & (consumption > 0)
+                & (cop > 0)
+            )
+            if steady.any():
+                self.fit(
+                    columns["outdoor_temperature"][steady].astype(float),
+                    columns["flow_temperature"][steady].astype(float),
+                    cop[steady].astype(float),
+                )
+
+    def _solve(self) -> None:
+        import numpy as np
+
+        if self.samples < COP_MIN_SAMPLES:
+            return
+        # A little ridge regularisation, relative to the scale of each feature,
+        # keeps the fit stable while the samples only cover a narrow range
+        ridge = COP_RIDGE * np.diag(np.diag(self._xtx))
+        try:
+            coefficients = np.linalg.solve(self._xtx + ridge, self._xty)
+        except np.linalg.LinAlgError:
+            return
+        mean = self._xty[0] / self.samples
+        total = self._yty - self.samples * mean**2
+        residual = (
+            self._yty
+            - 2 * coefficients @ self._xty
+            + coefficients @ self._xtx @ coefficients
+        )
+        self.coefficients = tuple(float(c) for c in coefficients)
+        self.r_squared = round(float(1 - residual / total), 3) if total > 0 else None
+
+    def _data_to_save(self) -> dict | None:
+        if self._xtx is None:
+            return None
+        return {
+            "xtx": self._xtx.tolist(),
+            "xty": self._xty.tolist(),
+            "yty": self._yty,
+            "samples": self.samples,
+        }
@@ -0,0 +1,223 @@
+"""Detect anomalous telemetry from running statistics of each snapshot."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from custom_components.ecodan_heat_pump.const import (
+    ANOMALY_MIN_SAMPLES,
+    ANOMALY_OUTDOOR_BAND,
+    ANOMALY_SMOOTHING,
+    ANOMALY_STUCK_TIME,
+    ANOMALY_THRESHOLD,
+    DOMAIN,
+)
+from custom_components.ecodan_heat_pump.models import HeatingStatus, HeatPumpState
+
+STORAGE_VERSION = 1
+
+# Delay saving so that the statistics are written at most once every 10 minutes
+SAVE_DELAY = 10 * 60
+
+ANOMALY_FIELDS = (
+    "flow_temperature",
+    "return_temperature",
+    "water_tank_temperature",
+    "current_coefficient_of_performance",
+)
+
+# The COP is only reported on a full refresh, so it never looks stuck
+STUCK_FIELDS = ("flow_temperature", "return_temperature", "water_tank_temperature")
+
+
+@dataclass
+class RunningStatistics:
+    """The running mean and variance of a value (Welford's algorithm)."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a value to the statistics."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        """Return the sample standard deviation."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+@dataclass
+class FieldState:
+    """What is known about one field: its statistics and its latest values."""
+
+    statistics: dict[str, RunningStatistics] = field(default_factory=dict)
+    ewma: float | None = None
+    z_score: float | None = None
+    last_value: float | None = None
+    bucket: str | None = None
+    # What should make the value change, and since when it should have
+    drivers: tuple | None = None
+    expected_since: datetime | None = None
+    is_stuck: bool = False
+
+    @property
+    def is_deviating(self) -> bool:
+        """Return whether the smoothed value is far outside its usual range."""
+        return self.z_score is not None and abs(self.z_score) >= ANOMALY_THRESHOLD
+
+
+class AnomalyDetector:
+    """Flag stuck values and values outside their usual range.
+
+    Each field keeps a mean and variance per operating mode and band of
+    outdoor temperature, so its memory does not grow with the history. A
+    smoothed (EWMA) value is compared with the statistics of its bucket, which
+    catches a collapsing COP or a drifting temperature without flagging every
+    noisy sample.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:  # noqa: D107
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.anomaly")
+        self.fields = {name: FieldState() for name in ANOMALY_FIELDS}
+        self._energy: tuple[float, float] | None = None
+        # Values only reported by a full refresh can look unchanged for as long
+        # as the interval between full refreshes, which the coordinator sets
+        self.stuck_time = ANOMALY_STUCK_TIME
+
+    async def async_load(self) -> None:
+        """Load the statistics from storage."""
+        if (data := await self._store.async_load()) is not None:
+            for name, buckets in data.items():
+                if name in self.fields:
+                    self.fields[name].statistics = {
+                        bucket: RunningStatistics(*values)
+                        for bucket, values in buckets.items()
+                    }
+
+    def observe(self, state: HeatPumpState) -> None:
+        """Add a snapshot to the statistics and check each field against them."""
+        # Defrosting is short and far from the usual operation, so it is skipped
+        if state.is_defrost_mode:
+            return
+        bucket = _bucket(state)
+
+        # A value can only be stuck while it should be changing, i.e. the flow
+        # and return while running and the tank while boosting, and only once
+        # what drives it has changed: holding steady at the target is fine
+        running = (
+            state.heating_status == HeatingStatus.HEATING
+            or state.is_forced_to_heat_water
+        )
+        for name in STUCK_FIELDS:
+            if name == "water_tank_temperature":
+                applies = state.is_forced_to_heat_water
+                drivers = (
+                    state.is_forced_to_heat_water,
+                    state.target_water_tank_temperature,
+                )
+            else:
+                applies = running
+                drivers = (
+                    state.has_power,
+                    state.heating_status,
+                    state.is_forced_to_heat_water,
+                    state.target_flow_temperature,
+                )
+            value = getattr(state, name)
+            self._check_stuck(
+                self.fields[name], value, drivers, applies, state.last_communication
+            )
+            self._observe(name, value, bucket)
+
+        # The COP is only meaningful while running, and only new on a full refresh
+        energy = (
+            state.rate_of_current_energy_consumption,
+            state.rate_of_current_energy_production,
+        )
+        if energy != self._energy:
+            self._energy = energy
+            if state.rate_of_current_energy_consumption > 0 and (
+                state.current_coefficient_of_performance > 0
+            ):
+                self._observe(
+                    "current_coefficient_of_performance",
+                    state.current_coefficient_of_performance,
+                    bucket,
+                )
+
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _check_stuck(
+        self,
+        field_state: FieldState,
+        value: float,
+        drivers: tuple,
+        applies: bool,
+        now: datetime,
+    ) -> None:
+        """Flag a value that has not changed for too long since it should have."""
+        if not applies or value != field_state.last_value:
+            field_state.expected_since = None
+        elif field_state.drivers is not None and drivers != field_state.drivers:
+            field_state.expected_since = field_state.expected_since or now
+        field_state.drivers = drivers
+        field_state.is_stuck = (
+            field_state.expected_since is not None
+            and (now - field_state.expected_since).total_seconds() >= self.stuck_time
+        )
+
+    def _observe(self, name: str, value: float, bucket: str) -> None:
+        field_state = self.fields[name]
+        field_state.last_value = value
+
+        # Restart the smoothing when the operating mode or outdoor band changes
+        if bucket != field_state.bucket or field_state.ewma is None:
+            field_state.ewma = value
+        else:
+            field_state.ewma += ANOMALY_SMOOTHING * (value - field_state.ewma)
+        field_state.bucket = bucket
+
+        statistics = field_state.statistics.setdefault(bucket, RunningStatistics())
+        if statistics.count < ANOMALY_MIN_SAMPLES or statistics.std == 0:
+            field_state.z_score = None
+            statistics.add(value)
+            return
+        field_state.z_score = round(
+            (field_state.ewma - statistics.mean) / statistics.std, 2
+        )
+
+        # Outliers are left out of the statistics, so that a drift does not
+        # widen the range it is compared with
+        if abs(value - statistics.mean) < ANOMALY_THRESHOLD * statistics.std:
+            statistics.add(value)
+
+    def _data_to_save(self) -> dict:
+        return {
+            name: {
+                bucket: [statistics.count, statistics.mean, statistics.m2]
+                for bucket, statistics in field_state.statistics.items()
+            }
+            for name, field_state in self.fields.items()
+        }
+
+
+def _bucket(state: HeatPumpState) -> str:
+    """Return the operating mode and outdoor temperature band of a snapshot."""
+    if not state.has_power:
+        mode = "off"
+    elif state.is_forced_to_heat_water:
+        mode = "hot_water"
+    else:
+        mode = state.heating_status.value
+    band = math.floor(state.outdoor_temperature / ANOMALY_OUTDOOR_BAND)
+    return f"{mode}:{band * ANOMALY_OUTDOOR_BAND}"
@@ -1,33 +1,131 @@
 """Sample API Client."""
 
 from __future__ import annotations
-from dateutil import parser
 
 import asyncio
+import contextlib
+import dataclasses
+import os
+from collections import deque
+from datetime import date, datetime, timedelta, timezone, tzinfo
 import socket
 import json
+import time
+from typing import Any
 import aiohttp
 import async_timeout
 
+from custom_components.ecodan_heat_pump.bandwidth import (
+    BandwidthBudget,
+    request_size,
+    response_size,
+)
+from custom_components.ecodan_heat_pump.circuit_breaker import (
+    CircuitBreaker,
+    CircuitState,
+)
 from custom_components.ecodan_heat_pump.errors import (
     ApiClientAuthenticationException,
+    ApiClientBandwidthException,
+    ApiClientCircuitOpenException,
     ApiClientCommunicationException,
     ApiClientException,
 )
 from custom_components.ecodan_heat_pump.models import (
     Credentials,
     CredentialsId,
+    DailyEnergyReport,
     HeatPumpState,
     HeatingMode,
     HeatingStatus,
 )
-from custom_components.ecodan_heat_pump.const import LOGGER
+from custom_components.ecodan_heat_pump.const import (
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_HISTORY,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    KEEPALIVE_TIMEOUT,
+    LOGGER,
+    REQUEST_TIMEOUT,
+    WARM_UP_MARGIN,
+)
+from custom_components.ecodan_heat_pump.metrics import (
+    STATUS_CANCELLED,
+    STATUS_ERROR,
+    STATUS_TIMEOUT,
+    ApiMetrics,
+)
+from custom_components.ecodan_heat_pump.profiler import Profiler
+from custom_components.ecodan_heat_pump.scheduler import (
+    REQUEST_PRIORITY,
+    RequestPriority,
+    RequestScheduler,
+    with_priority,
+)
 
-BASE_URL = "https://app.melcloud.com/Mitsubishi.Wifi.Client"
+# The base URL can be redirected, e.g. at the local simulator in `simulator/`
+BASE_URL = os.environ.get(
+    "ECODAN_HEAT_PUMP_BASE_URL", "https://app.melcloud.com/Mitsubishi.Wifi.Client"
+)
 LOGIN_URL = f"{BASE_URL}/Login/ClientLogin"
 LIST_DEVICES_URL = f"{BASE_URL}/User/ListDevices"
+DEVICE_URL = f"{BASE_URL}/Device/Get"
+ENERGY_REPORT_URL = f"{BASE_URL}/EnergyCost/Report"
 SETTINGS_URL = f"{BASE_URL}/Device/SetAtw"
 
+# The URL requested to keep a connection to MELCloud open
+WARM_UP_URL = f"{BASE_URL}/"
+
+# The headers sent with every request. The Accept-Encoding header is left to
+# aiohttp, which only advertises the encodings it can decode
+HEADERS = {
+    "Accept": "application/json, text/javascript, */*; q=0.01",
+    "Accept-Language": "en-GB,en;q=0.9",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Host": "app.melcloud.com",
+    "Pragma": "no-cache",
+    "Referer": "https://app.melcloud.com/",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-origin",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1.2 Safari/605.1.15",
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+# The SetAtw response keys holding each heat pump state field that can be changed
+SETTINGS_RESPONSE_KEYS = {
+    "has_power": "Power",
+    "is_forced_to_heat_water": "ForcedHotWaterMode",
+    "target_flow_temperature": "SetHeatFlowTemperatureZone1",
+}
+
+# The Device/Get response keys holding each heat pump state field they map to
+# directly, any of which may be missing from the response
+LIVE_RESPONSE_KEYS = {
+    "has_power": "Power",
+    "has_error": "HasError",
+    "is_offline": "Offline",
+    "is_forced_to_heat_water": "ForcedHotWaterMode",
+    "target_flow_temperature": "SetHeatFlowTemperatureZone1",
+    "flow_temperature": "FlowTemperature",
+    "return_temperature": "ReturnTemperature",
+    "target_water_tank_temperature": "SetTankWaterTemperature",
+    "water_tank_temperature": "TankWaterTemperature",
+    "outdoor_temperature": "OutdoorTemperature",
+    "rate_of_current_energy_consumption": "CurrentEnergyConsumed",
+    "rate_of_current_energy_production": "CurrentEnergyProduced",
+}
+
+# The names under which requests to each endpoint are recorded in the metrics
+ENDPOINT_NAMES = {
+    LOGIN_URL: "login",
+    LIST_DEVICES_URL: "list_devices",
+    DEVICE_URL: "device",
+    ENERGY_REPORT_URL: "energy_report",
+    SETTINGS_URL: "settings",
+}
+
 
 class ApiClient:
     """This is the MELCLoud API client."""
@@ -40,21 +138,145 @@ class ApiClient:
         self._session = session
         self._credentials = credentials
         self._credentials_last_used: Credentials = None
+        self.metrics = ApiMetrics()
+        self.profiler = Profiler()
+        self.circuit_breaker = CircuitBreaker()
+        self.scheduler = RequestScheduler()
+        self.bandwidth = BandwidthBudget()
+        self._get_latencies: deque[float] = deque(maxlen=HEDGE_HISTORY)
+        self._headers: dict[CredentialsId, dict[str, str]] = {}
+        self._last_request_at = time.monotonic()
+        self._login_locks: dict[CredentialsId, asyncio.Lock] = {}
+        # ListDevices reports the devices' local time, which is taken to be
+        # Home Assistant's time zone
+        self.time_zone: tzinfo = timezone.utc
+
+    @property
+    def credentials(self) -> list[Credentials]:
+        """Return the credentials, in the order they are used."""
+        return self._credentials
+
+    def update_credentials(self, credentials: list[Credentials]) -> None:
+        """Replace the credentials, keeping the access tokens of those that are unchanged."""
+        known = {known.id: known for known in self._credentials}
+        for new in credentials:
+            old = known.get(new.id)
+            if old is not None and (old.username, old.password) == (
+                new.username,
+                new.password,
+            ):
+                new.access_token = old.access_token
+            else:
+                LOGGER.debug(f"Credentials '{new.id}' changed, logging in again...")
+                self._headers.pop(new.id, None)
+        self._credentials = credentials
 
     async def async_get_data(self) -> HeatPumpState:
         """Update the heat pump state model."""
 
+        with self.profiler.span("async_get_data"):
+            # List data about all devices, hedging a slow request
+            response = await self._async_hedged_get(LIST_DEVICES_URL)
+
+            # Update the stored heat pump state from the API request
+            with self.profiler.span("map_response"):
+                heat_pump_state = self._map_response_to_heat_pump_state(response)
+
+        return heat_pump_state
+
+    async def async_get_live_data(self, state: HeatPumpState) -> HeatPumpState:
+        """Update the frequently changing fields of a heat pump state.
+
+        Only the device itself is requested, which is much smaller than the
+        ListDevices structure, so the energy report and configuration fields are
+        kept from the given state.
+        """
+
+        with self.profiler.span("async_get_live_data"):
+            # Get the live data of the device, hedging a slow request
+            response = await self._async_hedged_get(
+                DEVICE_URL, {"id": state.device_id, "buildingID": state.building_id}
+            )
+
+            # Merge the live fields into a copy of the state
+            with self.profiler.span("map_response"):
+                heat_pump_state = self._merge_live_response(state, response)
+
+        return heat_pump_state
+
+    @with_priority(RequestPriority.BULK)
+    async def async_get_energy_report(
+        self, deviceId: str, from_date: date, to_date: date
+    ) -> list[DailyEnergyReport]:
+        """Get the daily energy reports for a range of days, at most a month long."""
+
+        LOGGER.debug(f"Getting the energy report from {from_date} to {to_date}...")
+
         # Get the next set of credentials to use
         credentials = await self._async_get_next_credentials()
 
-        # List data about all devices
-        response = await self._async_api_get(LIST_DEVICES_URL, credentials)
+        # Configure the request data
+        data = {
+            "DeviceID": deviceId,
+            "FromDate": f"{from_date.isoformat()}T00:00:00",
+            "ToDate": f"{to_date.isoformat()}T00:00:00",
+            "UseCurrency": False,
+        }
 
-        # Update the stored heat pump state from the API request
-        heat_pump_state = self._map_response_to_heat_pump_state(response)
+        # Get the report using the API
+        response = await self._async_api_post(ENERGY_REPORT_URL, credentials, data)
 
-        return heat_pump_state
+        # Extract a report for each day, which are listed in order from the first day
+        try:
+            days = min((to_date - from_date).days + 1, len(response["Heating"]))
+            return [
+                DailyEnergyReport(
+                    date=from_date + timedelta(days=day),
+                    heating_energy_consumed=response["Heating"][day],
+                    heating_energy_produced=response["ProducedHeating"][day],
+                    hot_water_energy_consumed=response["HotWater"][day],
+                    hot_water_energy_produced=response["ProducedHotWater"][day],
+                )
+                for day in range(days)
+            ]
+        except Exception as exception:
+            raise ApiClientException(
+                "Failed to map the energy report from the API!"
+            ) from exception
 
+    @property
+    def keepalive_left(self) -> float:
+        """Return the seconds until the connection pool closes an idle connection."""
+        return KEEPALIVE_TIMEOUT - (time.monotonic() - self._last_request_at)
+
+    async def async_warm_up(self, *_) -> None:
+        """Keep a connection to MELCloud open if it is about to be closed."""
+        if self.keepalive_left > WARM_UP_MARGIN:
+            return
+        if self.circuit_breaker.state != CircuitState.CLOSED:
+            return
+        # A warm connection is not worth the bytes on a metered uplink
+        if self.bandwidth.daily_budget is not None:
+            return
+        self._last_request_at = time.monotonic()
+        try:
+            async with (
+                async_timeout.timeout(REQUEST_TIMEOUT),
+                self._session.head(WARM_UP_URL, headers=HEADERS),
+            ):
+                LOGGER.debug("Warmed up the connection to MELCloud")
+        except (
+            asyncio.TimeoutError,
+            aiohttp.ClientError,
+            socket.gaierror,
+        ) as exception:
+            LOGGER.debug(f"Failed to warm up the connection to MELCloud: {exception!r}")
+
+    async def async_close(self) -> None:
+        """Close the session, e.g. when the integration is unloaded."""
+        await self._session.close()
+
+    @with_priority(RequestPriority.INTERACTIVE)
     async def async_toggle_heat_pump_power(self, deviceId: str, power: bool) -> bool:
         """Toggle the heat pump power on or off."""
 
@@ -73,6 +295,7 @@ class ApiClient:
 
         return has_power
 
+    @with_priority(RequestPriority.INTERACTIVE)
     async def async_toggle_water_heating(self, deviceId: str, heat_water: bool) -> bool:
         """Toggle hot water heating on/off."""
 
@@ -96,6 +319,7 @@ class ApiClient:
 
         return forced_hot_water_mode
 
+    @with_priority(RequestPriority.INTERACTIVE)
     async def async_set_heating_mode(
         self, deviceId: str, heating_mode: HeatingMode | None
     ) -> HeatingMode:
@@ -135,6 +359,7 @@ class ApiClient:
         else:
             return None
 
+    @with_priority(RequestPriority.INTERACTIVE)
     async def async_set_flow_temperature(
         self, deviceId: str, flow_temperature: float, hot_water_temperature: float
     ) -> float:
@@ -161,6 +386,153 @@ class ApiClient:
 
         return flow_temperature
 
+    @with_priority(RequestPriority.INTERACTIVE)
+    async def async_apply_settings(
+        self, deviceId: str, changes: dict[str, Any], hot_water_temperature: float
+    ) -> dict[str, Any]:
+        """Apply changes to several heat pump state fields with a single request.
+
+        Returns the values of the changed fields as reported back by the API.
+        """
+
+        LOGGER.debug(f"Applying settings {changes}...")
+
+        # Get the next set of credentials to use
+        credentials = await self._async_get_next_credentials()
+
+        # Combine the request data and flags of each change
+        data = {"EffectiveFlags": 0, "DeviceID": deviceId}
+        for field, value in changes.items():
+            flags, settings = self._settings_for_change(
+                field, value, hot_water_temperature
+            )
+            data["EffectiveFlags"] |= flags
+            data.update(settings)
+
+        # Set state using the API
+        response = await self._async_api_post(SETTINGS_URL, credentials, data)
+
+        # Extract the updated attributes from the response
+        return {
+            field: (
+                self._determine_heating_mode(response)
+                if field == "heating_mode"
+                else response[SETTINGS_RESPONSE_KEYS[field]]
+            )
+            for field in changes
+        }
+
+    def _settings_for_change(
+        self, field: str, value: Any, hot_water_temperature: float
+    ) -> tuple[int, dict]:
+        """Return the SetAtw flags and data that change a heat pump state field."""
+        match field:
+            case "has_power":
+                return 0x1, {"Power": value}
+            case "is_forced_to_heat_water":
+                return 0x10000, {"ForcedHotWaterMode": value}
+            case "heating_mode" if value == HeatingMode.FLOW_TEMPERATURE:
+                return 67108872, {"OperationModeZone1": 1}
+            case "heating_mode" if value == HeatingMode.CURVE_TEMPERATURE:
+                return 281475043819560, {"OperationModeZone1": 2}
+            case "target_flow_temperature":
+                return 281475043819552, {
+                    "SetHeatFlowTemperatureZone1": value,
+                    "SetTankWaterTemperature": hot_water_temperature,
+                }
+        raise ApiClientException(f"Cannot change '{field}' to '{value}'!")
+
+    async def _async_hedged_get(self, url, params: dict | None = None) -> any:
+        """Get data, repeating a slow or failed request with the next set of credentials.
+
+        If the first request has not answered within the p95 of recent
+        latencies, or fails before then, the same request is sent with the next
+        credentials. The first successful response wins and the other request is
+        cancelled. The delay only starts once the scheduler has admitted the
+        first request, so a request that is merely queued is not hedged.
+        """
+        delay = self._hedge_delay()
+        admitted = asyncio.get_running_loop().create_future()
+        tasks = [
+            asyncio.create_task(self._async_timed_get(url, params, delay, admitted))
+        ]
+        try:
+            with self.profiler.paused():
+                await asyncio.wait(
+                    (tasks[0], admitted), return_when=asyncio.FIRST_COMPLETED
+                )
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+            first_exception = None
+            if not done:
+                LOGGER.debug("Request is slow, hedging with the next credentials...")
+            elif (first_exception := tasks[0].exception()) is None:
+                return tasks[0].result()
+            elif isinstance(first_exception, ApiClientCircuitOpenException):
+                raise first_exception
+            else:
+                LOGGER.debug("Request failed, retrying with the next credentials...")
+            tasks.append(
+                asyncio.create_task(
+                    self._async_timed_get(
+                        url, params, delay, asyncio.get_running_loop().create_future()
+                    )
+                )
+            )
+
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                with self.profiler.paused():
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    first_exception = first_exception or task.exception()
+            raise first_exception
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Mark as retrieved
+
+    async def _async_timed_get(
+        self, url, params: dict | None, delay: float, admitted: asyncio.Future
+    ) -> any:
+        """Get data with the next set of credentials and record the latency.
+
+        The latency is timed from when the scheduler admits the request, which
+        sets the admitted future to that time, so time spent queued is left
+        out. A request that fails or is cancelled never answered, so it is
+        recorded as taking at least the hedge delay it was sent with. Leaving it
+        out would bias the recorded latencies, and so the hedge delay, low.
+        """
+        # Runs in a task of its own, so it needs a span of its own to be profiled
+        with self.profiler.span("api_request"):
+            credentials = await self._async_get_next_credentials()
+            try:
+                response = await self._async_api_get(url, credentials, params, admitted)
+            except ApiClientCircuitOpenException:
+                # No request was made
+                raise
+            except BaseException:
+                if admitted.done():
+                    self._get_latencies.append(
+                        max(time.monotonic() - admitted.result(), delay)
+                    )
+                raise
+            self._get_latencies.append(time.monotonic() - admitted.result())
+            return response
+
+    def _hedge_delay(self) -> float:
+        """Return how long to wait for a request before hedging it."""
+        if len(self._get_latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        latencies = sorted(self._get_latencies)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        return min(max(p95, HEDGE_MIN_DELAY), REQUEST_TIMEOUT)
+
     async def _async_get_next_credentials(self) -> Credentials:
         """Get the next set of credentials to use in the series."""
         next_credentials: Credentials
@@ -178,12 +550,43 @@ class ApiClient:
             self._credentials_last_used = next_credentials
 
         # Log in and get an access token if necessary
-        if next_credentials.access_token is None:
-            await self._async_login(next_credentials)
+        await self._async_ensure_login(next_credentials)
 
         LOGGER.debug(f"Using credentials '{next_credentials.id}'...")
         return next_credentials
 
+    @with_priority(RequestPriority.INTERACTIVE)
+    async def async_login_all(self) -> dict[CredentialsId, ApiClientException]:
+        """Log in with every set of credentials that has no access token, at once.
+
+        The logins run concurrently, within the scheduler's concurrency limit,
+        so all credentials are ready after about one round trip. Returns the
+        error of each set of credentials that failed to log in.
+        """
+        results = await asyncio.gather(
+            *(
+                self._async_ensure_login(credentials)
+                for credentials in self._credentials
+            ),
+            return_exceptions=True,
+        )
+        errors = {}
+        for credentials, result in zip(self._credentials, results):
+            if isinstance(result, ApiClientException):
+                errors[credentials.id] = result
+            elif isinstance(result, BaseException):
+                raise result
+        return errors
+
+    async def _async_ensure_login(self, credentials: Credentials) -> None:
+        """Log in if there is no access token, once for concurrent requests."""
+        if credentials.access_token is not None:
+            return
+        lock = self._login_locks.setdefault(credentials.id, asyncio.Lock())
+        async with lock:
+            if credentials.access_token is None:
+                await self._async_login(credentials)
+
     async def _async_login(self, credentials: Credentials):
         """Log in and get an access token, which is stored in the credentials."""
         if credentials.access_token is not None:
@@ -199,6 +602,7 @@ class ApiClient:
                 "AppVersion": "1.19.1.1",
                 "Persist": "true",
             },
+            credentials_id=credentials.id,
         )
         errorId = response["ErrorId"]
         if errorId is not None:
@@ -209,6 +613,7 @@ class ApiClient:
         try:
             contextKey = response["LoginData"]["ContextKey"]
             credentials.access_token = contextKey
+            self.metrics.record_login(credentials.id.value)
             LOGGER.debug(
                 f"Successfully requested access token for credentials '{credentials.id}'."
             )
@@ -224,8 +629,14 @@ class ApiClient:
         try:
             heat_pump_data = response[0]
             device = heat_pump_data["Structure"]["Devices"][0]["Device"]
+            last_communication = (
+                datetime.fromisoformat(device["LastTimeStamp"])
+                .replace(tzinfo=self.time_zone)
+                .astimezone(timezone.utc)
+            )
             heat_pump_state = HeatPumpState(
                 device_id=device["DeviceID"],
+                building_id=heat_pump_data["ID"],
                 wifi_status=device["WifiAdapterStatus"],
                 wifi_signal_stregth=device["WifiSignalStrength"],
                 has_power=device["Power"],
@@ -245,13 +656,14 @@ class ApiClient:
                 target_water_tank_temperature=device["SetTankWaterTemperature"],
                 water_tank_temperature=device["TankWaterTemperature"],
                 outdoor_temperature=device["OutdoorTemperature"],
-                last_communication=parser.parse(device["LastTimeStamp"]),
+                last_communication=last_communication,
                 rate_of_current_energy_consumption=device["CurrentEnergyConsumed"],
                 rate_of_current_energy_production=device["CurrentEnergyProduced"],
                 current_coefficient_of_performance=self._determine_current_coefficient_of_performance(
                     device
                 ),
-                daily_energy_report_date=parser.parse(
+                current_energy_updated_at=last_communication,
+                daily_energy_report_date=datetime.fromisoformat(
                     device["DailyEnergyConsumedDate"]
                 ).date(),
                 daily_heating_energy_consumed=device["DailyHeatingEnergyConsumed"],
@@ -275,6 +687,45 @@ class ApiClient:
                 "Failed to map API data to heat pump state!"
             ) from exception
 
+    def _merge_live_response(self, state: HeatPumpState, device: json) -> HeatPumpState:
+        """Merge the Device/Get response into a copy of the heat pump state.
+
+        Device/Get does not report every field ListDevices does, e.g. the flow
+        and return temperatures or the current energy rates of some devices, so
+        any field missing from the response keeps its value from the state.
+        """
+
+        try:
+            changes = {
+                field: device[key]
+                for field, key in LIVE_RESPONSE_KEYS.items()
+                if key in device
+            }
+            if "DefrostMode" in device:
+                changes["is_defrost_mode"] = device["DefrostMode"] == 1
+            if "OperationModeZone1" in device:
+                changes["heating_mode"] = self._determine_heating_mode(device)
+            if "IdleZone1" in device:
+                changes["heating_status"] = self._determine_heating_status(device)
+            if "LastCommunication" in device:
+                # Unlike ListDevices' LastTimeStamp, this is in UTC
+                changes["last_communication"] = datetime.fromisoformat(
+                    device["LastCommunication"]
+                ).replace(tzinfo=timezone.utc)
+            if "CurrentEnergyConsumed" in device and "CurrentEnergyProduced" in device:
+                changes["current_coefficient_of_performance"] = (
+                    self._determine_current_coefficient_of_performance(device)
+                )
+                changes["current_energy_updated_at"] = changes.get(
+                    "last_communication", state.last_communication
+                )
+            return dataclasses.replace(state, **changes)
+        except Exception as exception:
+            LOGGER.exception(exception)
+            raise ApiClientException(
+                "Failed to map live API data to heat pump state!"
+            ) from exception
+
     def _determine_daily_coefficient_of_performance(self, device):
         daily_total_energy_consumed = self._determine_daily_total_energy_consumed(
             device
@@ -328,86 +779,111 @@ class ApiClient:
         url,
         credentials: Credentials | None,
         data: dict,
+        credentials_id: CredentialsId | None = None,
     ) -> any:
-        """Post data to the MELCloud API."""
-        headers = {
-            "Accept": "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Accept-Language": "en-GB,en;q=0.9",
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Host": "app.melcloud.com",
-            "Pragma": "no-cache",
-            "Referer": "https://app.melcloud.com/",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-origin",
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1.2 Safari/605.1.15",
-            "X-Requested-With": "XMLHttpRequest",
-        }
-        if credentials is not None:
-            headers["X-MitsContextKey"] = credentials.access_token
+        """Post data to the MELCloud API.
 
-        try:
-            async with async_timeout.timeout(10):
-                response = await self._session.post(
-                    url=url,
-                    headers=headers,
-                    json=data,
-                )
-                if response.status in (401, 403):
-                    raise ApiClientAuthenticationException(
-                        "Invalid credentials",
-                    )
-                response.raise_for_status()
-                return await response.json()
+        The credentials ID is only needed to attribute metrics when posting
+        without credentials, i.e. when logging in.
+        """
+        if credentials is None:
+            headers = HEADERS
+        else:
+            headers = self._headers_for(credentials)
+            credentials_id = credentials.id
 
-        except asyncio.TimeoutError as exception:
-            raise ApiClientCommunicationException(
-                "Timeout error fetching information",
-            ) from exception
-        except (aiohttp.ClientError, socket.gaierror) as exception:
-            raise ApiClientCommunicationException(
-                "Error fetching information",
-            ) from exception
-        except Exception as exception:  # pylint: disable=broad-except
-            raise ApiClientException("Something really wrong happened!") from exception
+        return await self._async_api_request(
+            "POST", url, credentials_id, headers=headers, json=data
+        )
 
     async def _async_api_get(
         self,
         url,
         credentials: Credentials,
+        params: dict | None = None,
+        admitted: asyncio.Future | None = None,
     ) -> any:
         """Get data from the MELCloud API."""
+        return await self._async_api_request(
+            "GET",
+            url,
+            credentials.id,
+            admitted,
+            headers=self._headers_for(credentials),
+            params=params,
+        )
+
+    def _headers_for(self, credentials: Credentials) -> dict[str, str]:
+        """Return the request headers for a set of credentials, built once per access token."""
+        headers = self._headers.get(credentials.id)
+        if headers is None or headers["X-MitsContextKey"] != credentials.access_token:
+            headers = {**HEADERS, "X-MitsContextKey": credentials.access_token}
+            self._headers[credentials.id] = headers
+        return headers
+
+    async def _async_api_request(
+        self,
+        method: str,
+        url,
+        credentials_id: CredentialsId | None,
+        admitted: asyncio.Future | None = None,
+        **kwargs,
+    ) -> any:
+        """Make a request to the MELCloud API and record its metrics.
+
+        Waits for the scheduler to admit the request at the current priority,
+        setting the admitted future, if given, to the time it was admitted. It
+        then fails fast with an `ApiClientCircuitOpenException` while MELCloud
+        is known to be unavailable. Bulk requests fail with an
+        `ApiClientBandwidthException` while the day's usage is ahead of budget.
+        """
+        if not self.bandwidth.allows(REQUEST_PRIORITY.get()):
+            raise ApiClientBandwidthException(
+                "Deferring a bulk request to stay within the bandwidth budget"
+            )
+        async with contextlib.AsyncExitStack() as stack:
+            with self.profiler.paused():
+                await stack.enter_async_context(self.scheduler.slot())
+            if admitted is not None:
+                admitted.set_result(time.monotonic())
+            return await self._async_admitted_request(
+                method, url, credentials_id, **kwargs
+            )
+
+    async def _async_admitted_request(
+        self,
+        method: str,
+        url,
+        credentials_id: CredentialsId | None,
+        **kwargs,
+    ) -> any:
+        """Make a request that the scheduler has admitted."""
+        self.circuit_breaker.before_request()
+        endpoint = ENDPOINT_NAMES.get(url, url)
+        metrics_id = credentials_id.value if credentials_id is not None else "none"
+        start = time.monotonic()
+        status = STATUS_ERROR
+        body = b""
+        response = None
         try:
-            async with async_timeout.timeout(10):
-                response = await self._session.get(
-                    url=url,
-                    headers={
-                        "Accept": "application/json, text/javascript, */*; q=0.01",
-                        "Accept-Encoding": "gzip, deflate, br",
-                        "Accept-Language": "en-GB,en;q=0.9",
-                        "Cache-Control": "no-cache",
-                        "Connection": "keep-alive",
-                        "Host": "app.melcloud.com",
-                        "Pragma": "no-cache",
-                        "Referer": "https://app.melcloud.com/",
-                        "Sec-Fetch-Dest": "empty",
-                        "Sec-Fetch-Mode": "cors",
-                        "Sec-Fetch-Site": "same-origin",
-                        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1.2 Safari/605.1.15",
-                        "X-MitsContextKey": credentials.access_token,
-                        "X-Requested-With": "XMLHttpRequest",
-                    },
-                )
+            async with async_timeout.timeout(REQUEST_TIMEOUT):
+                with self.profiler.paused():
+                    response = await self._session.request(method, url=url, **kwargs)
+                status = str(response.status)
                 if response.status in (401, 403):
                     raise ApiClientAuthenticationException(
                         "Invalid credentials",
                     )
                 response.raise_for_status()
-                return await response.json()
+                with self.profiler.paused():
+                    body = await response.read()
+                return json.loads(body)
 
+        except asyncio.CancelledError:
+            status = STATUS_CANCELLED
+            raise
         except asyncio.TimeoutError as exception:
+            status = STATUS_TIMEOUT
             raise ApiClientCommunicationException(
                 "Timeout error fetching information",
             ) from exception
@@ -417,3 +893,34 @@ class ApiClient:
             ) from exception
         except Exception as exception:  # pylint: disable=broad-except
             raise ApiClientException("Something really wrong happened!") from exception
+        finally:
+            self._last_request_at = time.monotonic()
+            self.metrics.record_request(
+                endpoint, metrics_id, status, self._last_request_at - start, len(body)
+            )
+            self._record_circuit_outcome(status)
+            received = response_size(response, body)
+            self.bandwidth.record(
+                request_size(
+                    method,
+                    url,
+                    kwargs.get("headers"),
+                    kwargs.get("params"),
+                    kwargs.get("json"),
+                ),
+                received,
+                (
+                    self.bandwidth.check_compression(response, received)
+                    if response is not None and body
+                    else None
+                ),
+            )
+
+    def _record_circuit_outcome(self, status: str) -> None:
+        """Tell the circuit breaker whether MELCloud answered a request."""
+        if status == STATUS_CANCELLED:
+            self.circuit_breaker.record_cancelled()
+        elif status in (STATUS_TIMEOUT, STATUS_ERROR, "429") or status.startswith("5"):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
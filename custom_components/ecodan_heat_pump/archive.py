@@ -0,0 +1,249 @@
+"""A compressed, columnar on-disk archive of heat pump state snapshots.
+
+Each day is a separate file of blocks. A block holds a batch of snapshots as
+one column per field, each compressed separately so that a reader only
+decompresses the columns it needs:
+
+- integers (including the snapshot timestamp) are delta encoded varints
+- floats are XORed with the previous value, which leaves mostly zero bytes
+- booleans are single bytes
+- anything else (enums, dates, strings, None) is a JSON list
+
+Blocks are prefixed with their length, so a file can be appended to and
+streamed without an index.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import struct
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.ecodan_heat_pump.const import ARCHIVE_BLOCK_ROWS, LOGGER
+from custom_components.ecodan_heat_pump.models import HeatPumpState
+
+FILE_SUFFIX = ".ecodan"
+
+# The column holding the time each snapshot was archived, in epoch seconds
+TIMESTAMP = "timestamp"
+
+LENGTH = struct.Struct(">I")
+
+
+class TelemetryArchive:
+    """Append snapshots to the archive, writing a block every few snapshots."""
+
+    def __init__(self, hass: HomeAssistant, directory: str) -> None:  # noqa: D107
+        self._hass = hass
+        self.directory = directory
+        self._day: date | None = None
+        self._rows: list[dict[str, Any]] = []
+
+    async def async_append(self, state: HeatPumpState) -> None:
+        """Add a snapshot, writing the pending block when it is full or the day ends."""
+        now = dt_util.now()
+        if self._day is not None and now.date() != self._day:
+            await self.async_flush()
+        self._day = now.date()
+        self._rows.append({TIMESTAMP: int(now.timestamp()), **_row(state)})
+        if len(self._rows) >= ARCHIVE_BLOCK_ROWS:
+            await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write the pending snapshots, e.g. before shutting down."""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        path = os.path.join(self.directory, f"{self._day.isoformat()}{FILE_SUFFIX}")
+        try:
+            await self._hass.async_add_executor_job(_append_block, path, rows)
+        except OSError as exception:
+            LOGGER.warning(f"Failed to write to the telemetry archive: {exception}")
+
+
+def iter_blocks(
+    directory: str,
+    start: date | None = None,
+    end: date | None = None,
+    columns: Iterable[str] | None = None,
+) -> Iterator[dict[str, list]]:
+    """Stream the archive between two days (inclusive) as blocks of columns.
+
+    Only the requested columns are decoded, which makes scanning a few fields
+    over a long period fast. The timestamp column is always included.
+    """
+    wanted = None if columns is None else {TIMESTAMP, *columns}
+    for day, path in _files(directory):
+        if (start is not None and day < start) or (end is not None and day > end):
+            continue
+        with open(path, "rb") as file:
+            while header := file.read(LENGTH.size):
+                (length,) = LENGTH.unpack(header)
+                yield _decode_block(file.read(length), wanted)
+
+
+def iter_rows(
+    directory: str,
+    start: date | None = None,
+    end: date | None = None,
+    columns: Iterable[str] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Stream the archive between two days (inclusive) one snapshot at a time."""
+    for block in iter_blocks(directory, start, end, columns):
+        names = list(block)
+        for values in zip(*block.values()):
+            yield dict(zip(names, values))
+
+
+def _row(state: HeatPumpState) -> dict[str, Any]:
+    return {
+        field.name: getattr(state, field.name) for field in dataclasses.fields(state)
+    }
+
+
+def _files(directory: str) -> list[tuple[date, str]]:
+    if not os.path.isdir(directory):
+        return []
+    files = []
+    for name in os.listdir(directory):
+        if name.endswith(FILE_SUFFIX):
+            try:
+                day = date.fromisoformat(name.removesuffix(FILE_SUFFIX))
+            except ValueError:
+                continue
+            files.append((day, os.path.join(directory, name)))
+    return sorted(files)
+
+
+def _append_block(path: str, rows: list[dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    block = _encode_block(rows)
+    with open(path, "ab") as file:
+        file.write(LENGTH.pack(len(block)) + block)
+
+
+def _encode_block(rows: list[dict[str, Any]]) -> bytes:
+    columns = []
+    data = []
+    for name in rows[0]:
+        kind, encoded = _encode_column([row.get(name) for row in rows])
+        compressed = zlib.compress(encoded)
+        columns.append([name, kind, len(compressed)])
+        data.append(compressed)
+    header = json.dumps({"rows": len(rows), "columns": columns}).encode()
+    return LENGTH.pack(len(header)) + header + b"".join(data)
+
+
+def _decode_block(block: bytes, wanted: set[str] | None) -> dict[str, list]:
+    (header_length,) = LENGTH.unpack_from(block)
+    header = json.loads(block[LENGTH.size : LENGTH.size + header_length])
+    offset = LENGTH.size + header_length
+    decoded = {}
+    for name, kind, length in header["columns"]:
+        if wanted is None or name in wanted:
+            data = zlib.decompress(block[offset : offset + length])
+            decoded[name] = _decode_column(kind, data, header["rows"])
+        offset += length
+    return decoded
+
+
+def _encode_column(values: list) -> tuple[str, bytes]:
+    types = {type(value) for value in values}
+    if types == {bool}:
+        return "bool", bytes(values)
+    if types == {int}:
+        return "int", _encode_varints(_deltas(values))
+    if types <= {int, float}:
+        bits = struct.unpack(
+            f">{len(values)}Q", struct.pack(f">{len(values)}d", *values)
+        )
+        return "float", struct.pack(f">{len(bits)}Q", *_xors(bits))
+    return "json", json.dumps([_jsonable(value) for value in values]).encode()
+
+
+def _decode_column(kind: str, data: bytes, rows: int) -> list:
+    match kind:
+        case "bool":
+            return [byte == 1 for byte in data]
+        case "int":
+            return _undeltas(_decode_varints(data))
+        case "float":
+            bits = _unxors(struct.unpack(f">{rows}Q", data))
+            return list(struct.unpack(f">{rows}d", struct.pack(f">{rows}Q", *bits)))
+        case "json":
+            return json.loads(data)
+    raise ValueError(f"Unknown column kind '{kind}'!")
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _deltas(values: list[int]) -> list[int]:
+    return [values[0]] + [
+        value - previous for previous, value in zip(values, values[1:])
+    ]
+
+
+def _undeltas(deltas: list[int]) -> list[int]:
+    values = []
+    total = 0
+    for delta in deltas:
+        total += delta
+        values.append(total)
+    return values
+
+
+def _xors(bits: Iterable[int]) -> list[int]:
+    xors = []
+    previous = 0
+    for value in bits:
+        xors.append(value ^ previous)
+        previous = value
+    return xors
+
+
+def _unxors(xors: Iterable[int]) -> list[int]:
+    bits = []
+    previous = 0
+    for xor in xors:
+        previous ^= xor
+        bits.append(previous)
+    return bits
+
+
+def _encode_varints(values: list[int]) -> bytes:
+    """Encode signed integers as zigzag varints, so small deltas take one byte."""
+    encoded = bytearray()
+    for value in values:
+        value = value * 2 if value >= 0 else -value * 2 - 1
+        while value >= 0x80:
+            encoded.append((value & 0x7F) | 0x80)
+            value >>= 7
+        encoded.append(value)
+    return bytes(encoded)
+
+
+def _decode_varints(data: bytes) -> list[int]:
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            values.append((value >> 1) ^ -(value & 1))
+            value = shift = 0
+    return values
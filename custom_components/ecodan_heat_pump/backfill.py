@@ -0,0 +1,144 @@
+"""Backfill MELCloud's daily energy reports into long-term statistics."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from datetime import date, timedelta
+
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.ecodan_heat_pump.api import ApiClient
+from custom_components.ecodan_heat_pump.const import (
+    BACKFILL_CHUNK_DAYS,
+    BACKFILL_CHUNK_DELAY,
+    DOMAIN,
+    LOGGER,
+)
+
+STORAGE_VERSION = 1
+
+# The fields of each cached day, in order
+ENERGY_FIELDS = (
+    "heating_energy_consumed",
+    "heating_energy_produced",
+    "hot_water_energy_consumed",
+    "hot_water_energy_produced",
+)
+
+
+class EnergyBackfill:
+    """Fetch the daily energy reports that are not cached yet, then import them all.
+
+    Each completed day is cached, so a range is only ever fetched once and an
+    interrupted backfill resumes where it stopped. The statistics are rebuilt
+    from the whole cache on every import, so their sums stay consistent.
+    """
+
+    def __init__(  # noqa: D107
+        self, hass: HomeAssistant, client: ApiClient, entry_id: str
+    ) -> None:
+        self._hass = hass
+        self._client = client
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.energy")
+        self._days: dict[str, list[float]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_run(self, device_id: str, start: date, end: date) -> None:
+        """Backfill the days from start to end inclusive, up to yesterday."""
+        # Only one backfill at a time, so that a range is never fetched twice
+        async with self._lock:
+            if self._days is None:
+                data = await self._store.async_load()
+                self._days = data["days"] if data is not None else {}
+
+            # Today's report is incomplete, so it is never cached
+            end = min(end, dt_util.now().date() - timedelta(days=1))
+            missing = [
+                day for day in _days(start, end) if day.isoformat() not in self._days
+            ]
+            if missing:
+                LOGGER.info(
+                    f"Backfilling the energy reports of {len(missing)} days "
+                    f"from {missing[0]} to {missing[-1]}..."
+                )
+
+            for index, (chunk_start, chunk_end) in enumerate(_chunks(missing)):
+                if index > 0:
+                    await asyncio.sleep(BACKFILL_CHUNK_DELAY)
+                reports = await self._client.async_get_energy_report(
+                    device_id, chunk_start, chunk_end
+                )
+                for report in reports:
+                    self._days[report.date.isoformat()] = [
+                        getattr(report, field) for field in ENERGY_FIELDS
+                    ]
+                await self._store.async_save({"days": self._days})
+
+            if self._days and "recorder" in self._hass.config.components:
+                self._import_statistics(device_id)
+
+    def _import_statistics(self, device_id: str) -> None:
+        """Import the cached days as external statistics, one per energy field."""
+        # The recorder is large and only needed here, so it is imported on demand
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        days = sorted(self._days.items())
+        for index, field in enumerate(ENERGY_FIELDS):
+            total = 0.0
+            statistics = []
+            for day, values in days:
+                total += values[index]
+                statistics.append(
+                    StatisticData(
+                        start=dt_util.start_of_local_day(date.fromisoformat(day)),
+                        state=values[index],
+                        sum=total,
+                    )
+                )
+            async_add_external_statistics(
+                self._hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"Heat pump {device_id} {field.replace('_', ' ')}",
+                    source=DOMAIN,
+                    statistic_id=f"{DOMAIN}:{device_id}_{field}",
+                    unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+                ),
+                statistics,
+            )
+
+
+def _days(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def _chunks(days: list[date]) -> Iterator[tuple[date, date]]:
+    """Group ordered days into consecutive ranges of at most a chunk each."""
+    chunk_start = chunk_end = None
+    for day in days:
+        if (
+            chunk_start is not None
+            and day == chunk_end + timedelta(days=1)
+            and (day - chunk_start).days < BACKFILL_CHUNK_DAYS
+        ):
+            chunk_end = day
+            continue
+        if chunk_start is not None:
+            yield chunk_start, chunk_end
+        chunk_start = chunk_end = day
+    if chunk_start is not None:
+        yield chunk_start, chunk_end
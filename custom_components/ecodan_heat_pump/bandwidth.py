@@ -0,0 +1,143 @@
+"""Count the bytes exchanged with MELCloud each day, against an optional budget."""
+
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+from typing import Any
+
+import aiohttp
+from homeassistant.util import dt as dt_util
+
+from custom_components.ecodan_heat_pump.const import (
+    BANDWIDTH_COMMAND_RESERVE,
+    BANDWIDTH_UNCOMPRESSED_WARNING,
+    LOGGER,
+)
+from custom_components.ecodan_heat_pump.scheduler import RequestPriority
+
+# The request line and the headers aiohttp adds itself, e.g. Content-Length
+REQUEST_OVERHEAD = 120
+
+
+class BandwidthBudget:
+    """The bytes on the wire to and from MELCloud today, and the daily budget.
+
+    The count restarts at midnight in Home Assistant's time zone. User commands may always use the
+    budget. The coordinator paces its polling to leave a reserve for them, and
+    bulk requests are refused while the day's usage is ahead of schedule.
+    """
+
+    def __init__(self, daily_budget: int | None = None) -> None:  # noqa: D107
+        self.daily_budget = daily_budget
+        self.total = 0
+        self.used = 0
+        self.requests = 0
+        self.compressed_responses = 0
+        self.uncompressed_responses = 0
+        self._day = dt_util.now().date()
+        self._warned = False
+
+    def record(self, sent: int, received: int, compressed: bool | None) -> None:
+        """Record a request, and whether its response body was compressed."""
+        self._roll_over()
+        self.total += sent + received
+        self.used += sent + received
+        self.requests += 1
+        if compressed is True:
+            self.compressed_responses += 1
+        elif compressed is False:
+            self.uncompressed_responses += 1
+
+    def check_compression(self, response: aiohttp.ClientResponse, size: int) -> bool:
+        """Return whether a response was compressed, warning once if a large one was not."""
+        compressed = aiohttp.hdrs.CONTENT_ENCODING in response.headers
+        large = size >= BANDWIDTH_UNCOMPRESSED_WARNING
+        if not compressed and large and not self._warned:
+            self._warned = True
+            LOGGER.warning(
+                f"MELCloud sent a {size} byte response uncompressed, "
+                "so polling uses more bandwidth than it should"
+            )
+        return compressed
+
+    @property
+    def remaining(self) -> int | None:
+        """Return the bytes left of today's budget, if there is one."""
+        if self.daily_budget is None:
+            return None
+        self._roll_over()
+        return max(self.daily_budget - self.used, 0)
+
+    @property
+    def telemetry_remaining(self) -> int | None:
+        """Return the bytes left for polling, after the reserve for commands."""
+        if (remaining := self.remaining) is None:
+            return None
+        return max(remaining - int(self.daily_budget * BANDWIDTH_COMMAND_RESERVE), 0)
+
+    def allows(self, priority: RequestPriority) -> bool:
+        """Return whether a request may be made now, given its priority."""
+        if self.daily_budget is None or priority != RequestPriority.BULK:
+            return True
+        self._roll_over()
+        elapsed = 1 - seconds_left_today() / timedelta(days=1).total_seconds()
+        schedule = self.daily_budget * (1 - BANDWIDTH_COMMAND_RESERVE) * elapsed
+        return self.used <= schedule
+
+    def as_dict(self) -> dict:
+        """Return today's usage as a JSON serialisable dictionary."""
+        return {
+            "daily_budget": self.daily_budget,
+            "used": self.used,
+            "remaining": self.remaining,
+            "requests": self.requests,
+            "compressed_responses": self.compressed_responses,
+            "uncompressed_responses": self.uncompressed_responses,
+        }
+
+    def _roll_over(self) -> None:
+        if (today := dt_util.now().date()) != self._day:
+            self._day = today
+            self.used = 0
+            self.requests = 0
+
+
+def seconds_left_today() -> float:
+    """Return the seconds until midnight in Home Assistant's time zone."""
+    now = dt_util.now()
+    midnight = dt_util.start_of_local_day(now.date() + timedelta(days=1))
+    return (midnight - now).total_seconds()
+
+
+def request_size(
+    method: str,
+    url: str,
+    headers: dict[str, str] | None,
+    params: dict | None = None,
+    json_data: Any = None,
+) -> int:
+    """Estimate the bytes sent for a request from its URL, headers and body."""
+    size = len(method) + len(url) + REQUEST_OVERHEAD
+    if params:
+        size += sum(
+            len(str(key)) + len(str(value)) + 2 for key, value in params.items()
+        )
+    if headers:
+        size += sum(len(key) + len(value) + 4 for key, value in headers.items())
+    if json_data is not None:
+        size += len(json.dumps(json_data))
+    return size
+
+
+def response_size(response: aiohttp.ClientResponse | None, body: bytes) -> int:
+    """Return the bytes received for a response, with its body as sent on the wire.
+
+    The body is decompressed by the time it is read, so its size on the wire
+    is taken from the Content-Length header when there is one.
+    """
+    if response is None:
+        return 0
+    headers = sum(len(key) + len(value) + 4 for key, value in response.raw_headers)
+    length = response.headers.get(aiohttp.hdrs.CONTENT_LENGTH)
+    return headers + (int(length) if length is not None else len(body))
@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
     BinarySensorEntityDescription,
 )
+from homeassistant.const import EntityCategory
 
 from .const import DOMAIN
-from .coordinator import Coordinator
 from .entity import EcodanHeatPumpEntity
 
+if TYPE_CHECKING:
+    from .coordinator import Coordinator
+
 
 async def async_setup_entry(hass, entry, async_add_devices):
     """Set up the binary_sensor platform."""
@@ -25,6 +30,20 @@ async def async_setup_entry(hass, entry, async_add_devices):
             HeatPumpHolidayModeBinarySensor(coordinator),
             HeatPumpHeatingProhibitedModeBinarySensor(coordinator),
             HeatPumpHotWaterProhibitedModeBinarySensor(coordinator),
+            HeatPumpAnomalyBinarySensor(
+                coordinator, "flow_temperature", "Flow temperature anomaly"
+            ),
+            HeatPumpAnomalyBinarySensor(
+                coordinator, "return_temperature", "Return temperature anomaly"
+            ),
+            HeatPumpAnomalyBinarySensor(
+                coordinator, "water_tank_temperature", "Water tank temperature anomaly"
+            ),
+            HeatPumpAnomalyBinarySensor(
+                coordinator,
+                "current_coefficient_of_performance",
+                "Coefficient of performance (COP) anomaly",
+            ),
         ]
     )
 
@@ -185,3 +204,45 @@ class HeatPumpHotWaterProhibitedModeBinarySensor(HeatPumpBinarySensorEntity):
             ),
             is_on_function=lambda coordinator: coordinator.data.is_heating_water_prohibited,
         )
+
+
+class HeatPumpAnomalyBinarySensor(HeatPumpBinarySensorEntity):
+    """Flags a field that is stuck or far outside its usual range."""
+
+    def __init__(  # noqa: D107
+        self,
+        coordinator: Coordinator,
+        field: str,
+        name: str,
+    ) -> None:
+        super().__init__(
+            unique_id=f"{field}_anomaly",
+            coordinator=coordinator,
+            entity_description=BinarySensorEntityDescription(
+                key=DOMAIN,
+                name=name,
+                icon="mdi:chart-bell-curve",
+                device_class=BinarySensorDeviceClass.PROBLEM,
+                entity_category=EntityCategory.DIAGNOSTIC,
+            ),
+            is_on_function=lambda coordinator: (
+                coordinator.anomalies.fields[field].is_stuck
+                or coordinator.anomalies.fields[field].is_deviating
+            ),
+        )
+        self._field = field
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return why the field is flagged and the statistics it is compared with."""
+        field_state = self._coordinator.anomalies.fields[self._field]
+        statistics = field_state.statistics.get(field_state.bucket)
+        return {
+            "stuck": field_state.is_stuck,
+            "deviating": field_state.is_deviating,
+            "z_score": field_state.z_score,
+            "bucket": field_state.bucket,
+            "mean": round(statistics.mean, 2) if statistics else None,
+            "std": round(statistics.std, 2) if statistics else None,
+            "samples": statistics.count if statistics else 0,
+        }
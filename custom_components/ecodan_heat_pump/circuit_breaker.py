@@ -0,0 +1,116 @@
+"""A circuit breaker to fail fast while MELCloud is unavailable."""
+
+from __future__ import annotations
+
+import random
+import time
+from enum import Enum
+
+from custom_components.ecodan_heat_pump.const import (
+    CIRCUIT_BASE_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_MAX_DELAY,
+    LOGGER,
+)
+from custom_components.ecodan_heat_pump.errors import ApiClientCircuitOpenException
+
+
+class CircuitState(Enum):  # noqa: D101
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Open after consecutive failures, then probe with a jittered exponential backoff.
+
+    While open, requests fail immediately. Once the backoff has elapsed, a
+    single probe request is let through (half-open): if it succeeds the circuit
+    closes, otherwise it opens again with double the delay.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        base_delay: float = CIRCUIT_BASE_DELAY,
+        max_delay: float = CIRCUIT_MAX_DELAY,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.retry_at: float | None = None
+        self._probe_in_flight = False
+
+    def before_request(self) -> None:
+        """Raise if the request should fail fast, otherwise let it through."""
+        if self.state == CircuitState.CLOSED:
+            return
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() < self.retry_at:
+                raise ApiClientCircuitOpenException(
+                    f"MELCloud is unavailable, retrying in {self.retry_at - time.monotonic():.0f}s"
+                )
+            LOGGER.debug("Probing whether MELCloud is available again...")
+            self.state = CircuitState.HALF_OPEN
+        if self._probe_in_flight:
+            raise ApiClientCircuitOpenException(
+                "MELCloud is unavailable, waiting for a probe request"
+            )
+        self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """Record a request that reached MELCloud."""
+        if self.state != CircuitState.CLOSED:
+            LOGGER.info("MELCloud is available again")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.retry_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a request that failed because of a communication error."""
+        self.consecutive_failures += 1
+        if self.state == CircuitState.OPEN:
+            # Requests that were already in flight when the circuit opened
+            return
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def record_cancelled(self) -> None:
+        """Record a request that was cancelled before it completed."""
+        self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self.trips += 1
+        delay = min(self.base_delay * 2 ** (self.trips - 1), self.max_delay)
+        # Jitter the delay so that many clients do not all retry at once
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if self.state == CircuitState.CLOSED:
+            LOGGER.warning(
+                f"MELCloud is unavailable, failing fast for the next {delay:.0f}s"
+            )
+        else:
+            LOGGER.debug(f"MELCloud is still unavailable, retrying in {delay:.0f}s")
+        self.state = CircuitState.OPEN
+        self.retry_at = time.monotonic() + delay
+        self._probe_in_flight = False
+
+    def as_dict(self) -> dict:
+        """Return the breaker's state as a JSON serialisable dictionary."""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "retry_in": (
+                max(self.retry_at - time.monotonic(), 0)
+                if self.retry_at is not None
+                else None
+            ),
+        }
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from homeassistant.components.climate import (
     ClimateEntity,
     ClimateEntityDescription,
@@ -27,11 +29,11 @@ from custom_components.ecodan_heat_pump.const import (
     MAX_FLOW_TEMP,
     MIN_FLOW_TEMP,
 )
-from custom_components.ecodan_heat_pump.coordinator import (
-    Coordinator,
-)
 from custom_components.ecodan_heat_pump.entity import EcodanHeatPumpEntity
 
+if TYPE_CHECKING:
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
+
 ENTITY_DESCRIPTIONS = (
     ClimateEntityDescription(
         key=DOMAIN,
@@ -0,0 +1,114 @@
+"""Set the flow temperature from the outdoor temperature (weather compensation)."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+
+from custom_components.ecodan_heat_pump.const import (
+    COMPENSATION_BALANCE_TEMP,
+    COMPENSATION_HYSTERESIS,
+    COMPENSATION_SMOOTHING,
+    COMPENSATION_STEP,
+    LOGGER,
+    MAX_FLOW_TEMP,
+    MIN_FLOW_TEMP,
+)
+from custom_components.ecodan_heat_pump.models import HeatingMode, HeatPumpState
+
+
+class CompensationController:
+    """Follow a heating curve with as few flow temperature writes as possible.
+
+    The curve is a straight line from the minimum flow temperature at the
+    balance point (20°C outdoors) to the design flow temperature at the design
+    outdoor temperature. The outdoor temperature is smoothed, and only moves the
+    curve's input once it leaves a hysteresis band, so that noise and short
+    swings do not cause writes. A new target is only written if it differs by a
+    whole step from the current one and the hourly write budget allows it.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        design_outdoor_temperature: float,
+        design_flow_temperature: float,
+        writes_per_hour: int,
+    ) -> None:
+        self.design_outdoor_temperature = design_outdoor_temperature
+        self.design_flow_temperature = design_flow_temperature
+        self.writes_per_hour = writes_per_hour
+        self.smoothed_outdoor_temperature: float | None = None
+        self.reference_outdoor_temperature: float | None = None
+        self.target: float | None = None
+        self.deferred_writes = 0
+        self._writes: deque[float] = deque()
+
+    def curve(self, outdoor_temperature: float) -> float:
+        """Return the flow temperature for an outdoor temperature, in whole steps."""
+        span = COMPENSATION_BALANCE_TEMP - self.design_outdoor_temperature
+        slope = (self.design_flow_temperature - MIN_FLOW_TEMP) / span
+        flow = MIN_FLOW_TEMP + slope * (COMPENSATION_BALANCE_TEMP - outdoor_temperature)
+        flow = round(flow / COMPENSATION_STEP) * COMPENSATION_STEP
+        return min(max(flow, MIN_FLOW_TEMP), MAX_FLOW_TEMP)
+
+    @property
+    def writes_last_hour(self) -> int:
+        """Return the number of writes in the last hour."""
+        self._expire(time.monotonic())
+        return len(self._writes)
+
+    def observe(self, state: HeatPumpState) -> float | None:
+        """Update the target from a snapshot, returning it if it should be written."""
+        outdoor_temperature = state.outdoor_temperature
+        if self.smoothed_outdoor_temperature is None:
+            self.smoothed_outdoor_temperature = outdoor_temperature
+        else:
+            self.smoothed_outdoor_temperature += COMPENSATION_SMOOTHING * (
+                outdoor_temperature - self.smoothed_outdoor_temperature
+            )
+
+        # Only follow the smoothed temperature once it leaves the hysteresis band
+        if self.reference_outdoor_temperature is None or (
+            abs(self.smoothed_outdoor_temperature - self.reference_outdoor_temperature)
+            >= COMPENSATION_HYSTERESIS
+        ):
+            self.reference_outdoor_temperature = self.smoothed_outdoor_temperature
+        self.target = self.curve(self.reference_outdoor_temperature)
+
+        # The flow temperature only applies when heating to it, and is left
+        # alone while the device is off or uses its own curve
+        if not state.has_power or state.heating_mode != HeatingMode.FLOW_TEMPERATURE:
+            return None
+        if abs(self.target - state.target_flow_temperature) < COMPENSATION_STEP:
+            return None
+
+        now = time.monotonic()
+        self._expire(now)
+        if len(self._writes) >= self.writes_per_hour:
+            self.deferred_writes += 1
+            return None
+        self._writes.append(now)
+        LOGGER.debug(
+            f"Weather compensation: {self.reference_outdoor_temperature:.1f}°C "
+            f"outdoors, setting the flow temperature to {self.target}°C"
+        )
+        return self.target
+
+    def as_dict(self) -> dict:
+        """Return the controller's state for the sensor attributes."""
+        return {
+            "design_outdoor_temperature": self.design_outdoor_temperature,
+            "design_flow_temperature": self.design_flow_temperature,
+            "smoothed_outdoor_temperature": (
+                round(self.smoothed_outdoor_temperature, 2)
+                if self.smoothed_outdoor_temperature is not None
+                else None
+            ),
+            "writes_last_hour": self.writes_last_hour,
+            "writes_per_hour": self.writes_per_hour,
+            "deferred_writes": self.deferred_writes,
+        }
+
+    def _expire(self, now: float) -> None:
+        while self._writes and now - self._writes[0] >= 3600:
+            self._writes.popleft()
@@ -5,38 +5,88 @@ from typing import Any
 from collections.abc import Mapping
 
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow, FlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigEntryState,
+    ConfigFlow,
+    FlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import callback
 from homeassistant.helpers.selector import (
+    BooleanSelector,
+    EntitySelector,
+    EntitySelectorConfig,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
     TextSelector,
     TextSelectorConfig,
     TextSelectorType,
 )
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from custom_components.ecodan_heat_pump import build_credentials
 from custom_components.ecodan_heat_pump.api import (
     ApiClient,
     ApiClientAuthenticationException,
     ApiClientCommunicationException,
     ApiClientException,
 )
-from custom_components.ecodan_heat_pump.models import Credentials, CredentialsId
+from custom_components.ecodan_heat_pump.models import CredentialsId
+from custom_components.ecodan_heat_pump.profiles import EntityProfile
 from custom_components.ecodan_heat_pump.const import (
+    COMPENSATION_DESIGN_FLOW_TEMP,
+    COMPENSATION_DESIGN_OUTDOOR_TEMP,
+    COMPENSATION_WRITES_PER_HOUR,
+    CONF_ARCHIVE,
+    CONF_COMPENSATION,
+    CONF_COMPENSATION_WRITES,
+    CONF_DAILY_BANDWIDTH,
+    CONF_DESIGN_FLOW_TEMP,
+    CONF_DESIGN_OUTDOOR_TEMP,
+    CONF_ENTITY_PROFILE,
+    CONF_FULL_UPDATE_INTERVAL,
+    CONF_PRICE_ENTITY,
+    CONF_UPDATE_INTERVAL,
+    COORDINATOR_UPDATE_INTERVAL,
     DOMAIN,
     LOGGER,
+    MAX_FLOW_TEMP,
+    MIN_FLOW_TEMP,
     PASSWORD_1,
     PASSWORD_2,
     PASSWORD_3,
+    SLOW_UPDATE_INTERVAL,
     USERNAME_1,
     USERNAME_2,
     USERNAME_3,
 )
 
+# The field to show the log in error of each set of credentials on
+USERNAME_FIELDS = {
+    CredentialsId.CREDENTIALS_1: USERNAME_1,
+    CredentialsId.CREDENTIALS_2: USERNAME_2,
+    CredentialsId.CREDENTIALS_3: USERNAME_3,
+}
+
 
 class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
     """Config flow for Blueprint."""
 
     VERSION = 1
 
+    _reauth_entry: ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self,
         user_input: dict | None = None,
@@ -47,7 +97,7 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
         self._entry_data = user_input if user_input is not None else {}
         if user_input is not None:
             try:
-                await self._test_credentials(user_input)
+                _errors = await self._test_credentials(user_input)
             except ApiClientAuthenticationException:
                 _errors["base"] = "auth"
             except ApiClientCommunicationException as exception:
@@ -55,7 +105,16 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
                 _errors["base"] = "connection"
             except ApiClientException:
                 _errors["base"] = "unknown"
-            else:
+            if not _errors:
+                # Replace the credentials of the existing entry, which applies
+                # them in place if it is loaded. An entry that failed to set up,
+                # e.g. with the old credentials, has no update listener yet and
+                # is set up again instead
+                if (entry := self._reauth_entry) is not None:
+                    self.hass.config_entries.async_update_entry(entry, data=user_input)
+                    if entry.state is not ConfigEntryState.LOADED:
+                        self.hass.config_entries.async_schedule_reload(entry.entry_id)
+                    return self.async_abort(reason="reauth_successful")
                 return self.async_create_entry(
                     title="Ecodan Heat Pump",
                     data=user_input,
@@ -115,34 +174,162 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
     async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
         """Reauthorisation step."""
         LOGGER.debug("Starting re-auth flow...")
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
         return await self.async_step_user(entry_data)
 
     async def _test_credentials(
         self,
         user_input: dict,
-    ) -> None:
-        """Validate credentials."""
+    ) -> dict[str, str]:
+        """Validate every set of credentials at once, returning the errors per field."""
         LOGGER.debug("Validating API credentials...")
         client = ApiClient(
-            [
-                Credentials(
-                    CredentialsId.CREDENTIALS_1,
-                    user_input[USERNAME_1],
-                    user_input[PASSWORD_1],
-                ),
-                Credentials(
-                    CredentialsId.CREDENTIALS_2,
-                    user_input[USERNAME_2],
-                    user_input[PASSWORD_2],
-                ),
-                Credentials(
-                    CredentialsId.CREDENTIALS_2,
-                    user_input[USERNAME_2],
-                    user_input[PASSWORD_2],
-                ),
-            ],
-            async_create_clientsession(self.hass),
+            build_credentials(user_input),
+            async_get_clientsession(self.hass),
+        )
+        errors = {}
+        for credentials_id, exception in (await client.async_login_all()).items():
+            if isinstance(exception, ApiClientAuthenticationException):
+                errors[USERNAME_FIELDS[credentials_id]] = credentials_id.value
+            elif isinstance(exception, ApiClientCommunicationException):
+                LOGGER.error(exception)
+                errors["base"] = "connection"
+            else:
+                errors["base"] = "unknown"
+        if not errors:
+            # Check that the account has a heat pump
+            await client.async_get_data()
+        return errors
+
+
+class OptionsFlowHandler(OptionsFlow):
+    """Options flow for the integration."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:  # noqa: D107
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input: dict | None = None) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_UPDATE_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_UPDATE_INTERVAL,
+                            COORDINATOR_UPDATE_INTERVAL.total_seconds(),
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=30,
+                            max=600,
+                            step=10,
+                            unit_of_measurement="s",
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_FULL_UPDATE_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_FULL_UPDATE_INTERVAL,
+                            SLOW_UPDATE_INTERVAL.total_seconds() / 60,
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=5,
+                            max=240,
+                            step=5,
+                            unit_of_measurement="min",
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_ENTITY_PROFILE,
+                        default=self.config_entry.options.get(
+                            CONF_ENTITY_PROFILE, EntityProfile.STANDARD.value
+                        ),
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=[profile.value for profile in EntityProfile],
+                            mode=SelectSelectorMode.LIST,
+                            translation_key=CONF_ENTITY_PROFILE,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_DAILY_BANDWIDTH,
+                        default=self.config_entry.options.get(CONF_DAILY_BANDWIDTH, 0),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=0,
+                            max=1000,
+                            step=0.1,
+                            unit_of_measurement="MB",
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_ARCHIVE,
+                        default=self.config_entry.options.get(CONF_ARCHIVE, False),
+                    ): BooleanSelector(),
+                    vol.Optional(
+                        CONF_PRICE_ENTITY,
+                        description={
+                            "suggested_value": self.config_entry.options.get(
+                                CONF_PRICE_ENTITY
+                            )
+                        },
+                    ): EntitySelector(EntitySelectorConfig(domain=["sensor", "event"])),
+                    vol.Optional(
+                        CONF_COMPENSATION,
+                        default=self.config_entry.options.get(CONF_COMPENSATION, False),
+                    ): BooleanSelector(),
+                    vol.Optional(
+                        CONF_DESIGN_OUTDOOR_TEMP,
+                        default=self.config_entry.options.get(
+                            CONF_DESIGN_OUTDOOR_TEMP, COMPENSATION_DESIGN_OUTDOOR_TEMP
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=-30,
+                            max=10,
+                            step=1,
+                            unit_of_measurement="°C",
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_DESIGN_FLOW_TEMP,
+                        default=self.config_entry.options.get(
+                            CONF_DESIGN_FLOW_TEMP, COMPENSATION_DESIGN_FLOW_TEMP
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=MIN_FLOW_TEMP,
+                            max=MAX_FLOW_TEMP,
+                            step=1,
+                            unit_of_measurement="°C",
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_COMPENSATION_WRITES,
+                        default=self.config_entry.options.get(
+                            CONF_COMPENSATION_WRITES, COMPENSATION_WRITES_PER_HOUR
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=1,
+                            max=12,
+                            step=1,
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
+                }
+            ),
         )
-        await client.async_get_data()  # Exercise credentials 1
-        await client.async_get_data()  # Exercise credentials 2
-        await client.async_get_data()  # Exercise credentials 3
@@ -8,15 +8,31 @@ LOGGER: Logger = getLogger(__package__)
 NAME = "Ecodan Heat Pump"
 DOMAIN = "ecodan_heat_pump"
 
+# The MELCloud accounts shared by the config entries, next to the coordinators
+# in hass.data[DOMAIN], which are keyed by config entry
+DATA_ACCOUNTS = f"{DOMAIN}_accounts"
+
 MIN_FLOW_TEMP = 25
 MAX_FLOW_TEMP = 60
 
 # 5 minute interval per credential = 100s
 COORDINATOR_UPDATE_INTERVAL = timedelta(seconds=(5 * 60) / 3)
 
-# A 10s delay before requesting a refresh to allow the heat pump to react
+# Most refreshes only get the live values of the device. The full ListDevices
+# structure, with the energy reports and configuration, is refreshed less often
+SLOW_UPDATE_INTERVAL = timedelta(minutes=30)
+
+# A 5s delay before the first refresh after a command, to allow the heat pump to
+# react, until enough actuation latencies are known to adapt it
 COORDINATOR_REFRESH_DELAY = 5
 
+# Further refreshes to confirm a command back off up to a maximum delay and give
+# up after a timeout
+ACTUATION_MIN_DELAY = 2
+ACTUATION_MAX_DELAY = 30
+ACTUATION_BACKOFF = 1.5
+ACTUATION_TIMEOUT = 300
+
 USERNAME_1 = "username_1"
 PASSWORD_1 = "password_1"
 
@@ -25,3 +41,113 @@ PASSWORD_2 = "password_2"
 
 USERNAME_3 = "username_3"
 PASSWORD_3 = "password_3"
+
+# Commands queued while MELCloud is unreachable are dropped after a day
+JOURNAL_MAX_AGE = 24 * 60 * 60
+
+# The timeout for a single request to the MELCloud API
+REQUEST_TIMEOUT = 10
+
+# A slow ListDevices or Device/Get request is repeated with the next credentials after the
+# p95 of recent latencies (or a default until enough are known)
+HEDGE_DEFAULT_DELAY = 3
+HEDGE_MIN_DELAY = 1
+HEDGE_MIN_SAMPLES = 10
+HEDGE_HISTORY = 100
+
+# The circuit breaker opens after consecutive communication failures and then
+# probes MELCloud with a jittered exponential backoff, up to 30 minutes
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_BASE_DELAY = 60
+CIRCUIT_MAX_DELAY = 30 * 60
+
+# Requests are admitted by priority, at most three at once, within a budget of
+# one request every 10 seconds (bursting to 10). Background and bulk requests
+# keep one slot and 3 requests of the budget free for user commands
+SCHEDULER_MAX_CONCURRENT = 3
+SCHEDULER_RATE = 1 / 10
+SCHEDULER_BURST = 10
+SCHEDULER_RESERVE = 3
+
+# The connection pool to MELCloud allows one connection per set of credentials,
+# caches DNS lookups and keeps idle connections open. For a while after a
+# command, when another one is likely, an idle pool is warmed up shortly before
+# the keep-alive expires, so that the next command does not wait for DNS and TLS
+CONNECTIONS_PER_CREDENTIALS = 1
+DNS_CACHE_TTL = 10 * 60
+KEEPALIVE_TIMEOUT = 60
+WARM_UP_MARGIN = 5
+WARM_UP_AFTER_COMMAND = 10 * 60
+
+# Daily energy reports are backfilled a month at a time, pausing between chunks,
+# and the last week is backfilled on start-up to close gaps from any downtime
+BACKFILL_CHUNK_DAYS = 31
+BACKFILL_CHUNK_DELAY = 10
+BACKFILL_STARTUP_DAYS = 7
+
+# Snapshots are written to the telemetry archive in blocks of about an hour
+ARCHIVE_BLOCK_ROWS = 36
+
+# The expected COP is only reported once the model has seen enough samples
+COP_MIN_SAMPLES = 20
+COP_RIDGE = 1e-6
+
+# The boost planner searches the price forecast in 15 minute slots. Until the
+# tank has been seen boosting and cooling, it assumes it heats 10°C an hour and
+# cools 0.5°C an hour. The learnt rates follow new observations gradually, and
+# the heating rate is learnt per 5°C band of outdoor temperature
+PLANNER_SLOT = timedelta(minutes=15)
+PLANNER_HEAT_RATE = 10.0
+PLANNER_COOL_RATE = 0.5
+PLANNER_MIN_TANK_TEMP = 20
+PLANNER_RATE_SMOOTHING = 0.1
+PLANNER_OUTDOOR_BAND = 5
+
+# Anomalies are flagged when the smoothed value of a field is 4 standard
+# deviations from its mean for the operating mode and 5°C band of outdoor
+# temperature, once 100 samples have been seen, or when a value that should
+# have started changing, e.g. after its target changed, has not changed for an
+# hour of the device's time
+ANOMALY_OUTDOOR_BAND = 5
+ANOMALY_MIN_SAMPLES = 100
+ANOMALY_THRESHOLD = 4
+ANOMALY_SMOOTHING = 0.2
+ANOMALY_STUCK_TIME = 60 * 60
+
+# With a daily bandwidth budget, polling slows down to stay within the budget
+# less a 10% reserve for commands, pacing by the smoothed bytes per update.
+# Large responses (over 1 kB) should always be compressed
+BANDWIDTH_COMMAND_RESERVE = 0.1
+BANDWIDTH_SMOOTHING = 0.1
+BANDWIDTH_UNCOMPRESSED_WARNING = 1024
+
+# Weather compensation follows a heating curve that reaches the minimum flow
+# temperature at 20°C outdoors. The outdoor temperature is smoothed and only
+# moves the curve once it changes by 0.5°C, and the flow temperature is written
+# in whole degrees, by default at most twice an hour
+COMPENSATION_BALANCE_TEMP = 20
+COMPENSATION_HYSTERESIS = 0.5
+COMPENSATION_SMOOTHING = 0.1
+COMPENSATION_STEP = 1
+COMPENSATION_DESIGN_OUTDOOR_TEMP = -10
+COMPENSATION_DESIGN_FLOW_TEMP = 45
+COMPENSATION_WRITES_PER_HOUR = 2
+
+CONF_ARCHIVE = "archive"
+CONF_PRICE_ENTITY = "price_entity"
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_FULL_UPDATE_INTERVAL = "full_update_interval"
+CONF_DAILY_BANDWIDTH = "daily_bandwidth"
+CONF_COMPENSATION = "weather_compensation"
+CONF_DESIGN_OUTDOOR_TEMP = "design_outdoor_temperature"
+CONF_DESIGN_FLOW_TEMP = "design_flow_temperature"
+CONF_COMPENSATION_WRITES = "compensation_writes_per_hour"
+CONF_ENTITY_PROFILE = "entity_profile"
+
+SERVICE_PROFILE = "profile"
+SERVICE_BACKFILL_ENERGY = "backfill_energy"
+SERVICE_ENSURE_FRESH = "ensure_fresh"
+ATTR_CYCLES = "cycles"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_MAX_AGE = "max_age"
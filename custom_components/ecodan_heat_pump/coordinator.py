@@ -3,27 +3,86 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from collections.abc import Mapping
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 from homeassistant.exceptions import ConfigEntryAuthFailed
 
+from custom_components.ecodan_heat_pump.actuation import (
+    Actuation,
+    ActuationTracker,
+)
+from custom_components.ecodan_heat_pump.analytics import HISTORY_COLUMNS, CopModel
+from custom_components.ecodan_heat_pump.anomaly import AnomalyDetector
 from custom_components.ecodan_heat_pump.api import ApiClient
+from custom_components.ecodan_heat_pump.archive import TelemetryArchive, iter_blocks
+from custom_components.ecodan_heat_pump.backfill import EnergyBackfill
+from custom_components.ecodan_heat_pump.bandwidth import seconds_left_today
+from custom_components.ecodan_heat_pump.compensation import CompensationController
 from custom_components.ecodan_heat_pump.errors import (
     ApiClientAuthenticationException,
+    ApiClientCommunicationException,
     ApiClientException,
 )
 from custom_components.ecodan_heat_pump.const import (
+    ACTUATION_BACKOFF,
+    ACTUATION_MAX_DELAY,
+    ACTUATION_MIN_DELAY,
+    ACTUATION_TIMEOUT,
+    ANOMALY_STUCK_TIME,
+    BANDWIDTH_SMOOTHING,
+    COMPENSATION_DESIGN_FLOW_TEMP,
+    COMPENSATION_DESIGN_OUTDOOR_TEMP,
+    COMPENSATION_WRITES_PER_HOUR,
+    CONF_ARCHIVE,
+    CONF_COMPENSATION,
+    CONF_COMPENSATION_WRITES,
+    CONF_DAILY_BANDWIDTH,
+    CONF_DESIGN_FLOW_TEMP,
+    CONF_DESIGN_OUTDOOR_TEMP,
+    CONF_ENTITY_PROFILE,
+    CONF_FULL_UPDATE_INTERVAL,
+    CONF_PRICE_ENTITY,
+    CONF_UPDATE_INTERVAL,
     COORDINATOR_REFRESH_DELAY,
     COORDINATOR_UPDATE_INTERVAL,
     DOMAIN,
     LOGGER,
+    SLOW_UPDATE_INTERVAL,
+    WARM_UP_AFTER_COMMAND,
+    WARM_UP_MARGIN,
 )
+from custom_components.ecodan_heat_pump.journal import CommandJournal
 from custom_components.ecodan_heat_pump.models import HeatPumpState, HeatingMode
+from custom_components.ecodan_heat_pump.planner import BoostPlanner
+from custom_components.ecodan_heat_pump.profiler import write_results
+from custom_components.ecodan_heat_pump.profiles import EntityProfile
+from custom_components.ecodan_heat_pump.scheduler import (
+    RequestPriority,
+    with_priority,
+)
+from custom_components.ecodan_heat_pump.transitions import TransitionDetector
+
+if TYPE_CHECKING:
+    from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+
+
+def has_current_energy(state: HeatPumpState) -> bool:
+    """Return whether a snapshot's current energy rates came with its temperatures.
+
+    Only then is its COP up to date with the temperatures, e.g. on a full
+    refresh, or on a live one if the device reports the rates to Device/Get.
+    """
+    return state.current_energy_updated_at == state.last_communication
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
@@ -36,9 +95,36 @@ class Coordinator(DataUpdateCoordinator):
         self,
         hass: HomeAssistant,
         client: ApiClient,
+        journal: CommandJournal,
+        backfill: EnergyBackfill,
+        cop_model: CopModel,
+        anomalies: AnomalyDetector,
+        archive: TelemetryArchive | None = None,
+        accounts: AccountRegistry | None = None,
     ) -> None:
         """Initialize."""
         self.client = client
+        self.journal = journal
+        self.backfill = backfill
+        self.cop_model = cop_model
+        self.anomalies = anomalies
+        self.archive = archive
+        self.accounts = accounts
+        self.profiler = client.profiler
+        self.actuations = ActuationTracker()
+        self.transitions = TransitionDetector(hass)
+        self.planner: BoostPlanner | None = None
+        self.compensation: CompensationController | None = None
+        self.entity_profile = EntityProfile.STANDARD
+        self._unsub_warm_up: CALLBACK_TYPE | None = None
+        self._command_sent_at: float | None = None
+        self._slow_updated_at: float | None = None
+        self._live_refresh = False
+        self.slow_update_interval = SLOW_UPDATE_INTERVAL
+        self._configured_update_interval = COORDINATOR_UPDATE_INTERVAL
+        self._update_bytes: float | None = None
+        self.updated_at: float | None = None
+        self._refreshing: asyncio.Future | None = None
         super().__init__(
             hass=hass,
             logger=LOGGER,
@@ -48,12 +134,341 @@ class Coordinator(DataUpdateCoordinator):
 
     async def _async_update_data(self):
         """Refresh the data in the coordinator using the underlying API client."""
+        with self.profiler.span("_async_update_data"):
+            total = self.client.bandwidth.total
+            try:
+                heat_pump_state = await self._async_get_data()
+                return await self._async_process(heat_pump_state)
+            except ApiClientAuthenticationException as exception:
+                raise ConfigEntryAuthFailed(exception) from exception
+            except ApiClientException as exception:
+                raise UpdateFailed(exception) from exception
+            finally:
+                self._record_update_bytes(self.client.bandwidth.total - total)
+                # Polling may have been disabled by setting no interval
+                if self.update_interval is not None:
+                    self.update_interval = self._paced_update_interval()
+
+    async def _async_process(
+        self, heat_pump_state: HeatPumpState, fetched: bool = True
+    ) -> HeatPumpState:
+        """Feed a new snapshot to the trackers and models, and act on it.
+
+        Only the coordinator that fetched the snapshot replays queued commands
+        and fires transition events, and only one coordinator of an account
+        runs the weather compensation, so that config entries sharing an
+        account do not repeat them for each other.
+        """
+        self.updated_at = time.monotonic()
+        if fetched and self.journal:
+            await self._async_replay_journal(heat_pump_state)
+        heat_pump_state = self.actuations.observe(heat_pump_state)
+        self.anomalies.observe(heat_pump_state)
+        self.transitions.observe(heat_pump_state, fire=fetched)
+        if self.archive is not None:
+            await self.archive.async_append(heat_pump_state)
+        await self.cop_model.async_refit()
+        if (
+            self.compensation is not None
+            and not self.actuations.pending
+            and (self.accounts is None or self.accounts.compensates(self))
+        ):
+            if (target := self.compensation.observe(heat_pump_state)) is not None:
+                self.config_entry.async_create_background_task(
+                    self.hass,
+                    self._async_compensate(target),
+                    f"{DOMAIN} weather compensation",
+                )
+        return heat_pump_state
+
+    async def _async_compensate(self, temperature: float) -> None:
+        try:
+            await self.async_set_flow_temperature(temperature)
+        except ApiClientException as exception:
+            LOGGER.warning(
+                f"Failed to set the compensated flow temperature: {exception}"
+            )
+
+    @callback
+    def async_set_shared_data(self, heat_pump_state: HeatPumpState, full: bool) -> None:
+        """Use a snapshot fetched for another config entry of the same account.
+
+        Setting the data postpones this coordinator's own next poll by a whole
+        update interval, unless it has queued commands: those are replayed by
+        a poll of its own.
+        """
+        if full:
+            self._slow_updated_at = time.monotonic()
+        if has_current_energy(heat_pump_state):
+            self.cop_model.add(heat_pump_state)
+        if self.journal:
+            self.config_entry.async_create_background_task(
+                self.hass, self.async_request_refresh(), f"{DOMAIN} replay"
+            )
+            return
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_set_shared_data(heat_pump_state),
+            f"{DOMAIN} shared update",
+        )
+
+    async def _async_set_shared_data(self, heat_pump_state: HeatPumpState) -> None:
         try:
-            return await self.client.async_get_data()
-        except ApiClientAuthenticationException as exception:
-            raise ConfigEntryAuthFailed(exception) from exception
+            heat_pump_state = await self._async_process(heat_pump_state, fetched=False)
         except ApiClientException as exception:
-            raise UpdateFailed(exception) from exception
+            LOGGER.warning(f"Failed to process a shared update: {exception}")
+            return
+        self.async_set_updated_data(heat_pump_state)
+
+    def _record_update_bytes(self, update_bytes: int) -> None:
+        """Smooth the bytes used per update, which vary with the kind of update."""
+        if update_bytes <= 0:
+            return
+        if self._update_bytes is None:
+            self._update_bytes = update_bytes
+        else:
+            self._update_bytes += BANDWIDTH_SMOOTHING * (
+                update_bytes - self._update_bytes
+            )
+
+    def _paced_update_interval(self) -> timedelta:
+        """Return the update interval that spreads the day's budget until midnight.
+
+        Polling is never faster than configured. Once the budget for polling is
+        used up, it resumes after midnight, leaving the rest for commands.
+        """
+        remaining = self.client.bandwidth.telemetry_remaining
+        if remaining is None or self._update_bytes is None:
+            return self._configured_update_interval
+        seconds_left = seconds_left_today()
+        if remaining < self._update_bytes:
+            return timedelta(seconds=seconds_left + 1)
+        return max(
+            self._configured_update_interval,
+            timedelta(seconds=self._update_bytes * seconds_left / remaining),
+        )
+
+    async def _async_get_data(self) -> HeatPumpState:
+        """Get the live values of the device, or everything if it is time to.
+
+        A refresh that only looks for the device confirming a command gets the
+        live values, leaving the full refresh to the next scheduled one.
+        """
+        now = time.monotonic()
+        live_refresh, self._live_refresh = self._live_refresh, False
+        if (
+            self.data is None
+            or self._slow_updated_at is None
+            or (
+                not live_refresh
+                and now - self._slow_updated_at
+                >= self.slow_update_interval.total_seconds()
+            )
+        ):
+            heat_pump_state = await self.client.async_get_data()
+            self._slow_updated_at = now
+            full = True
+        else:
+            heat_pump_state = await self.client.async_get_live_data(self.data)
+            full = False
+        if has_current_energy(heat_pump_state):
+            self.cop_model.add(heat_pump_state)
+        if self.accounts is not None:
+            self.accounts.share(self, heat_pump_state, full)
+        return heat_pump_state
+
+    async def _async_refresh(self, *args, **kwargs) -> None:
+        """Refresh the data and write the profiling results after the last profiled cycle."""
+        # Let callers of async_ensure_fresh join this refresh
+        self._refreshing = refreshing = self.hass.loop.create_future()
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            refreshing.set_result(None)
+            if self._refreshing is refreshing:
+                self._refreshing = None
+        self._async_schedule_warm_up()
+        if (session := self.profiler.cycle_completed()) is not None:
+            paths = await self.hass.async_add_executor_job(write_results, session)
+            LOGGER.info(f"Profiling results written to {', '.join(paths)}")
+
+    @property
+    def age(self) -> float | None:
+        """Return the seconds since the snapshot was fetched, if it ever was."""
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    @with_priority(RequestPriority.INTERACTIVE)
+    async def async_ensure_fresh(self, max_age: float) -> bool:
+        """Make sure the snapshot is at most max_age seconds old.
+
+        Returns straight away if it is, joins the refresh in progress if there
+        is one, and only refreshes otherwise. Returns whether it had to wait.
+        """
+        if (age := self.age) is not None and age <= max_age:
+            return False
+        if self._refreshing is not None:
+            await asyncio.shield(self._refreshing)
+        else:
+            await self.async_refresh()
+        return True
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, i.e. write the entity states."""
+        with self.profiler.span("entity_writes"):
+            super().async_update_listeners()
+
+    async def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the options to the running coordinator, without reloading anything."""
+        self.entity_profile = EntityProfile(
+            options.get(CONF_ENTITY_PROFILE, EntityProfile.STANDARD.value)
+        )
+        self._configured_update_interval = timedelta(
+            seconds=options.get(
+                CONF_UPDATE_INTERVAL, COORDINATOR_UPDATE_INTERVAL.total_seconds()
+            )
+        )
+        daily_budget = int(options.get(CONF_DAILY_BANDWIDTH, 0) * 1_000_000) or None
+        if self.accounts is not None:
+            # The budget is the account's, which all of its entries draw on
+            self.accounts.set_bandwidth_budget(self.config_entry.entry_id, daily_budget)
+        else:
+            self.client.bandwidth.daily_budget = daily_budget
+        update_interval = self._paced_update_interval()
+        if update_interval != self.update_interval:
+            self.update_interval = update_interval
+            if self._listeners:
+                self._schedule_refresh()
+        self.slow_update_interval = timedelta(
+            minutes=options.get(
+                CONF_FULL_UPDATE_INTERVAL, SLOW_UPDATE_INTERVAL.total_seconds() / 60
+            )
+        )
+        # The flow and return temperatures only change on a full refresh
+        self.anomalies.stuck_time = max(
+            ANOMALY_STUCK_TIME, 2 * self.slow_update_interval.total_seconds()
+        )
+
+        # Start or stop archiving
+        if options.get(CONF_ARCHIVE, False) and self.archive is None:
+            self.archive = TelemetryArchive(
+                self.hass,
+                self.hass.config.path(f"{DOMAIN}_archive", self.config_entry.entry_id),
+            )
+        elif not options.get(CONF_ARCHIVE, False) and self.archive is not None:
+            await self.archive.async_flush()
+            self.archive = None
+
+        # Start, stop or reconfigure the weather compensation
+        if options.get(CONF_COMPENSATION, False):
+            if self.compensation is None:
+                self.compensation = CompensationController(
+                    COMPENSATION_DESIGN_OUTDOOR_TEMP,
+                    COMPENSATION_DESIGN_FLOW_TEMP,
+                    COMPENSATION_WRITES_PER_HOUR,
+                )
+            self.compensation.design_outdoor_temperature = options.get(
+                CONF_DESIGN_OUTDOOR_TEMP, COMPENSATION_DESIGN_OUTDOOR_TEMP
+            )
+            self.compensation.design_flow_temperature = options.get(
+                CONF_DESIGN_FLOW_TEMP, COMPENSATION_DESIGN_FLOW_TEMP
+            )
+            self.compensation.writes_per_hour = int(
+                options.get(CONF_COMPENSATION_WRITES, COMPENSATION_WRITES_PER_HOUR)
+            )
+        else:
+            self.compensation = None
+
+        # Replace the planner when the price entity changes
+        price_entity = options.get(CONF_PRICE_ENTITY)
+        if price_entity != (self.planner.price_entity if self.planner else None):
+            if self.planner is not None:
+                self.planner.async_stop()
+                self.planner = None
+            if price_entity:
+                self.planner = BoostPlanner(self.hass, self, price_entity)
+                await self.planner.async_load()
+                if self.data is not None:
+                    self.planner.async_start()
+
+    @callback
+    def _async_schedule_warm_up(self) -> None:
+        """Keep the connection to MELCloud open while another command is expected.
+
+        For a while after a command, a request is made shortly before the
+        connection pool would close the idle connection, unless a poll is due
+        by then anyway. Otherwise the connection is left to close.
+        """
+        if self._unsub_warm_up is not None:
+            self._unsub_warm_up()
+            self._unsub_warm_up = None
+        now = time.monotonic()
+        if (
+            self._command_sent_at is None
+            or now - self._command_sent_at > WARM_UP_AFTER_COMMAND
+        ):
+            return
+        warm_up_in = max(self.client.keepalive_left - WARM_UP_MARGIN, 0)
+        if self.update_interval is not None and self.updated_at is not None:
+            poll_in = self.updated_at + self.update_interval.total_seconds() - now
+            if poll_in <= warm_up_in + WARM_UP_MARGIN:
+                return
+        self._unsub_warm_up = async_call_later(
+            self.hass, warm_up_in, self._async_warm_up
+        )
+
+    async def _async_warm_up(self, _) -> None:
+        self._unsub_warm_up = None
+        await self.client.async_warm_up()
+        self._async_schedule_warm_up()
+
+    @callback
+    def async_start_backfill(self, start: date, end: date) -> None:
+        """Backfill the daily energy statistics for a range of days in the background."""
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_backfill(start, end),
+            f"{DOMAIN} energy backfill",
+        )
+
+    async def _async_backfill(self, start: date, end: date) -> None:
+        try:
+            await self.backfill.async_run(self.data.device_id, start, end)
+        except ApiClientException as exception:
+            LOGGER.warning(f"Failed to backfill the energy reports: {exception}")
+
+    @callback
+    def async_start_cop_history_fit(self) -> None:
+        """Fit the COP model to the archived history in the background."""
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self.cop_model.async_fit_history(
+                iter_blocks(self.archive.directory, columns=HISTORY_COLUMNS)
+            ),
+            f"{DOMAIN} fit COP model",
+        )
+
+    async def async_shutdown(self) -> None:
+        """Stop refreshing, warming up and planning, write the archive and release the client."""
+        await super().async_shutdown()
+        if self._unsub_warm_up is not None:
+            self._unsub_warm_up()
+            self._unsub_warm_up = None
+        if self.planner is not None:
+            self.planner.async_stop()
+        if self.archive is not None:
+            await self.archive.async_flush()
+        if self.accounts is not None:
+            await self.accounts.async_release(self.config_entry.entry_id)
+        else:
+            await self.client.async_close()
+
+    async def async_start_profiling(self, cycles: int, path_prefix: str) -> None:
+        """Profile the next coordinator cycles, starting with an immediate refresh."""
+        self.profiler.start(cycles, path_prefix)
+        await self.async_request_refresh()
 
     async def async_toggle_heat_pump_power(self, power: bool):
         """Toggle the heat pump power on or off."""
@@ -61,19 +476,26 @@ class Coordinator(DataUpdateCoordinator):
         # Get the heat pump state from the coordinator
         heat_pump_state: HeatPumpState = self.data
 
-        # Toggle the heat pump power using the API
-        has_power = await self.client.async_toggle_heat_pump_power(
-            deviceId=heat_pump_state.device_id,
-            power=power,
-        )
+        # Toggle the heat pump power using the API, or queue it while MELCloud is unreachable
+        try:
+            has_power = await self.client.async_toggle_heat_pump_power(
+                deviceId=heat_pump_state.device_id,
+                power=power,
+            )
+        except ApiClientCommunicationException as exception:
+            self._async_queue_command("has_power", power, exception)
+            return
 
         # Update the coordinator data
         heat_pump_state.has_power = has_power
         self.async_set_updated_data(heat_pump_state)
 
-        # Request a state update
-        await asyncio.sleep(COORDINATOR_REFRESH_DELAY)
-        await self.async_request_refresh()
+        # Confirm the change from the device's later state updates
+        self._async_confirm_actuation(
+            self.actuations.start(
+                "toggle_heat_pump_power", "has_power", has_power, heat_pump_state
+            )
+        )
 
         return
 
@@ -83,19 +505,29 @@ class Coordinator(DataUpdateCoordinator):
         # Get the heat pump state from the coordinator
         heat_pump_state: HeatPumpState = self.data
 
-        # Toggle the heat pump power using the API
-        is_forced_to_heat_water = await self.client.async_toggle_water_heating(
-            deviceId=heat_pump_state.device_id,
-            heat_water=heat_water,
-        )
+        # Toggle the heat pump power using the API, or queue it while MELCloud is unreachable
+        try:
+            is_forced_to_heat_water = await self.client.async_toggle_water_heating(
+                deviceId=heat_pump_state.device_id,
+                heat_water=heat_water,
+            )
+        except ApiClientCommunicationException as exception:
+            self._async_queue_command("is_forced_to_heat_water", heat_water, exception)
+            return
 
         # Update the coordinator data
         heat_pump_state.is_forced_to_heat_water = is_forced_to_heat_water
         self.async_set_updated_data(heat_pump_state)
 
-        # Request a state update
-        await asyncio.sleep(COORDINATOR_REFRESH_DELAY)
-        await self.async_request_refresh()
+        # Confirm the change from the device's later state updates
+        self._async_confirm_actuation(
+            self.actuations.start(
+                "toggle_water_heating",
+                "is_forced_to_heat_water",
+                is_forced_to_heat_water,
+                heat_pump_state,
+            )
+        )
 
         return
 
@@ -105,19 +537,26 @@ class Coordinator(DataUpdateCoordinator):
         # Get the heat pump state from the coordinator
         heat_pump_state: HeatPumpState = self.data
 
-        # Set the heat pump operation mode using the API
-        heating_mode = await self.client.async_set_heating_mode(
-            deviceId=heat_pump_state.device_id,
-            heating_mode=heating_mode,
-        )
+        # Set the heat pump operation mode using the API, or queue it while MELCloud is unreachable
+        try:
+            heating_mode = await self.client.async_set_heating_mode(
+                deviceId=heat_pump_state.device_id,
+                heating_mode=heating_mode,
+            )
+        except ApiClientCommunicationException as exception:
+            self._async_queue_command("heating_mode", heating_mode, exception)
+            return
 
         # Update the coordinator data
         heat_pump_state.heating_mode = heating_mode
         self.async_set_updated_data(heat_pump_state)
 
-        # Request a state update
-        await asyncio.sleep(COORDINATOR_REFRESH_DELAY)
-        await self.async_request_refresh()
+        # Confirm the change from the device's later state updates
+        self._async_confirm_actuation(
+            self.actuations.start(
+                "set_heating_mode", "heating_mode", heating_mode, heat_pump_state
+            )
+        )
 
         return
 
@@ -127,19 +566,122 @@ class Coordinator(DataUpdateCoordinator):
         # Get the heat pump state from the coordinator
         heat_pump_state: HeatPumpState = self.data
 
-        # Set the heat pump operation mode using the API
-        target_flow_temperature = await self.client.async_set_flow_temperature(
-            deviceId=heat_pump_state.device_id,
-            flow_temperature=temperature,
-            hot_water_temperature=heat_pump_state.target_water_tank_temperature,
-        )
+        # Set the heat pump operation mode using the API, or queue it while MELCloud is unreachable
+        try:
+            target_flow_temperature = await self.client.async_set_flow_temperature(
+                deviceId=heat_pump_state.device_id,
+                flow_temperature=temperature,
+                hot_water_temperature=heat_pump_state.target_water_tank_temperature,
+            )
+        except ApiClientCommunicationException as exception:
+            self._async_queue_command("target_flow_temperature", temperature, exception)
+            return
 
         # Update the coordinator data
         heat_pump_state.target_flow_temperature = target_flow_temperature
         self.async_set_updated_data(heat_pump_state)
 
-        # Request a state update
-        await asyncio.sleep(COORDINATOR_REFRESH_DELAY)
-        await self.async_request_refresh()
+        # Confirm the change from the device's later state updates
+        self._async_confirm_actuation(
+            self.actuations.start(
+                "set_flow_temperature",
+                "target_flow_temperature",
+                target_flow_temperature,
+                heat_pump_state,
+            )
+        )
 
         return
+
+    @callback
+    def _async_queue_command(
+        self, field: str, value: object, exception: ApiClientException
+    ) -> None:
+        """Queue a command until MELCloud is reachable and show its value meanwhile."""
+        LOGGER.warning(
+            f"MELCloud is unreachable ({exception}), queueing '{field}' = '{value}'..."
+        )
+        self.journal.record(field, value)
+        heat_pump_state: HeatPumpState = self.data
+        setattr(heat_pump_state, field, value)
+        self.async_set_updated_data(heat_pump_state)
+
+    async def _async_replay_journal(self, heat_pump_state: HeatPumpState) -> None:
+        """Apply the queued commands with a single request now MELCloud is reachable."""
+        # Commands may be queued while the replay runs, and are kept for later
+        queued = self.journal.queued()
+        if changes := self.journal.changes():
+            try:
+                applied = await self.client.async_apply_settings(
+                    deviceId=heat_pump_state.device_id,
+                    changes=changes,
+                    hot_water_temperature=heat_pump_state.target_water_tank_temperature,
+                )
+            except ApiClientCommunicationException as exception:
+                LOGGER.warning(
+                    f"Failed to replay queued commands, will retry: {exception}"
+                )
+                return
+            except ApiClientAuthenticationException:
+                raise
+            except ApiClientException as exception:
+                LOGGER.error(
+                    f"Failed to replay queued commands, dropping them: {exception}"
+                )
+            else:
+                LOGGER.info(f"Replayed queued commands: {applied}")
+                for field, value in applied.items():
+                    self._async_confirm_actuation(
+                        self.actuations.start("replay", field, value, heat_pump_state)
+                    )
+        await self.journal.async_remove(queued)
+
+    def _async_confirm_actuation(self, actuation: Actuation) -> None:
+        """Refresh on an adaptive schedule until the device confirms a command."""
+        # A command that reached MELCloud supersedes any queued value for its
+        # field. The replay removes the values it sent itself, keeping those
+        # queued while it ran
+        if actuation.command != "replay":
+            self.journal.discard(actuation.field)
+        self._command_sent_at = time.monotonic()
+        self._async_schedule_warm_up()
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_poll_for_confirmation(actuation),
+            f"{DOMAIN} confirm {actuation.command}",
+        )
+
+    async def _async_poll_for_confirmation(self, actuation: Actuation) -> None:
+        delay = min(
+            max(
+                self.actuations.first_delay(COORDINATOR_REFRESH_DELAY),
+                ACTUATION_MIN_DELAY,
+            ),
+            ACTUATION_MAX_DELAY,
+        )
+        deadline = actuation.sent_at + ACTUATION_TIMEOUT
+        while True:
+            # Scheduled refreshes may confirm the command while waiting
+            try:
+                await asyncio.wait_for(actuation.confirmed.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                break
+            if time.monotonic() >= deadline:
+                LOGGER.warning(
+                    f"The heat pump did not confirm '{actuation.command}' within "
+                    f"{ACTUATION_TIMEOUT}s"
+                )
+                self.actuations.stop(actuation)
+                break
+            self._live_refresh = True
+            await self.async_refresh()
+            if actuation.confirmed.is_set():
+                break
+            delay = min(delay * ACTUATION_BACKOFF, ACTUATION_MAX_DELAY)
+
+        if actuation.latency is not None:
+            LOGGER.debug(
+                f"The heat pump confirmed '{actuation.command}' after {actuation.latency:.1f}s"
+            )
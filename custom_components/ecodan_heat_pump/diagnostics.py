@@ -0,0 +1,40 @@
+"""Diagnostics support for ecodan_heat_pump."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.ecodan_heat_pump.const import (
+    DOMAIN,
+    PASSWORD_1,
+    PASSWORD_2,
+    PASSWORD_3,
+    USERNAME_1,
+    USERNAME_2,
+    USERNAME_3,
+)
+
+if TYPE_CHECKING:
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
+
+TO_REDACT = {USERNAME_1, PASSWORD_1, USERNAME_2, PASSWORD_2, USERNAME_3, PASSWORD_3}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry, including the API request metrics."""
+    coordinator: Coordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "metrics": coordinator.client.metrics.as_dict(),
+        "circuit_breaker": coordinator.client.circuit_breaker.as_dict(),
+        "scheduler": coordinator.client.scheduler.as_dict(),
+        "bandwidth": coordinator.client.bandwidth.as_dict(),
+        "data": asdict(coordinator.data) if coordinator.data is not None else None,
+    }
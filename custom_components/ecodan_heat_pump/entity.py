@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.ecodan_heat_pump.const import DOMAIN, NAME
-from custom_components.ecodan_heat_pump.coordinator import (
-    Coordinator,
-)
+from custom_components.ecodan_heat_pump.profiles import is_enabled
+
+if TYPE_CHECKING:
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
 
 
 class EcodanHeatPumpEntity(CoordinatorEntity):
@@ -23,3 +26,12 @@ class EcodanHeatPumpEntity(CoordinatorEntity):
             name=NAME,
             manufacturer=NAME,
         )
+
+    @property
+    def entity_registry_enabled_default(self) -> bool:
+        """Return whether the entry's entity profile enables the entity when it is registered."""
+        return is_enabled(
+            self.coordinator.entity_profile,
+            self.coordinator.config_entry.entry_id,
+            self.unique_id,
+        )
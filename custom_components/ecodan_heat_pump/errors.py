@@ -10,5 +10,13 @@ class ApiClientAuthenticationException(ApiClientException):
     """Exception to indicate an authentication error."""
 
 
+class ApiClientCircuitOpenException(ApiClientCommunicationException):
+    """Exception to indicate that requests are failing fast during an outage."""
+
+
+class ApiClientBandwidthException(ApiClientException):
+    """Exception to indicate that a bulk request would overrun the bandwidth budget."""
+
+
 class UnrecognisedPresetModeException(Exception):
     """Exception to indicate that a preset mode was unrecognised."""
@@ -0,0 +1,79 @@
+"""A persisted journal of commands issued while MELCloud was unreachable."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.ecodan_heat_pump.const import DOMAIN, JOURNAL_MAX_AGE
+from custom_components.ecodan_heat_pump.models import HeatingMode
+
+STORAGE_VERSION = 1
+
+# Delay saving so that a burst of commands is written once
+SAVE_DELAY = 1
+
+
+class CommandJournal:
+    """The latest queued value of each heat pump state field, persisted across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:  # noqa: D107
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.journal")
+        self._changes: dict[str, dict[str, Any]] = {}
+
+    def __bool__(self) -> bool:
+        """Return whether any commands are queued."""
+        return bool(self._changes)
+
+    async def async_load(self) -> None:
+        """Load the queued commands from storage."""
+        if (data := await self._store.async_load()) is not None:
+            self._changes = data["changes"]
+
+    def record(self, field: str, value: Any) -> None:
+        """Queue a value for a field, replacing any earlier value."""
+        self._changes[field] = {
+            "value": value.value if isinstance(value, HeatingMode) else value,
+            "issued_at": dt_util.utcnow().isoformat(),
+        }
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def discard(self, field: str) -> None:
+        """Remove the queued value for a field, e.g. because it has been superseded."""
+        if self._changes.pop(field, None) is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def changes(self) -> dict[str, Any]:
+        """Return the queued values by field, dropping any that are too old to apply."""
+        cutoff = dt_util.utcnow() - timedelta(seconds=JOURNAL_MAX_AGE)
+        return {
+            field: (
+                HeatingMode(change["value"])
+                if field == "heating_mode"
+                else change["value"]
+            )
+            for field, change in self._changes.items()
+            if datetime.fromisoformat(change["issued_at"]) >= cutoff
+        }
+
+    def queued(self) -> dict[str, dict[str, Any]]:
+        """Return the queued commands as they are now, to remove them once replayed."""
+        return dict(self._changes)
+
+    async def async_remove(self, queued: dict[str, dict[str, Any]]) -> None:
+        """Remove the given queued commands, keeping any that replaced them since."""
+        for field, change in queued.items():
+            # Recording a value replaces the field's entry rather than changing it
+            if self._changes.get(field) is change:
+                del self._changes[field]
+        if self._changes:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        else:
+            await self._store.async_remove()
+
+    def _data_to_save(self) -> dict:
+        return {"changes": self._changes}
@@ -0,0 +1,154 @@
+"""Request-level metrics for the MELCloud API client."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+# Upper bounds of the latency histogram buckets in seconds, with a final
+# overflow bucket for anything slower
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+
+
+@dataclass
+class RequestMetrics:
+    """Metrics for the requests to one endpoint with one set of credentials."""
+
+    requests: int = 0
+    total_latency: float = 0.0
+    latency_histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+    bytes_received: int = 0
+    status_codes: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def timeouts(self) -> int:
+        """Return the number of requests that timed out."""
+        return self.status_codes.get(STATUS_TIMEOUT, 0)
+
+    @property
+    def failures(self) -> int:
+        """Return the number of requests that did not succeed, excluding cancellations."""
+        return sum(
+            count
+            for status, count in self.status_codes.items()
+            if not status.startswith("2") and status != STATUS_CANCELLED
+        )
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Return the mean latency in seconds."""
+        return self.total_latency / self.requests if self.requests else None
+
+    def latency_quantile(self, quantile: float) -> float | None:
+        """Estimate a latency quantile as the upper bound of its histogram bucket."""
+        if self.requests == 0:
+            return None
+        target = quantile * self.requests
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_histogram):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return None
+
+    def record(self, status: str, latency: float, bytes_received: int) -> None:
+        """Record a single request."""
+        self.requests += 1
+        self.total_latency += latency
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.bytes_received += bytes_received
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+
+    def merge(self, other: RequestMetrics) -> None:
+        """Add the counts from another set of metrics to these."""
+        self.requests += other.requests
+        self.total_latency += other.total_latency
+        self.latency_histogram = [
+            a + b for a, b in zip(self.latency_histogram, other.latency_histogram)
+        ]
+        self.bytes_received += other.bytes_received
+        for status, count in other.status_codes.items():
+            self.status_codes[status] = self.status_codes.get(status, 0) + count
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a JSON serialisable dictionary."""
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "mean_latency": self.mean_latency,
+            "p95_latency": self.latency_quantile(0.95),
+            "latency_histogram": dict(
+                zip(
+                    [f"<={bound}s" for bound in LATENCY_BUCKETS] + ["overflow"],
+                    self.latency_histogram,
+                )
+            ),
+            "bytes_received": self.bytes_received,
+            "status_codes": dict(self.status_codes),
+        }
+
+
+class ApiMetrics:
+    """Metrics for all requests made by an API client, by endpoint and credentials."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self._requests: dict[tuple[str, str], RequestMetrics] = {}
+        self.logins: dict[str, int] = {}
+
+    def record_request(
+        self,
+        endpoint: str,
+        credentials_id: str,
+        status: str,
+        latency: float,
+        bytes_received: int = 0,
+    ) -> None:
+        """Record a request to an endpoint with a set of credentials."""
+        key = (endpoint, credentials_id)
+        if key not in self._requests:
+            self._requests[key] = RequestMetrics()
+        self._requests[key].record(status, latency, bytes_received)
+
+    def record_login(self, credentials_id: str) -> None:
+        """Record a successful log in with a set of credentials."""
+        self.logins[credentials_id] = self.logins.get(credentials_id, 0) + 1
+
+    def for_credentials(self, credentials_id: str) -> RequestMetrics:
+        """Return the metrics across all endpoints for a set of credentials."""
+        metrics = RequestMetrics()
+        for (_, key), request_metrics in self._requests.items():
+            if key == credentials_id:
+                metrics.merge(request_metrics)
+        return metrics
+
+    def by_endpoint(self, credentials_id: str) -> dict[str, RequestMetrics]:
+        """Return the metrics for each endpoint used by a set of credentials."""
+        return {
+            endpoint: request_metrics
+            for (endpoint, key), request_metrics in self._requests.items()
+            if key == credentials_id
+        }
+
+    def as_dict(self) -> dict:
+        """Return all metrics as a JSON serialisable dictionary."""
+        credentials_ids = sorted({key for _, key in self._requests} | set(self.logins))
+        return {
+            credentials_id: {
+                "logins": self.logins.get(credentials_id, 0),
+                "total": self.for_credentials(credentials_id).as_dict(),
+                "endpoints": {
+                    endpoint: request_metrics.as_dict()
+                    for endpoint, request_metrics in self.by_endpoint(
+                        credentials_id
+                    ).items()
+                },
+            }
+            for credentials_id in credentials_ids
+        }
@@ -35,6 +35,7 @@ class HeatPumpState:
     """This is the model for the latest state of the heat pump."""
 
     device_id: str
+    building_id: int
     wifi_status: str
     wifi_signal_stregth: int
     has_power: bool
@@ -66,3 +67,17 @@ class HeatPumpState:
     daily_total_energy_consumed: float
     daily_total_energy_produced: float
     daily_coefficient_of_performance: float
+    # When the device reported the current energy rates, which not every
+    # refresh updates
+    current_energy_updated_at: datetime.datetime | None = None
+
+
+@dataclass
+class DailyEnergyReport:
+    """The energy consumed and produced by the heat pump on a single day."""
+
+    date: datetime.date
+    heating_energy_consumed: float
+    heating_energy_produced: float
+    hot_water_energy_consumed: float
+    hot_water_energy_produced: float
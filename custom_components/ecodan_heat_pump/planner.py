@@ -0,0 +1,407 @@
+"""Plan the hot water boosts for the cheapest windows of a price forecast."""
+
+from __future__ import annotations
+
+import importlib
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_state_change_event,
+)
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.ecodan_heat_pump.const import (
+    DOMAIN,
+    LOGGER,
+    PLANNER_COOL_RATE,
+    PLANNER_HEAT_RATE,
+    PLANNER_MIN_TANK_TEMP,
+    PLANNER_OUTDOOR_BAND,
+    PLANNER_RATE_SMOOTHING,
+    PLANNER_SLOT,
+)
+from custom_components.ecodan_heat_pump.errors import ApiClientException
+from custom_components.ecodan_heat_pump.models import HeatingStatus, HeatPumpState
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
+
+STORAGE_VERSION = 1
+
+# Delay saving so that the learnt rates are written at most once a minute
+SAVE_DELAY = 60
+
+# The attributes and keys that price integrations (Nord Pool, Octopus Energy,
+# EnergyZero, Tibber, ...) publish their forecast under
+FORECAST_ATTRIBUTES = ("raw_today", "raw_tomorrow", "forecast", "prices", "rates")
+START_KEYS = ("start", "start_time", "from", "valid_from", "time", "datetime")
+END_KEYS = ("end", "end_time", "till", "to", "valid_to")
+PRICE_KEYS = ("value", "price", "value_inc_vat", "total")
+
+
+@dataclass
+class BoostWindow:
+    """A planned hot water boost."""
+
+    start: datetime
+    end: datetime
+    mean_price: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the window for the schedule attributes."""
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "mean_price": self.mean_price,
+        }
+
+
+def parse_price_forecast(
+    attributes: Mapping[str, Any],
+) -> list[tuple[datetime, datetime, float]]:
+    """Return the (start, end, price) intervals of a price entity's forecast."""
+    entries = []
+    for attribute in FORECAST_ATTRIBUTES:
+        items = attributes.get(attribute)
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if not isinstance(item, Mapping):
+                continue
+            start = _datetime(_first(item, START_KEYS))
+            end = _datetime(_first(item, END_KEYS))
+            price = _first(item, PRICE_KEYS)
+            if start is None or not isinstance(price, (int, float)):
+                continue
+            entries.append((start, end, float(price)))
+
+    # Intervals without an end last until the next one starts, or an hour
+    entries.sort(key=lambda entry: entry[0])
+    intervals = []
+    for index, (start, end, price) in enumerate(entries):
+        if end is None:
+            end = (
+                entries[index + 1][0]
+                if index + 1 < len(entries)
+                else start + timedelta(hours=1)
+            )
+        if end > start and (not intervals or start >= intervals[-1][1]):
+            intervals.append((start, end, price))
+    return intervals
+
+
+def window_costs(
+    prices: np.ndarray,
+    hours: np.ndarray,
+    tank: float,
+    target: float,
+    heat_rate: float,
+    cool_rate: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the cost and length of a boost starting in each slot of the horizon.
+
+    The tank cools from its current temperature until the boost starts, so a
+    later boost takes longer. Every window is costed at once from the
+    cumulative sum of the slot prices.
+    """
+    import numpy as np
+
+    slots = len(prices)
+    slot_hours = PLANNER_SLOT.total_seconds() / 3600
+    tank_at_start = np.maximum(
+        tank - cool_rate * np.maximum(hours, 0), PLANNER_MIN_TANK_TEMP
+    )
+    duration = np.maximum(target - tank_at_start, 0) / heat_rate
+    lengths = np.maximum(np.ceil(duration / slot_hours), 1).astype(int)
+    starts = np.arange(slots)
+    ends = starts + lengths
+    fits = (ends <= slots) & (hours >= 0)
+    cumulative = np.concatenate(([0.0], np.cumsum(prices)))
+    costs = np.full(slots, np.inf)
+    costs[fits] = cumulative[ends[fits]] - cumulative[starts[fits]]
+    return costs, lengths
+
+
+class BoostPlanner:
+    """Boost the hot water once a day, in the cheapest window of the forecast.
+
+    The boost length follows from how far the tank will have cooled by then
+    and how fast it heats up, both learnt from the tank temperature history,
+    the heating rate per band of outdoor temperature. The plan is recomputed
+    whenever the price forecast changes.
+    """
+
+    def __init__(  # noqa: D107
+        self, hass: HomeAssistant, coordinator: Coordinator, price_entity: str
+    ) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self.price_entity = price_entity
+        self._store = Store(
+            hass,
+            STORAGE_VERSION,
+            f"{DOMAIN}.{coordinator.config_entry.entry_id}.planner",
+        )
+        self.windows: list[BoostWindow] = []
+        self.heat_rates: dict[int, float] = {}
+        self.cool_rate = PLANNER_COOL_RATE
+        self._boosted_on: date | None = None
+        self._previous: tuple[datetime, float, bool] | None = None
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._unsub_boosts: list[CALLBACK_TYPE] = []
+        self._unsub_end: CALLBACK_TYPE | None = None
+
+    async def async_load(self) -> None:
+        """Load the learnt rates from storage, and NumPy outside the event loop."""
+        await self._hass.async_add_executor_job(importlib.import_module, "numpy")
+        if (data := await self._store.async_load()) is not None:
+            self.heat_rates = {int(band): rate for band, rate in data["heat"].items()}
+            self.cool_rate = data["cool"]
+
+    @callback
+    def async_start(self) -> None:
+        """Plan now and whenever the price forecast changes."""
+        self._unsubs = [
+            async_track_state_change_event(
+                self._hass, [self.price_entity], self._async_price_changed
+            ),
+            self._coordinator.async_add_listener(self._handle_coordinator_update),
+        ]
+        self._async_plan()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop planning and cancel the planned boosts."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        self._cancel_boosts()
+        if self._unsub_end is not None:
+            self._unsub_end()
+            self._unsub_end = None
+
+    def heat_rate(self, outdoor_temperature: float) -> float:
+        """Return the learnt heating rate of the tank, in °C per hour."""
+        if not self.heat_rates:
+            return PLANNER_HEAT_RATE
+        band = _band(outdoor_temperature)
+        nearest = min(self.heat_rates, key=lambda known: abs(known - band))
+        return self.heat_rates[nearest]
+
+    def plan(
+        self,
+        intervals: list[tuple[datetime, datetime, float]],
+        state: HeatPumpState,
+        now: datetime,
+    ) -> list[BoostWindow]:
+        """Return the cheapest boost window of each day in the forecast."""
+        import numpy as np
+
+        slot = PLANNER_SLOT.total_seconds()
+        slot_starts, prices = _resample(intervals, now, slot)
+        if not len(prices):
+            return []
+        days = np.array(
+            [
+                dt_util.as_local(dt_util.utc_from_timestamp(start)).date().toordinal()
+                for start in slot_starts
+            ]
+        )
+
+        heat_rate = self.heat_rate(state.outdoor_temperature)
+        reference, tank = now.timestamp(), state.water_tank_temperature
+        windows = []
+        for day in np.unique(days):
+            if self._boosted_on is not None and day == self._boosted_on.toordinal():
+                continue
+            costs, lengths = window_costs(
+                prices,
+                (slot_starts - reference) / 3600,
+                tank,
+                state.target_water_tank_temperature,
+                heat_rate,
+                self.cool_rate,
+            )
+            costs[days != day] = np.inf
+            index = int(np.argmin(costs))
+            if not math.isfinite(costs[index]):
+                continue
+            length = int(lengths[index])
+            start = slot_starts[index]
+            windows.append(
+                BoostWindow(
+                    start=dt_util.utc_from_timestamp(start),
+                    end=dt_util.utc_from_timestamp(start + length * slot),
+                    mean_price=round(float(costs[index]) / length, 4),
+                )
+            )
+            # The next day's boost starts from a full tank
+            reference, tank = start + length * slot, state.target_water_tank_temperature
+        return windows
+
+    def observe(self, state: HeatPumpState) -> None:
+        """Learn how fast the tank heats while boosting and cools otherwise."""
+        current = (
+            state.last_communication,
+            state.water_tank_temperature,
+            state.is_forced_to_heat_water,
+        )
+        previous, self._previous = self._previous, current
+        if previous is None or current[0] <= previous[0]:
+            return
+        hours = (current[0] - previous[0]).total_seconds() / 3600
+        rate = (current[1] - previous[1]) / hours
+        if previous[2] and current[2] and rate > 0:
+            band = _band(state.outdoor_temperature)
+            self.heat_rates[band] = _smooth(self.heat_rates.get(band), rate)
+        elif (
+            not previous[2]
+            and not current[2]
+            and state.heating_status == HeatingStatus.IDLE
+            and rate <= 0
+        ):
+            self.cool_rate = _smooth(self.cool_rate, -rate)
+        else:
+            return
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _async_price_changed(self, _: Event) -> None:
+        self._async_plan()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self._coordinator.data is not None:
+            self.observe(self._coordinator.data)
+
+    @callback
+    def _async_plan(self) -> None:
+        """Replace the planned boosts with a plan for the current forecast."""
+        self._cancel_boosts()
+        price_state = self._hass.states.get(self.price_entity)
+        if price_state is None or self._coordinator.data is None:
+            self.windows = []
+        else:
+            now = dt_util.utcnow()
+            self.windows = [
+                window
+                for window in self.windows
+                if window.start <= now < window.end and self._unsub_end is not None
+            ] + self.plan(
+                parse_price_forecast(price_state.attributes),
+                self._coordinator.data,
+                now,
+            )
+            for window in self.windows:
+                if window.start > now:
+                    self._unsub_boosts.append(
+                        async_track_point_in_time(
+                            self._hass,
+                            partial(self._async_start_boost, window),
+                            window.start,
+                        )
+                    )
+            LOGGER.debug(
+                f"Planned hot water boosts: {[window.as_dict() for window in self.windows]}"
+            )
+        self._coordinator.async_update_listeners()
+
+    async def _async_start_boost(self, window: BoostWindow, _: datetime) -> None:
+        self._boosted_on = dt_util.as_local(window.start).date()
+        self._unsub_end = async_track_point_in_time(
+            self._hass, partial(self._async_end_boost, window), window.end
+        )
+        if self._coordinator.data.is_forced_to_heat_water:
+            return
+        LOGGER.info(
+            f"Boosting the hot water until {window.end}, "
+            f"at a mean price of {window.mean_price}..."
+        )
+        try:
+            await self._coordinator.async_toggle_water_heating(True)
+        except ApiClientException as exception:
+            LOGGER.warning(f"Failed to boost the hot water: {exception}")
+
+    async def _async_end_boost(self, window: BoostWindow, _: datetime) -> None:
+        self._unsub_end = None
+        self.windows = [known for known in self.windows if known is not window]
+        self._coordinator.async_update_listeners()
+        # The heat pump ends a boost itself once the tank reaches its target
+        if not self._coordinator.data.is_forced_to_heat_water:
+            return
+        try:
+            await self._coordinator.async_toggle_water_heating(False)
+        except ApiClientException as exception:
+            LOGGER.warning(f"Failed to end the hot water boost: {exception}")
+
+    def _cancel_boosts(self) -> None:
+        for unsub in self._unsub_boosts:
+            unsub()
+        self._unsub_boosts = []
+
+    def _data_to_save(self) -> dict:
+        return {"heat": self.heat_rates, "cool": self.cool_rate}
+
+
+def _resample(
+    intervals: list[tuple[datetime, datetime, float]], now: datetime, slot: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the slot starts (in epoch seconds) and prices from now on.
+
+    The horizon ends at the first gap in the forecast.
+    """
+    import numpy as np
+
+    if not intervals:
+        return np.array([]), np.array([])
+    starts = np.array([start.timestamp() for start, _, _ in intervals])
+    ends = np.array([end.timestamp() for _, end, _ in intervals])
+    prices = np.array([price for _, _, price in intervals])
+
+    first = math.ceil(now.timestamp() / slot) * slot
+    slot_starts = np.arange(first, ends[-1], slot)
+    index = np.searchsorted(starts, slot_starts, side="right") - 1
+    covered = (index >= 0) & (slot_starts + slot <= ends[np.maximum(index, 0)])
+    gaps = np.flatnonzero(~covered)
+    horizon = gaps[0] if len(gaps) else len(slot_starts)
+    return slot_starts[:horizon], prices[index[:horizon]]
+
+
+def _first(item: Mapping[str, Any], keys: tuple[str, ...]) -> Any:
+    for key in keys:
+        if item.get(key) is not None:
+            return item[key]
+    return None
+
+
+def _datetime(value: Any) -> datetime | None:
+    if isinstance(value, str):
+        value = dt_util.parse_datetime(value)
+    if not isinstance(value, datetime):
+        return None
+    return dt_util.as_utc(value)
+
+
+def _band(outdoor_temperature: float) -> int:
+    return math.floor(outdoor_temperature / PLANNER_OUTDOOR_BAND)
+
+
+def _smooth(previous: float | None, value: float) -> float:
+    if previous is None:
+        return value
+    return previous + PLANNER_RATE_SMOOTHING * (value - previous)
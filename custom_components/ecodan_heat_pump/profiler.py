@@ -0,0 +1,183 @@
+"""On-demand profiling of the integration's hot paths."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import FrameType
+
+from custom_components.ecodan_heat_pump.const import LOGGER
+
+SAMPLE_INTERVAL = 0.005
+
+
+@dataclass
+class ProfileSession:
+    """The data collected while profiling a number of coordinator cycles."""
+
+    cycles: int
+    path_prefix: str
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+    spans: dict[str, list[float]] = field(default_factory=dict)
+    stacks: Counter = field(default_factory=Counter)
+    completed_cycles: int = 0
+    # The span depth of each task that is inside a span, and the number of
+    # those tasks that are not paused. cProfile runs while there are any
+    depths: dict[asyncio.Task | None, int] = field(default_factory=dict)
+    running: int = 0
+
+
+class Profiler:
+    """Collect timing spans, a cProfile and sampled stacks for N coordinator cycles.
+
+    Profiling is only active while a task is inside a span, and is paused while
+    the API client waits for MELCloud. cProfile and the sampler see the whole
+    event loop thread though, so other tasks and callbacks that run while a span
+    awaits something else are included too. Spans are no-ops while no session is
+    running.
+    """
+
+    def __init__(self) -> None:  # noqa: D107
+        self._session: ProfileSession | None = None
+        self._loop_thread_id: int | None = None
+        self._sampler: threading.Thread | None = None
+
+    @property
+    def is_active(self) -> bool:
+        """Return whether a profiling session is running."""
+        return self._session is not None
+
+    def start(self, cycles: int, path_prefix: str) -> None:
+        """Start profiling the next `cycles` coordinator cycles."""
+        if self._session is not None:
+            raise RuntimeError("A profiling session is already running!")
+        LOGGER.info(f"Profiling the next {cycles} coordinator cycle(s)...")
+        self._session = ProfileSession(cycles=cycles, path_prefix=path_prefix)
+        self._loop_thread_id = threading.get_ident()
+        self._sampler = threading.Thread(
+            target=self._sample, args=(self._session,), daemon=True
+        )
+        self._sampler.start()
+
+    @contextmanager
+    def span(self, name: str):
+        """Time a named span and profile the code that runs within it."""
+        session = self._session
+        if session is None:
+            yield
+            return
+        task = _current_task()
+        depth = session.depths.get(task, 0)
+        session.depths[task] = depth + 1
+        if depth == 0:
+            _resume(session)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            session.spans.setdefault(name, []).append(time.perf_counter() - start)
+            if depth == 0:
+                del session.depths[task]
+                _suspend(session)
+            else:
+                session.depths[task] = depth
+
+    @contextmanager
+    def paused(self):
+        """Leave out the code that runs while the current task waits for I/O."""
+        session = self._session
+        if session is None or _current_task() not in session.depths:
+            yield
+            return
+        _suspend(session)
+        try:
+            yield
+        finally:
+            _resume(session)
+
+    def cycle_completed(self) -> ProfileSession | None:
+        """Count a completed cycle and return the session once it has finished."""
+        session = self._session
+        if session is None:
+            return None
+        session.completed_cycles += 1
+        if session.completed_cycles < session.cycles:
+            return None
+        self._session = None
+        self._sampler.join()
+        return session
+
+    def _sample(self, session: ProfileSession) -> None:
+        """Sample the event loop thread's stack while it is inside a span."""
+        while self._session is session:
+            if session.running > 0:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    session.stacks[_fold(frame)] += 1
+            time.sleep(SAMPLE_INTERVAL)
+
+
+def write_results(session: ProfileSession) -> list[str]:
+    """Write the results of a session to disk and return the paths written.
+
+    This does blocking I/O, so run it in an executor.
+    """
+    pstats_path = f"{session.path_prefix}.pstats"
+    folded_path = f"{session.path_prefix}.folded"
+    spans_path = f"{session.path_prefix}.spans.json"
+
+    session.profile.dump_stats(pstats_path)
+    with open(folded_path, "w", encoding="utf-8") as file:
+        for stack, count in session.stacks.most_common():
+            file.write(f"{stack} {count}\n")
+    with open(spans_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                name: {
+                    "count": len(durations),
+                    "total": sum(durations),
+                    "max": max(durations),
+                    "durations": durations,
+                }
+                for name, durations in session.spans.items()
+            },
+            file,
+            indent=2,
+        )
+    return [pstats_path, folded_path, spans_path]
+
+
+def _current_task() -> asyncio.Task | None:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+
+def _resume(session: ProfileSession) -> None:
+    session.running += 1
+    if session.running == 1:
+        session.profile.enable()
+
+
+def _suspend(session: ProfileSession) -> None:
+    session.running -= 1
+    if session.running == 0:
+        session.profile.disable()
+
+
+def _fold(frame: FrameType) -> str:
+    """Fold a stack into the `outer;...;inner` format used by flame graph tools."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
@@ -0,0 +1,75 @@
+"""Entity profiles, which choose the entities that are enabled by default."""
+
+from __future__ import annotations
+
+from enum import Enum
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+
+class EntityProfile(Enum):
+    """The entity profiles, smallest first."""
+
+    MINIMAL = "minimal"
+    STANDARD = "standard"
+    FULL = "full"
+
+
+# The smallest profile that enables each entity, by unique id. Entities that
+# are not listed are enabled from the standard profile
+ENTITY_PROFILES = {
+    "sensor.heat_pump_flow_temperature": EntityProfile.MINIMAL,
+    "sensor.heat_pump_water_tank_temperature": EntityProfile.MINIMAL,
+    "sensor.heat_pump_outdoor_temperature": EntityProfile.MINIMAL,
+    "sensor.heat_pump_current_coefficient_of_performance": EntityProfile.MINIMAL,
+    "sensor.heat_pump_daily_total_energy_consumed": EntityProfile.MINIMAL,
+    "sensor.heat_pump_daily_total_energy_produced": EntityProfile.MINIMAL,
+    "binary_sensor.heat_pump_power": EntityProfile.MINIMAL,
+    "binary_sensor.heat_pump_force_hot_water": EntityProfile.MINIMAL,
+    "binary_sensor.heat_pump_offline": EntityProfile.MINIMAL,
+    "sensor.heat_pump_last_communication_timestamp": EntityProfile.FULL,
+    "sensor.heat_pump_daily_energy_report_date": EntityProfile.FULL,
+    "sensor.heat_pump_api_credentials_1_latency": EntityProfile.FULL,
+    "sensor.heat_pump_api_credentials_2_latency": EntityProfile.FULL,
+    "sensor.heat_pump_api_credentials_3_latency": EntityProfile.FULL,
+    "sensor.heat_pump_actuation_latency_p50": EntityProfile.FULL,
+    "sensor.heat_pump_actuation_latency_p95": EntityProfile.FULL,
+    "sensor.heat_pump_remaining_bandwidth_budget": EntityProfile.FULL,
+    "binary_sensor.heat_pump_holiday_mode": EntityProfile.FULL,
+    "binary_sensor.heat_pump_heating_prohibited": EntityProfile.FULL,
+    "binary_sensor.heat_pump_hot_water_prohibited": EntityProfile.FULL,
+}
+
+
+def is_enabled(profile: EntityProfile, entry_id: str, unique_id: str) -> bool:
+    """Return whether a profile enables an entity."""
+    # The climate entity's unique id is the config entry's, and it is always enabled
+    if unique_id == entry_id:
+        return True
+    smallest = ENTITY_PROFILES.get(unique_id, EntityProfile.STANDARD)
+    profiles = list(EntityProfile)
+    return profiles.index(smallest) <= profiles.index(profile)
+
+
+@callback
+def async_apply_entity_profile(
+    hass: HomeAssistant, entry: ConfigEntry, profile: EntityProfile
+) -> None:
+    """Enable the registered entities of a profile and disable the others.
+
+    Entities that the user disabled are left disabled. Home Assistant removes
+    the disabled entities, and their coordinator listeners, straight away and
+    reloads the config entry to add the enabled ones.
+    """
+    registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        enabled = is_enabled(profile, entry.entry_id, entity_entry.unique_id)
+        if enabled and entity_entry.disabled_by is er.RegistryEntryDisabler.INTEGRATION:
+            registry.async_update_entity(entity_entry.entity_id, disabled_by=None)
+        elif not enabled and entity_entry.disabled_by is None:
+            registry.async_update_entity(
+                entity_entry.entity_id,
+                disabled_by=er.RegistryEntryDisabler.INTEGRATION,
+            )
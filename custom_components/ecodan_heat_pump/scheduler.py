@@ -0,0 +1,159 @@
+"""A prioritised scheduler for requests to the MELCloud API."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+from custom_components.ecodan_heat_pump.const import (
+    SCHEDULER_BURST,
+    SCHEDULER_MAX_CONCURRENT,
+    SCHEDULER_RATE,
+    SCHEDULER_RESERVE,
+)
+
+
+class RequestPriority(IntEnum):
+    """Request classes, most urgent first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    BULK = 2
+
+
+# The priority of requests made by the current task, inherited by its subtasks
+REQUEST_PRIORITY: ContextVar[RequestPriority] = ContextVar(
+    "request_priority", default=RequestPriority.BACKGROUND
+)
+
+
+def with_priority(priority: RequestPriority):
+    """Make all requests within the decorated coroutine function use a priority."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            token = REQUEST_PRIORITY.set(priority)
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                REQUEST_PRIORITY.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+class RequestScheduler:
+    """Admit requests by priority within a concurrency limit and a rate budget.
+
+    The budget is a token bucket. Interactive requests always have a slot and
+    are never held back by the budget, so the time from a user action to its
+    request is bounded. Background and bulk requests leave one slot free and
+    are deferred while the budget is down to its reserve.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        max_concurrent: int = SCHEDULER_MAX_CONCURRENT,
+        rate: float = SCHEDULER_RATE,
+        burst: float = SCHEDULER_BURST,
+        reserve: float = SCHEDULER_RESERVE,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self.tokens = burst
+        self.in_flight = 0
+        self._updated_at = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @asynccontextmanager
+    async def slot(self, priority: RequestPriority | None = None):
+        """Wait until a request may be made, and hold the slot while it runs."""
+        if priority is None:
+            priority = REQUEST_PRIORITY.get()
+        if not self._waiters and self._can_start(priority):
+            self._start()
+        else:
+            future = asyncio.get_running_loop().create_future()
+            entry = (priority, next(self._sequence), future)
+            heapq.heappush(self._waiters, entry)
+            # A more urgent request may be able to start ahead of those waiting
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was granted just as the wait was cancelled
+                    self._finish()
+                else:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                raise
+        try:
+            yield
+        finally:
+            self._finish()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.tokens + (now - self._updated_at) * self.rate, self.burst
+        )
+        self._updated_at = now
+
+    def _can_start(self, priority: RequestPriority) -> bool:
+        if priority == RequestPriority.INTERACTIVE:
+            return self.in_flight < self.max_concurrent
+        self._refill()
+        return self.in_flight < self.max_concurrent - 1 and self.tokens > self.reserve
+
+    def _start(self) -> None:
+        self.in_flight += 1
+        self.tokens -= 1
+
+    def _finish(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Start as many waiting requests as possible, in priority order."""
+        while self._waiters and self._can_start(self._waiters[0][0]):
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._start()
+                future.set_result(None)
+
+        # Try again once the budget has refilled enough for the next request, as
+        # finishing requests only free up slots
+        if self._waiters and self._timer is None and self.tokens <= self.reserve:
+            delay = max((self.reserve + 1 - self.tokens) / self.rate, 0.1)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def as_dict(self) -> dict:
+        """Return the scheduler's state as a JSON serialisable dictionary."""
+        self._refill()
+        return {
+            "in_flight": self.in_flight,
+            "tokens": round(self.tokens, 2),
+            "waiting": {
+                priority.name.lower(): sum(
+                    1 for waiter in self._waiters if waiter[0] == priority
+                )
+                for priority in RequestPriority
+            },
+        }
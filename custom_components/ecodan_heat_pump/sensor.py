@@ -2,17 +2,29 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from homeassistant.components.sensor import (
     SensorEntity,
     SensorEntityDescription,
     SensorDeviceClass,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfTemperature, UnitOfEnergy, UnitOfPower
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfInformation,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 
 from custom_components.ecodan_heat_pump.const import DOMAIN
-from custom_components.ecodan_heat_pump.coordinator import Coordinator
 from custom_components.ecodan_heat_pump.entity import EcodanHeatPumpEntity
+from custom_components.ecodan_heat_pump.models import CredentialsId
+
+if TYPE_CHECKING:
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
@@ -20,6 +32,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
     async_add_entities(
         [
+            HeatPumpHotWaterBoostScheduleSensor(coordinator),
             HeatPumpTargetFlowTempSensor(coordinator),
             HeatPumpFlowTempSensor(coordinator),
             HeatPumpReturnTempSensor(coordinator),
@@ -38,6 +51,16 @@ async def async_setup_entry(hass, entry, async_add_entities):
             HeatPumpDailyTotalEnergyConsumedSensor(coordinator),
             HeatPumpDailyTotalEnergyProducedSensor(coordinator),
             HeatPumpDailyCoefficientOfPerformaceSensor(coordinator),
+            HeatPumpExpectedCoefficientOfPerformanceSensor(coordinator),
+            HeatPumpCoefficientOfPerformanceDeviationSensor(coordinator),
+            HeatPumpActuationLatencySensor(coordinator, 50),
+            HeatPumpActuationLatencySensor(coordinator, 95),
+            HeatPumpBandwidthBudgetSensor(coordinator),
+            HeatPumpCompensatedFlowTempSensor(coordinator),
+            *[
+                HeatPumpApiMetricsSensor(coordinator, credentials_id)
+                for credentials_id in CredentialsId
+            ],
         ]
     )
 
@@ -223,7 +246,16 @@ class HeatPumpLastCommunicationSensor(HeatPumpSensorEntity):
         )
 
 
-class HeatPumpRateOfCurrentEnergyConsumptionSensor(HeatPumpSensorEntity):
+class HeatPumpCurrentEnergySensorEntity(HeatPumpSensorEntity):
+    """A sensor of the current energy rates, which not every refresh updates."""
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return when the device reported the value."""
+        return {"updated_at": self._coordinator.data.current_energy_updated_at}
+
+
+class HeatPumpRateOfCurrentEnergyConsumptionSensor(HeatPumpCurrentEnergySensorEntity):
     """Rate of current energy consumption sensor."""
 
     def __init__(  # noqa: D107
@@ -246,7 +278,7 @@ class HeatPumpRateOfCurrentEnergyConsumptionSensor(HeatPumpSensorEntity):
         )
 
 
-class HeatPumpRateOfCurrentEnergyProductionSensor(HeatPumpSensorEntity):
+class HeatPumpRateOfCurrentEnergyProductionSensor(HeatPumpCurrentEnergySensorEntity):
     """Rate of current energy production sensor."""
 
     def __init__(  # noqa: D107
@@ -269,7 +301,7 @@ class HeatPumpRateOfCurrentEnergyProductionSensor(HeatPumpSensorEntity):
         )
 
 
-class HeatPumpCurrentCoefficientOfPerformaceSensor(HeatPumpSensorEntity):
+class HeatPumpCurrentCoefficientOfPerformaceSensor(HeatPumpCurrentEnergySensorEntity):
     """Current coefficient of performace sensor."""
 
     def __init__(  # noqa: D107
@@ -468,3 +500,268 @@ class HeatPumpDailyHotWaterEnergyProducedSensor(HeatPumpSensorEntity):
             ),
             value_function=lambda coordinator: coordinator.data.daily_hot_water_energy_produced,
         )
+
+
+class HeatPumpApiMetricsSensor(HeatPumpSensorEntity):
+    """Mean API request latency for a set of credentials, with request metrics as attributes."""
+
+    def __init__(  # noqa: D107
+        self,
+        coordinator: Coordinator,
+        credentials_id: CredentialsId,
+    ) -> None:
+        number = credentials_id.value.rsplit("_", 1)[-1]
+        self._credentials_id = credentials_id
+        super().__init__(
+            unique_id=f"api_{credentials_id.value}_latency",
+            coordinator=coordinator,
+            entity_description=SensorEntityDescription(
+                key=DOMAIN,
+                name=f"API credentials {number} latency",
+                icon="mdi:timer-outline",
+                device_class=SensorDeviceClass.DURATION,
+                state_class=SensorStateClass.MEASUREMENT,
+                native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+                suggested_display_precision=0,
+                entity_category=EntityCategory.DIAGNOSTIC,
+            ),
+            value_function=lambda coordinator: self._mean_latency_ms(coordinator),
+        )
+
+    def _mean_latency_ms(self, coordinator: Coordinator) -> float | None:
+        metrics = coordinator.client.metrics.for_credentials(self._credentials_id.value)
+        mean_latency = metrics.mean_latency
+        return mean_latency * 1000 if mean_latency is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the request metrics for the credentials."""
+        metrics = self._coordinator.client.metrics
+        credentials_id = self._credentials_id.value
+        attributes = metrics.for_credentials(credentials_id).as_dict()
+        attributes["logins"] = metrics.logins.get(credentials_id, 0)
+        attributes["endpoints"] = {
+            endpoint: endpoint_metrics.as_dict()
+            for endpoint, endpoint_metrics in metrics.by_endpoint(
+                credentials_id
+            ).items()
+        }
+        return attributes
+
+
+class HeatPumpExpectedCoefficientOfPerformanceSensor(HeatPumpSensorEntity):
+    """The COP expected at the current outdoor and flow temperature, from history."""
+
+    def __init__(  # noqa: D107
+        self,
+        coordinator: Coordinator,
+    ) -> None:
+        super().__init__(
+            unique_id="expected_coefficient_of_performance",
+            coordinator=coordinator,
+            entity_description=SensorEntityDescription(
+                key=DOMAIN,
+                name="Expected coefficient of performance (COP)",
+                icon="mdi:home-percent-outline",
+                state_class=SensorStateClass.MEASUREMENT,
+                suggested_display_precision=2,
+            ),
+            value_function=lambda coordinator: coordinator.cop_model.expected(
+                coordinator.data.outdoor_temperature,
+                coordinator.data.flow_temperature,
+            ),
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return how many samples the model has seen and how well it fits them."""
+        cop_model = self._coordinator.cop_model
+        return {"samples": cop_model.samples, "r_squared": cop_model.r_squared}
+
+
+class HeatPumpCoefficientOfPerformanceDeviationSensor(HeatPumpSensorEntity):
+    """The difference between the current and the expected COP while heating."""
+
+    def __init__(  # noqa: D107
+        self,
+        coordinator: Coordinator,
+    ) -> None:
+        super().__init__(
+            unique_id="coefficient_of_performance_deviation",
+            coordinator=coordinator,
+            entity_description=SensorEntityDescription(
+                key=DOMAIN,
+                name="Coefficient of performance (COP) deviation",
+                icon="mdi:delta",
+                state_class=SensorStateClass.MEASUREMENT,
+                suggested_display_precision=2,
+            ),
+            value_function=self._deviation,
+        )
+
+    @staticmethod
+    def _deviation(coordinator: Coordinator) -> float | None:
+        current = coordinator.data.current_coefficient_of_performance
+        expected = coordinator.cop_model.expected(
+            coordinator.data.outdoor_temperature, coordinator.data.flow_temperature
+        )
+        if expected is None or current <= 0:
+            return None
+        return round(current - expected, 2)
+
+
+class HeatPumpActuationLatencySensor(HeatPumpSensorEntity):
+    """A percentile of the time from a command to the heat pump confirming it."""
+
+    def __init__(  # noqa: D107
+        self,
+        coordinator: Coordinator,
+        percentile: int,
+    ) -> None:
+        super().__init__(
+            unique_id=f"actuation_latency_p{percentile}",
+            coordinator=coordinator,
+            entity_description=SensorEntityDescription(
+                key=DOMAIN,
+                name=f"Actuation latency (p{percentile})",
+                icon="mdi:timer-sync-outline",
+                device_class=SensorDeviceClass.DURATION,
+                state_class=SensorStateClass.MEASUREMENT,
+                native_unit_of_measurement=UnitOfTime.SECONDS,
+                suggested_display_precision=0,
+                entity_category=EntityCategory.DIAGNOSTIC,
+            ),
+            value_function=lambda coordinator: coordinator.actuations.percentile(
+                percentile
+            ),
+        )
+        self._percentile = percentile
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the percentile for each command and the number of samples."""
+        actuations = self._coordinator.actuations
+        commands = sorted({command for command, _ in actuations.latencies})
+        return {
+            "samples": len(actuations.latencies),
+            "pending": [actuation.command for actuation in actuations.pending],
+            **{
+                command: actuations.percentile(self._percentile, command)
+                for command in commands
+            },
+        }
+
+
+class HeatPumpHotWaterBoostScheduleSensor(HeatPumpSensorEntity):
+    """The start of the next planned hot water boost, with the whole schedule.
+
+    The sensor always exists, so that choosing a price entity in the options
+    does not need a reload, and is unknown while no boosts are planned.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        coordinator: Coordinator,
+    ) -> None:
+        super().__init__(
+            unique_id="next_hot_water_boost",
+            coordinator=coordinator,
+            entity_description=SensorEntityDescription(
+                key=DOMAIN,
+                name="Next hot water boost",
+                icon="mdi:water-boiler-auto",
+                device_class=SensorDeviceClass.TIMESTAMP,
+            ),
+            value_function=lambda coordinator: (
+                next((window.start for window in coordinator.planner.windows), None)
+                if coordinator.planner is not None
+                else None
+            ),
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the planned boosts and the learnt tank heating and cooling rates."""
+        planner = self._coordinator.planner
+        if planner is None:
+            return {"price_entity": None, "windows": []}
+        return {
+            "price_entity": planner.price_entity,
+            "windows": [window.as_dict() for window in planner.windows],
+            "heat_rate": round(
+                planner.heat_rate(self._coordinator.data.outdoor_temperature), 2
+            ),
+            "cool_rate": round(planner.cool_rate, 2),
+        }
+
+
+class HeatPumpBandwidthBudgetSensor(HeatPumpSensorEntity):
+    """The bytes left of today's bandwidth budget, unknown without a budget."""
+
+    def __init__(  # noqa: D107
+        self,
+        coordinator: Coordinator,
+    ) -> None:
+        super().__init__(
+            unique_id="remaining_bandwidth_budget",
+            coordinator=coordinator,
+            entity_description=SensorEntityDescription(
+                key=DOMAIN,
+                name="Remaining bandwidth budget",
+                icon="mdi:speedometer-slow",
+                device_class=SensorDeviceClass.DATA_SIZE,
+                native_unit_of_measurement=UnitOfInformation.BYTES,
+                suggested_unit_of_measurement=UnitOfInformation.KILOBYTES,
+                entity_category=EntityCategory.DIAGNOSTIC,
+            ),
+            value_function=lambda coordinator: coordinator.client.bandwidth.remaining,
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return today's usage and the paced update interval."""
+        update_interval = self._coordinator.update_interval
+        return {
+            **self._coordinator.client.bandwidth.as_dict(),
+            "update_interval": (
+                update_interval.total_seconds() if update_interval else None
+            ),
+        }
+
+
+class HeatPumpCompensatedFlowTempSensor(HeatPumpSensorEntity):
+    """The flow temperature of the weather compensation's heating curve.
+
+    The sensor always exists, so that the weather compensation can be turned on
+    in the options without a reload, and is unknown while it is off.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        coordinator: Coordinator,
+    ) -> None:
+        super().__init__(
+            unique_id="compensated_flow_temperature",
+            coordinator=coordinator,
+            entity_description=SensorEntityDescription(
+                key=DOMAIN,
+                name="Compensated flow temperature",
+                icon="mdi:home-thermometer-outline",
+                device_class=SensorDeviceClass.TEMPERATURE,
+                state_class=SensorStateClass.MEASUREMENT,
+                native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+                suggested_display_precision=0,
+            ),
+            value_function=lambda coordinator: (
+                coordinator.compensation.target
+                if coordinator.compensation is not None
+                else None
+            ),
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the heating curve, the smoothed outdoor temperature and the writes."""
+        if (compensation := self._coordinator.compensation) is None:
+            return {}
+        return compensation.as_dict()
@@ -0,0 +1,136 @@
+"""Services for ecodan_heat_pump."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from custom_components.ecodan_heat_pump.const import (
+    ATTR_CYCLES,
+    ATTR_END_DATE,
+    ATTR_MAX_AGE,
+    ATTR_START_DATE,
+    DOMAIN,
+    SERVICE_BACKFILL_ENERGY,
+    SERVICE_ENSURE_FRESH,
+    SERVICE_PROFILE,
+)
+
+if TYPE_CHECKING:
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CYCLES, default=3): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+BACKFILL_ENERGY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Optional(ATTR_END_DATE): cv.date,
+    }
+)
+
+ENSURE_FRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_MAX_AGE, default=30): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services, unless already registered."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        return
+
+    async def async_handle_profile(call: ServiceCall) -> None:
+        """Profile the next coordinator cycles of every MELCloud account."""
+        coordinators: dict[str, Coordinator] = hass.data[DOMAIN]
+        if any(coordinator.profiler.is_active for coordinator in coordinators.values()):
+            raise HomeAssistantError("A profiling session is already running!")
+        timestamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+        started = set()
+        for entry_id, coordinator in coordinators.items():
+            # The config entries of an account share its client and profiler,
+            # so their cycles are profiled together, into one set of results
+            if coordinator.profiler in started:
+                continue
+            started.add(coordinator.profiler)
+            await coordinator.async_start_profiling(
+                call.data[ATTR_CYCLES],
+                hass.config.path(f"{DOMAIN}_profile_{timestamp}_{entry_id}"),
+            )
+
+    async def async_handle_backfill_energy(call: ServiceCall) -> None:
+        """Backfill the daily energy statistics of every config entry in the background."""
+        start = call.data[ATTR_START_DATE]
+        end = call.data.get(ATTR_END_DATE, dt_util.now().date() - timedelta(days=1))
+        if start > end:
+            raise HomeAssistantError("The start date must not be after the end date!")
+        coordinators: dict[str, Coordinator] = hass.data[DOMAIN]
+        for coordinator in coordinators.values():
+            coordinator.async_start_backfill(start, end)
+
+    async def async_handle_ensure_fresh(call: ServiceCall) -> ServiceResponse:
+        """Refresh every config entry whose snapshot is older than max_age, at most once."""
+        coordinators: dict[str, Coordinator] = hass.data[DOMAIN]
+        refreshed = await asyncio.gather(
+            *(
+                coordinator.async_ensure_fresh(call.data[ATTR_MAX_AGE])
+                for coordinator in coordinators.values()
+            )
+        )
+        entries = {}
+        for (entry_id, coordinator), waited in zip(coordinators.items(), refreshed):
+            if not coordinator.last_update_success or coordinator.age is None:
+                raise HomeAssistantError(
+                    f"Failed to refresh the heat pump: {coordinator.last_exception}"
+                )
+            entries[entry_id] = {"age": round(coordinator.age, 1), "refreshed": waited}
+        return {
+            "age": max((entry["age"] for entry in entries.values()), default=None),
+            "entries": entries,
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_handle_profile, schema=PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_ENERGY,
+        async_handle_backfill_energy,
+        schema=BACKFILL_ENERGY_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ENSURE_FRESH,
+        async_handle_ensure_fresh,
+        schema=ENSURE_FRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the integration's services once the last config entry is unloaded."""
+    if hass.data[DOMAIN]:
+        return
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_BACKFILL_ENERGY)
+    hass.services.async_remove(DOMAIN, SERVICE_ENSURE_FRESH)
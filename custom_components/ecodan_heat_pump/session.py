@@ -0,0 +1,28 @@
+"""A dedicated HTTP session for the MELCloud API."""
+
+from __future__ import annotations
+
+import aiohttp
+from homeassistant.util import ssl as ssl_util
+
+from custom_components.ecodan_heat_pump.const import (
+    CONNECTIONS_PER_CREDENTIALS,
+    DNS_CACHE_TTL,
+    KEEPALIVE_TIMEOUT,
+)
+
+
+def create_session(credentials_count: int) -> aiohttp.ClientSession:
+    """Create a session with its own connection pool, tuned for MELCloud.
+
+    Unlike Home Assistant's shared session, idle connections are kept open for
+    longer and DNS lookups are cached, so requests after a quiet period reuse
+    an established TLS connection.
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=CONNECTIONS_PER_CREDENTIALS * credentials_count,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ssl=ssl_util.get_default_context(),
+    )
+    return aiohttp.ClientSession(connector=connector)
@@ -0,0 +1,68 @@
+"""Fire an event whenever the heat pump enters or leaves a notable state."""
+
+from __future__ import annotations
+
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ecodan_heat_pump.const import DOMAIN, LOGGER
+from custom_components.ecodan_heat_pump.models import HeatPumpState
+
+# The watched fields, with the events fired when they become true and false
+TRANSITIONS = {
+    "is_defrost_mode": (f"{DOMAIN}_defrost_started", f"{DOMAIN}_defrost_ended"),
+    "has_error": (f"{DOMAIN}_error_raised", f"{DOMAIN}_error_cleared"),
+    "is_offline": (f"{DOMAIN}_went_offline", f"{DOMAIN}_came_online"),
+    "is_forced_to_heat_water": (
+        f"{DOMAIN}_boost_started",
+        f"{DOMAIN}_boost_completed",
+    ),
+}
+
+
+class TransitionDetector:
+    """Compare each snapshot with the previous one and fire an event per change.
+
+    Automations can trigger on the event types instead of evaluating state
+    triggers and templates on every entity write. Each event carries the
+    previous and new value and how long, in seconds, the previous value lasted
+    (None if it was already the value when the integration started).
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:  # noqa: D107
+        self._hass = hass
+        self._values: dict[str, bool] = {}
+        self._changed_at: dict[str, float] = {}
+
+    def observe(self, state: HeatPumpState, fire: bool = True) -> None:
+        """Fire the events for the fields that changed since the last snapshot.
+
+        With `fire` off, only the values are updated, e.g. because the events
+        for the snapshot have been fired for another config entry.
+        """
+        now = time.monotonic()
+        for field, (rising, falling) in TRANSITIONS.items():
+            value = getattr(state, field)
+            previous = self._values.get(field)
+            self._values[field] = value
+            if previous is None or value == previous:
+                continue
+            changed_at = self._changed_at.get(field)
+            self._changed_at[field] = now
+            if not fire:
+                continue
+            event_type = rising if value else falling
+            LOGGER.debug(f"Heat pump transition '{event_type}'")
+            self._hass.bus.async_fire(
+                event_type,
+                {
+                    "device_id": state.device_id,
+                    "field": field,
+                    "previous": previous,
+                    "new": value,
+                    "duration": (
+                        round(now - changed_at, 1) if changed_at is not None else None
+                    ),
+                },
+            )
@@ -0,0 +1,14 @@
+"""A local stand-in for the MELCloud API, used for development and load testing.
+
+Start it with `scripts/simulate` and point the integration at it by exporting
+`ECODAN_HEAT_PUMP_BASE_URL` before running `scripts/develop`.
+"""
+
+from simulator.server import (
+    EndpointFaults,
+    SimulatedDevice,
+    Simulator,
+    create_app,
+)
+
+__all__ = ["EndpointFaults", "SimulatedDevice", "Simulator", "create_app"]
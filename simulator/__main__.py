@@ -0,0 +1,72 @@
+"""Run the MELCloud simulator from the command line."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+
+from aiohttp import web
+
+from simulator.server import BASE_PATH, ENDPOINTS, Simulator, create_app
+
+
+def main() -> None:
+    """Parse the command line and serve the simulator until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--devices", type=int, default=1, help="number of devices")
+    parser.add_argument(
+        "--account",
+        action="append",
+        metavar="USERNAME:PASSWORD",
+        help="accepted credentials (default: accept anything)",
+    )
+    parser.add_argument(
+        "--reaction-delay",
+        type=float,
+        default=0.0,
+        help="seconds before a SetAtw change shows up in ListDevices",
+    )
+    parser.add_argument("--seed", type=int, help="seed for reproducible faults")
+    parser.add_argument(
+        "--faults",
+        help="per-endpoint fault settings as JSON, or @path to a JSON file, e.g. "
+        '\'{"list_devices": {"latency": 0.5, "timeout_rate": 0.05}}\'',
+    )
+    args = parser.parse_args()
+
+    accounts = None
+    if args.account:
+        accounts = dict(account.split(":", 1) for account in args.account)
+
+    simulator = Simulator(
+        device_count=args.devices,
+        accounts=accounts,
+        reaction_delay=args.reaction_delay,
+        seed=args.seed,
+    )
+    if args.faults:
+        if args.faults.startswith("@"):
+            with open(args.faults[1:], encoding="utf-8") as file:
+                faults = json.load(file)
+        else:
+            faults = json.loads(args.faults)
+        for endpoint, values in faults.items():
+            if endpoint not in ENDPOINTS:
+                parser.error(f"unknown endpoint '{endpoint}', use one of {ENDPOINTS}")
+            simulator.faults[endpoint].update(values)
+
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger(__package__).info(
+        "Set ECODAN_HEAT_PUMP_BASE_URL=http://%s:%s%s",
+        args.host,
+        args.port,
+        BASE_PATH,
+    )
+    web.run_app(create_app(simulator), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
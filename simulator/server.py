@@ -0,0 +1,503 @@
+"""An aiohttp server that imitates the parts of MELCloud used by the integration."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import secrets
+import time
+from dataclasses import asdict, dataclass, field, fields
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from aiohttp import web
+
+BASE_PATH = "/Mitsubishi.Wifi.Client"
+LOGIN_PATH = f"{BASE_PATH}/Login/ClientLogin"
+LIST_DEVICES_PATH = f"{BASE_PATH}/User/ListDevices"
+SETTINGS_PATH = f"{BASE_PATH}/Device/SetAtw"
+DEVICE_PATH = f"{BASE_PATH}/Device/Get"
+ENERGY_REPORT_PATH = f"{BASE_PATH}/EnergyCost/Report"
+CONTROL_PATH = "/_simulator"
+
+# Like MELCloud, compress the responses large enough to benefit
+COMPRESSION_MIN_SIZE = 256
+
+LOGIN = "login"
+LIST_DEVICES = "list_devices"
+SETTINGS = "settings"
+DEVICE = "device"
+ENERGY_REPORT = "energy_report"
+ENDPOINTS = (LOGIN, LIST_DEVICES, SETTINGS, DEVICE, ENERGY_REPORT)
+
+# The SetAtw fields the simulator understands, keyed by their MELCloud name
+SETTABLE_FIELDS = (
+    "Power",
+    "ForcedHotWaterMode",
+    "OperationModeZone1",
+    "SetHeatFlowTemperatureZone1",
+    "SetTankWaterTemperature",
+)
+
+# The ListDevices fields Device/Get reports too. Its response follows that of a
+# real single zone air-to-water unit, as captured in pymelcloud's test fixtures:
+# it has no flow or return temperatures, error flag, defrost mode or energy
+# rates, and its `LastCommunication` is in UTC, unlike `LastTimeStamp`
+LIVE_FIELDS = (
+    "Power",
+    "Offline",
+    "ForcedHotWaterMode",
+    "OperationModeZone1",
+    "IdleZone1",
+    "SetHeatFlowTemperatureZone1",
+    "SetTankWaterTemperature",
+    "TankWaterTemperature",
+    "OutdoorTemperature",
+    "EcoHotWater",
+    "HolidayMode",
+    "ProhibitHotWater",
+)
+
+
+@dataclass
+class EndpointFaults:
+    """Latency and fault injection settings for a single endpoint.
+
+    Rates are probabilities between 0 and 1 and are evaluated in the order
+    timeout, 401, 429, 5xx.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_delay: float = 30.0
+    unauthorised_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+
+    def update(self, values: dict[str, Any]) -> None:
+        """Update the fault settings from a (partial) dictionary."""
+        known = {f.name for f in fields(self)}
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown fault setting '{key}'!")
+            setattr(self, key, float(value))
+
+
+@dataclass
+class SimulatedDevice:
+    """A stateful air-to-water heat pump as reported by ListDevices."""
+
+    device_id: int
+    building_id: int
+    state: dict[str, Any]
+    pending: list[tuple[float, str, Any]] = field(default_factory=list)
+    last_tick: float = field(default_factory=time.time)
+
+    @classmethod
+    def create(cls, device_id: int, building_id: int, now: float) -> SimulatedDevice:
+        """Create a device with plausible starting values."""
+        timestamp = _format_timestamp(now)
+        return cls(
+            device_id=device_id,
+            building_id=building_id,
+            last_tick=now,
+            state={
+                "DeviceID": device_id,
+                "WifiAdapterStatus": "NORMAL",
+                "WifiSignalStrength": -55,
+                "Power": True,
+                "HasError": False,
+                "Offline": False,
+                "HolidayMode": False,
+                "DefrostMode": 0,
+                "EcoHotWater": False,
+                "ProhibitHeatingZone1": False,
+                "ProhibitHotWater": False,
+                "ForcedHotWaterMode": False,
+                "OperationModeZone1": 1,
+                "IdleZone1": False,
+                "SetHeatFlowTemperatureZone1": 35.0,
+                "FlowTemperature": 33.0,
+                "ReturnTemperature": 29.0,
+                "SetTankWaterTemperature": 48.0,
+                "TankWaterTemperature": 45.0,
+                "OutdoorTemperature": 7.0,
+                "LastTimeStamp": timestamp,
+                "CurrentEnergyConsumed": 1.0,
+                "CurrentEnergyProduced": 3.5,
+                "DailyEnergyConsumedDate": timestamp[:10] + "T00:00:00",
+                "DailyHeatingEnergyConsumed": 0.0,
+                "DailyHeatingEnergyProduced": 0.0,
+                "DailyHotWaterEnergyConsumed": 0.0,
+                "DailyHotWaterEnergyProduced": 0.0,
+            },
+        )
+
+    def apply_settings(self, data: dict[str, Any], now: float, delay: float) -> dict:
+        """Queue the requested settings and return the SetAtw response body."""
+        response = dict(self.state)
+        for key in SETTABLE_FIELDS:
+            if key in data and data[key] is not None:
+                self.pending.append((now + delay, key, data[key]))
+                response[key] = data[key]
+        response["EffectiveFlags"] = data.get("EffectiveFlags", 0)
+        return response
+
+    def live_state(self) -> dict[str, Any]:
+        """Return the Device/Get response body."""
+        return {
+            "EffectiveFlags": 0,
+            "LocalIPAddress": None,
+            "SetTemperatureZone1": 20.0,
+            "SetTemperatureZone2": 20.0,
+            "RoomTemperatureZone1": 20.5,
+            "RoomTemperatureZone2": -39.0,
+            "OperationMode": 2 if self.state["ForcedHotWaterMode"] else 1,
+            "OperationModeZone2": 2,
+            "WeatherObservations": [],
+            "ErrorMessage": None,
+            "ErrorCode": 8000,
+            "SetHeatFlowTemperatureZone2": 20.0,
+            "SetCoolFlowTemperatureZone1": 20.0,
+            "SetCoolFlowTemperatureZone2": 20.0,
+            "HCControlType": 1,
+            "UnitStatus": 0,
+            "Zone1Name": "Zone 1",
+            "Zone2Name": None,
+            "ProhibitZone1": self.state["ProhibitHeatingZone1"],
+            "ProhibitZone2": False,
+            "TemperatureIncrementOverride": 0,
+            "IdleZone2": True,
+            "DemandPercentage": 100,
+            "DeviceID": self.device_id,
+            "DeviceType": 1,
+            "LastCommunication": _format_utc_timestamp(self.last_tick),
+            "NextCommunication": _format_utc_timestamp(self.last_tick + 60),
+            "HasPendingCommand": bool(self.pending),
+            "Scene": None,
+            "SceneOwner": None,
+            **{key: self.state[key] for key in LIVE_FIELDS},
+        }
+
+    def energy_report(self, day: date) -> tuple[float, float, float, float]:
+        """Return the heating and hot water energy consumed and produced on a day.
+
+        The values follow the seasons and are the same every time a day is
+        requested.
+        """
+        rng = random.Random(f"{self.device_id}:{day.isoformat()}")
+        winter = math.cos(2 * math.pi * (day.timetuple().tm_yday - 15) / 365)
+        heating = round(max(0.0, 8 + 10 * winter + rng.uniform(-2, 2)), 2)
+        hot_water = round(2 + rng.uniform(-0.5, 0.5), 2)
+        return (
+            heating,
+            round(heating * (3.2 - winter), 2),
+            hot_water,
+            round(hot_water * 2.5, 2),
+        )
+
+    def tick(self, now: float) -> None:
+        """Advance the device physics and apply any settings that are due."""
+        due = [item for item in self.pending if item[0] <= now]
+        self.pending = [item for item in self.pending if item[0] > now]
+        for _, key, value in due:
+            self.state[key] = value
+
+        elapsed = max(now - self.last_tick, 0)
+        self.last_tick = now
+        state = self.state
+
+        # The outdoor temperature follows a slow daily cycle
+        state["OutdoorTemperature"] = round(
+            7 + 5 * math.sin(2 * math.pi * (now % 86400) / 86400), 1
+        )
+
+        # Temperatures relax towards their targets while the heat pump has power
+        heating = state["Power"] and not state["ProhibitHeatingZone1"]
+        flow_target = state["SetHeatFlowTemperatureZone1"] if heating else 20.0
+        state["FlowTemperature"] = _relax(
+            state["FlowTemperature"], flow_target, elapsed
+        )
+        state["ReturnTemperature"] = round(state["FlowTemperature"] - 4, 1)
+        if state["ForcedHotWaterMode"]:
+            tank = _relax(
+                state["TankWaterTemperature"], state["SetTankWaterTemperature"], elapsed
+            )
+            state["TankWaterTemperature"] = tank
+            if tank >= state["SetTankWaterTemperature"] - 0.5:
+                state["ForcedHotWaterMode"] = False
+        state["IdleZone1"] = not heating
+
+        # Energy accumulates in proportion to the current consumption
+        consumed = 1.2 if state["Power"] else 0.0
+        produced = round(consumed * (4.5 - state["FlowTemperature"] / 20), 2)
+        state["CurrentEnergyConsumed"] = consumed
+        state["CurrentEnergyProduced"] = max(produced, 0.0)
+        hours = elapsed / 3600
+        energy_key = "HotWater" if state["ForcedHotWaterMode"] else "Heating"
+        state[f"Daily{energy_key}EnergyConsumed"] = round(
+            state[f"Daily{energy_key}EnergyConsumed"] + consumed * hours, 3
+        )
+        state[f"Daily{energy_key}EnergyProduced"] = round(
+            state[f"Daily{energy_key}EnergyProduced"] + produced * hours, 3
+        )
+
+        state["LastTimeStamp"] = _format_timestamp(now)
+        state["DailyEnergyConsumedDate"] = state["LastTimeStamp"][:10] + "T00:00:00"
+
+
+class Simulator:
+    """The shared state behind the simulated MELCloud endpoints."""
+
+    def __init__(
+        self,
+        device_count: int = 1,
+        accounts: dict[str, str] | None = None,
+        reaction_delay: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Create a simulator with `device_count` devices in a single building.
+
+        If no accounts are given, any username and password will log in.
+        """
+        now = time.time()
+        self.accounts = accounts
+        self.reaction_delay = reaction_delay
+        self.random = random.Random(seed)
+        self.faults = {endpoint: EndpointFaults() for endpoint in ENDPOINTS}
+        self.devices = {
+            device_id: SimulatedDevice.create(device_id, 1, now)
+            for device_id in range(1, device_count + 1)
+        }
+        self.context_keys: dict[str, str] = {}
+        self.counters: dict[str, dict[str, int]] = {
+            endpoint: {} for endpoint in ENDPOINTS
+        }
+
+    def _count(self, endpoint: str, status: int) -> None:
+        counts = self.counters[endpoint]
+        counts[str(status)] = counts.get(str(status), 0) + 1
+
+    async def _inject_faults(self, endpoint: str) -> web.Response | None:
+        """Delay the request and return an error response if a fault is due."""
+        faults = self.faults[endpoint]
+        delay = faults.latency + self.random.uniform(0, faults.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self.random.random()
+        if roll < faults.timeout_rate:
+            self._count(endpoint, 0)
+            await asyncio.sleep(faults.timeout_delay)
+            return web.Response(status=504)
+        roll -= faults.timeout_rate
+        if roll < faults.unauthorised_rate:
+            self._count(endpoint, 401)
+            return web.Response(status=401)
+        roll -= faults.unauthorised_rate
+        if roll < faults.rate_limit_rate:
+            self._count(endpoint, 429)
+            return web.Response(status=429, headers={"Retry-After": "60"})
+        roll -= faults.rate_limit_rate
+        if roll < faults.server_error_rate:
+            status = self.random.choice((500, 502, 503))
+            self._count(endpoint, status)
+            return web.Response(status=status)
+        return None
+
+    def _authorised_user(self, request: web.Request) -> str | None:
+        return self.context_keys.get(request.headers.get("X-MitsContextKey", ""))
+
+    def _tick(self) -> None:
+        now = time.time()
+        for device in self.devices.values():
+            device.tick(now)
+
+    def buildings(self) -> list[dict]:
+        """Return the ListDevices response body."""
+        buildings: dict[int, list[dict]] = {}
+        for device in self.devices.values():
+            buildings.setdefault(device.building_id, []).append(
+                {
+                    "DeviceID": device.device_id,
+                    "DeviceName": f"Heat pump {device.device_id}",
+                    "BuildingID": device.building_id,
+                    "Device": device.state,
+                }
+            )
+        return [
+            {
+                "ID": building_id,
+                "Name": f"Building {building_id}",
+                "Structure": {"Devices": devices, "Floors": [], "Areas": []},
+            }
+            for building_id, devices in buildings.items()
+        ]
+
+    async def handle_login(self, request: web.Request) -> web.Response:
+        """Handle `Login/ClientLogin`."""
+        if (fault := await self._inject_faults(LOGIN)) is not None:
+            return fault
+        data = await request.json()
+        username, password = data.get("Email"), data.get("Password")
+        self._count(LOGIN, 200)
+        if self.accounts is not None and self.accounts.get(username) != password:
+            return web.json_response({"ErrorId": 1, "LoginData": None})
+        context_key = secrets.token_hex(16)
+        self.context_keys[context_key] = username
+        return web.json_response(
+            {"ErrorId": None, "LoginData": {"ContextKey": context_key}}
+        )
+
+    async def handle_list_devices(self, request: web.Request) -> web.Response:
+        """Handle `User/ListDevices`."""
+        if (fault := await self._inject_faults(LIST_DEVICES)) is not None:
+            return fault
+        if self._authorised_user(request) is None:
+            self._count(LIST_DEVICES, 401)
+            return web.Response(status=401)
+        self._tick()
+        self._count(LIST_DEVICES, 200)
+        return web.json_response(self.buildings())
+
+    async def handle_device(self, request: web.Request) -> web.Response:
+        """Handle `Device/Get`."""
+        if (fault := await self._inject_faults(DEVICE)) is not None:
+            return fault
+        if self._authorised_user(request) is None:
+            self._count(DEVICE, 401)
+            return web.Response(status=401)
+        try:
+            device = self.devices.get(int(request.query.get("id", 0)))
+            building_id = int(request.query.get("buildingID", 0))
+        except ValueError:
+            device = None
+        if device is None or device.building_id != building_id:
+            self._count(DEVICE, 404)
+            return web.Response(status=404)
+        self._tick()
+        self._count(DEVICE, 200)
+        return web.json_response(device.live_state())
+
+    async def handle_energy_report(self, request: web.Request) -> web.Response:
+        """Handle `EnergyCost/Report` with one value per day of the range."""
+        if (fault := await self._inject_faults(ENERGY_REPORT)) is not None:
+            return fault
+        if self._authorised_user(request) is None:
+            self._count(ENERGY_REPORT, 401)
+            return web.Response(status=401)
+        data = await request.json()
+        device = self.devices.get(int(data.get("DeviceID", 0)))
+        if device is None:
+            self._count(ENERGY_REPORT, 404)
+            return web.Response(status=404)
+        try:
+            from_date = datetime.fromisoformat(data["FromDate"]).date()
+            to_date = datetime.fromisoformat(data["ToDate"]).date()
+        except (KeyError, TypeError, ValueError):
+            self._count(ENERGY_REPORT, 400)
+            return web.Response(status=400)
+        days = [
+            from_date + timedelta(days=day)
+            for day in range((to_date - from_date).days + 1)
+        ]
+        reports = [device.energy_report(day) for day in days]
+        self._count(ENERGY_REPORT, 200)
+        return web.json_response(
+            {
+                "Heating": [report[0] for report in reports],
+                "ProducedHeating": [report[1] for report in reports],
+                "HotWater": [report[2] for report in reports],
+                "ProducedHotWater": [report[3] for report in reports],
+                "Labels": [day.day for day in days],
+                "LabelType": 1,
+                "FromDate": data["FromDate"],
+                "ToDate": data["ToDate"],
+            }
+        )
+
+    async def handle_settings(self, request: web.Request) -> web.Response:
+        """Handle `Device/SetAtw`."""
+        if (fault := await self._inject_faults(SETTINGS)) is not None:
+            return fault
+        if self._authorised_user(request) is None:
+            self._count(SETTINGS, 401)
+            return web.Response(status=401)
+        data = await request.json()
+        device = self.devices.get(int(data.get("DeviceID", 0)))
+        if device is None:
+            self._count(SETTINGS, 404)
+            return web.Response(status=404)
+        self._tick()
+        self._count(SETTINGS, 200)
+        return web.json_response(
+            device.apply_settings(data, time.time(), self.reaction_delay)
+        )
+
+    async def handle_get_control(self, request: web.Request) -> web.Response:
+        """Return the fault settings, request counters and device states."""
+        return web.json_response(
+            {
+                "faults": {key: asdict(value) for key, value in self.faults.items()},
+                "counters": self.counters,
+                "reaction_delay": self.reaction_delay,
+                "devices": [device.state for device in self.devices.values()],
+            }
+        )
+
+    async def handle_put_control(self, request: web.Request) -> web.Response:
+        """Reconfigure faults and the reaction delay while running."""
+        data = await request.json()
+        try:
+            for endpoint, values in data.get("faults", {}).items():
+                if endpoint not in self.faults:
+                    raise ValueError(f"Unknown endpoint '{endpoint}'!")
+                self.faults[endpoint].update(values)
+            if "reaction_delay" in data:
+                self.reaction_delay = float(data["reaction_delay"])
+        except (TypeError, ValueError) as exception:
+            return web.json_response({"error": str(exception)}, status=400)
+        return await self.handle_get_control(request)
+
+
+def create_app(simulator: Simulator) -> web.Application:
+    """Create the aiohttp application serving the simulated endpoints."""
+    app = web.Application(middlewares=[compression_middleware])
+    app.router.add_post(LOGIN_PATH, simulator.handle_login)
+    app.router.add_get(LIST_DEVICES_PATH, simulator.handle_list_devices)
+    app.router.add_post(SETTINGS_PATH, simulator.handle_settings)
+    app.router.add_get(DEVICE_PATH, simulator.handle_device)
+    app.router.add_post(ENERGY_REPORT_PATH, simulator.handle_energy_report)
+    app.router.add_get(CONTROL_PATH, simulator.handle_get_control)
+    app.router.add_put(CONTROL_PATH, simulator.handle_put_control)
+    return app
+
+
+@web.middleware
+async def compression_middleware(request: web.Request, handler) -> web.StreamResponse:
+    """Compress large responses if the client accepts a compressed encoding."""
+    response = await handler(request)
+    if isinstance(response, web.Response) and (
+        response.body is not None and len(response.body) >= COMPRESSION_MIN_SIZE
+    ):
+        response.enable_compression()
+    return response
+
+
+def _relax(value: float, target: float, elapsed: float) -> float:
+    """Move a temperature towards its target with a ten minute time constant."""
+    return round(target + (value - target) * math.exp(-elapsed / 600), 1)
+
+
+def _format_timestamp(now: float) -> str:
+    """Format a time as the device's local time, like ListDevices does."""
+    return datetime.fromtimestamp(now).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _format_utc_timestamp(now: float) -> str:
+    """Format a time in UTC with milliseconds, like Device/Get does."""
+    return datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[
+        :-3
+    ]
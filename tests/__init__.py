@@ -0,0 +1 @@
+"""Tests for the Ecodan Heat Pump integration."""
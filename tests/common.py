@@ -0,0 +1,114 @@
+"""Helpers for the tests.
+
+The integration is only imported inside the helpers, once the tests' conftest
+has pointed it at the simulator.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+
+from simulator import Simulator, create_app
+from simulator.server import BASE_PATH
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.ecodan_heat_pump.api import ApiClient
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
+    from custom_components.ecodan_heat_pump.models import HeatPumpState
+
+SIMULATOR_PORT = 8097
+SIMULATOR_URL = f"http://127.0.0.1:{SIMULATOR_PORT}{BASE_PATH}"
+
+
+@asynccontextmanager
+async def async_serve(simulator: Simulator):
+    """Serve a simulator on the test port while the context is active."""
+    runner = web.AppRunner(create_app(simulator))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", SIMULATOR_PORT).start()
+    try:
+        yield simulator
+    finally:
+        await runner.cleanup()
+
+
+@asynccontextmanager
+async def async_api_client():
+    """Create an API client with three sets of credentials and its own session."""
+    from custom_components.ecodan_heat_pump.api import ApiClient
+    from custom_components.ecodan_heat_pump.models import Credentials, CredentialsId
+    from custom_components.ecodan_heat_pump.session import create_session
+
+    client = ApiClient(
+        credentials=[
+            Credentials(credentials_id, "test", "test")
+            for credentials_id in CredentialsId
+        ],
+        session=create_session(credentials_count=3),
+    )
+    # Tests make more requests in quick succession than the rate limit allows
+    client.scheduler.rate = client.scheduler.burst = client.scheduler.tokens = 1000
+    try:
+        yield client
+    finally:
+        await client.async_close()
+
+
+@asynccontextmanager
+async def async_test_home_assistant(config_dir: str):
+    """Create a Home Assistant instance, which is stopped when the context ends."""
+    from homeassistant.core import HomeAssistant
+
+    hass = HomeAssistant(config_dir)
+    try:
+        yield hass
+    finally:
+        await hass.async_stop(force=True)
+
+
+def create_coordinator(hass: HomeAssistant, client: ApiClient) -> Coordinator:
+    """Create a coordinator for a config entry that is not set up."""
+    from homeassistant.config_entries import ConfigEntry
+
+    from custom_components.ecodan_heat_pump.analytics import CopModel
+    from custom_components.ecodan_heat_pump.anomaly import AnomalyDetector
+    from custom_components.ecodan_heat_pump.backfill import EnergyBackfill
+    from custom_components.ecodan_heat_pump.const import DOMAIN
+    from custom_components.ecodan_heat_pump.coordinator import Coordinator
+    from custom_components.ecodan_heat_pump.journal import CommandJournal
+
+    coordinator = Coordinator(
+        hass,
+        client,
+        CommandJournal(hass, "test"),
+        EnergyBackfill(hass, client, "test"),
+        CopModel(hass, "test"),
+        AnomalyDetector(hass, "test"),
+    )
+    coordinator.config_entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Test",
+        data={},
+        source="user",
+        entry_id="test",
+    )
+    return coordinator
+
+
+def heat_pump_state(**changes) -> HeatPumpState:
+    """Return the state of a simulated device, with some fields changed."""
+    from custom_components.ecodan_heat_pump.api import ApiClient
+
+    client = ApiClient(credentials=[], session=None)
+    state = client._map_response_to_heat_pump_state(
+        Simulator(device_count=1, seed=1).buildings()
+    )
+    return dataclasses.replace(state, **changes)
@@ -0,0 +1,27 @@
+"""Set-up shared by the tests."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+
+import pytest
+
+from tests.common import SIMULATOR_URL
+
+# The API client's URLs are fixed when it is first imported, so point it at the
+# local simulator before any test imports the integration
+os.environ["ECODAN_HEAT_PUMP_BASE_URL"] = SIMULATOR_URL
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    """Run each async test in an event loop of its own."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    arguments = {
+        name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames
+    }
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
@@ -0,0 +1,161 @@
+"""Tests for sharing MELCloud clients between config entries."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+
+def _credentials(*usernames: str) -> list:
+    from custom_components.ecodan_heat_pump.models import Credentials, CredentialsId
+
+    return [
+        Credentials(credentials_id, username, "test")
+        for credentials_id, username in zip(CredentialsId, usernames)
+    ]
+
+
+def _coordinator(entry_id: str, compensation: object | None = None):
+    """Return a stand-in for a coordinator, recording the snapshots it is handed."""
+    coordinator = SimpleNamespace(
+        config_entry=SimpleNamespace(entry_id=entry_id),
+        compensation=compensation,
+        data=object(),
+        shared=[],
+    )
+    coordinator.async_set_shared_data = lambda state, full: coordinator.shared.append(
+        (state, full)
+    )
+    return coordinator
+
+
+async def test_entries_with_a_username_in_common_share_a_client() -> None:
+    """Any username in common puts two entries on one client; none, on two."""
+    from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+
+    registry = AccountRegistry()
+    first = registry.client("first", _credentials("a", "b"))
+    second = registry.client("second", _credentials("c", "b"))
+    other = registry.client("other", _credentials("d"))
+
+    assert second is first
+    assert other is not first
+    for entry_id in ("first", "second", "other"):
+        await registry.async_release(entry_id)
+
+
+async def test_shares_snapshots_with_the_other_coordinators() -> None:
+    """A snapshot goes to each other coordinator of the account, as a copy."""
+    from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+
+    from tests.common import heat_pump_state
+
+    registry = AccountRegistry()
+    registry.client("first", _credentials("a"))
+    registry.client("second", _credentials("a"))
+    registry.client("other", _credentials("b"))
+    coordinators = {
+        entry_id: _coordinator(entry_id) for entry_id in ("first", "second", "other")
+    }
+    for entry_id, coordinator in coordinators.items():
+        registry.add_coordinator(entry_id, coordinator)
+    state = heat_pump_state()
+
+    registry.share(coordinators["first"], state, True)
+
+    assert coordinators["first"].shared == []
+    assert coordinators["other"].shared == []
+    [(shared, full)] = coordinators["second"].shared
+    assert shared == state
+    assert shared is not state
+    assert full
+    for entry_id in coordinators:
+        await registry.async_release(entry_id)
+
+
+async def test_applies_the_smallest_bandwidth_budget() -> None:
+    """The shared client keeps to the smallest budget set, until its entry goes."""
+    from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+
+    registry = AccountRegistry()
+    client = registry.client("first", _credentials("a"))
+    registry.client("second", _credentials("a"))
+    registry.client("third", _credentials("a"))
+
+    registry.set_bandwidth_budget("first", 2_000_000)
+    registry.set_bandwidth_budget("second", 1_000_000)
+    registry.set_bandwidth_budget("third", None)
+    assert client.bandwidth.daily_budget == 1_000_000
+
+    await registry.async_release("second")
+    assert client.bandwidth.daily_budget == 2_000_000
+
+    registry.set_bandwidth_budget("first", None)
+    assert client.bandwidth.daily_budget is None
+    for entry_id in ("first", "third"):
+        await registry.async_release(entry_id)
+
+
+async def test_one_coordinator_per_account_compensates() -> None:
+    """Only the first coordinator with weather compensation enabled writes."""
+    from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+
+    registry = AccountRegistry()
+    registry.client("first", _credentials("a"))
+    registry.client("second", _credentials("a"))
+    registry.client("third", _credentials("a"))
+    first = _coordinator("first")
+    second = _coordinator("second", compensation=object())
+    third = _coordinator("third", compensation=object())
+    for coordinator in (first, second, third):
+        registry.add_coordinator(coordinator.config_entry.entry_id, coordinator)
+
+    assert [registry.compensates(c) for c in (first, second, third)] == [
+        False,
+        True,
+        False,
+    ]
+
+    await registry.async_release("second")
+    assert registry.compensates(third)
+    for entry_id in ("first", "third"):
+        await registry.async_release(entry_id)
+
+
+async def test_changing_the_usernames_of_a_shared_account_needs_a_reload() -> None:
+    """Usernames change in place only on an account of one entry, to free ones."""
+    from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+
+    registry = AccountRegistry()
+    shared = registry.client("first", _credentials("a"))
+    registry.client("second", _credentials("a"))
+    alone = registry.client("alone", _credentials("b"))
+
+    # Passwords change in place, even on a shared account
+    assert registry.update_credentials("first", _credentials("a"))
+    assert not registry.update_credentials("first", _credentials("c"))
+    assert not registry.update_credentials("alone", _credentials("a"))
+
+    assert registry.update_credentials("alone", _credentials("c"))
+    assert registry.client("new", _credentials("c")) is alone
+    assert registry.client("old", _credentials("b")) not in (alone, shared)
+    for entry_id in ("first", "second", "alone", "new", "old"):
+        await registry.async_release(entry_id)
+
+
+async def test_closes_the_client_when_the_last_entry_is_released() -> None:
+    """The client stays open while any entry uses it, and is forgotten once closed."""
+    from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+
+    registry = AccountRegistry()
+    client = registry.client("first", _credentials("a"))
+    registry.client("second", _credentials("a"))
+
+    await registry.async_release("first")
+    assert not client._session.closed
+    await registry.async_release("second")
+    assert client._session.closed
+
+    # Releasing twice, e.g. after a failed set-up, is harmless
+    await registry.async_release("second")
+    assert registry.client("third", _credentials("a")) is not client
+    await registry.async_release("third")
@@ -0,0 +1,119 @@
+"""Tests for confirming commands from the device's later state."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from simulator import Simulator
+from tests.common import (
+    async_api_client,
+    async_serve,
+    async_test_home_assistant,
+    create_coordinator,
+    heat_pump_state,
+)
+
+
+def test_overlays_commands_until_a_newer_snapshot_confirms_them() -> None:
+    """Stale snapshots show the commanded value, and a newer one showing it confirms it."""
+    from custom_components.ecodan_heat_pump.actuation import ActuationTracker
+
+    tracker = ActuationTracker()
+    sent = heat_pump_state(target_flow_temperature=35.0)
+    actuation = tracker.start(
+        "set_flow_temperature", "target_flow_temperature", 40.0, sent
+    )
+
+    # A snapshot from before the command still shows the old value
+    stale = tracker.observe(heat_pump_state(target_flow_temperature=35.0))
+    assert stale.target_flow_temperature == 40.0
+    assert tracker.pending == [actuation]
+
+    # A snapshot from the same report cannot confirm it either
+    tracker.observe(heat_pump_state(target_flow_temperature=40.0))
+    assert not actuation.confirmed.is_set()
+
+    newer = sent.last_communication + timedelta(seconds=1)
+    not_yet = tracker.observe(
+        heat_pump_state(target_flow_temperature=35.0, last_communication=newer)
+    )
+    assert not_yet.target_flow_temperature == 40.0
+    assert not actuation.confirmed.is_set()
+
+    tracker.observe(
+        heat_pump_state(target_flow_temperature=40.0, last_communication=newer)
+    )
+    assert actuation.confirmed.is_set()
+    assert tracker.pending == []
+    assert [command for command, _ in tracker.latencies] == ["set_flow_temperature"]
+
+    # A newer command for the same field replaces the pending one
+    first = tracker.start("set_flow_temperature", "target_flow_temperature", 41, sent)
+    second = tracker.start("set_flow_temperature", "target_flow_temperature", 42, sent)
+    assert tracker.pending == [second]
+    tracker.stop(first)
+    assert tracker.pending == [second]
+
+
+async def test_confirms_a_command_with_live_refreshes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Confirmation polls get the live values only, and stop once the device confirms."""
+    from custom_components.ecodan_heat_pump import coordinator as coordinator_module
+
+    monkeypatch.setattr(coordinator_module, "ACTUATION_MIN_DELAY", 0.05)
+    monkeypatch.setattr(coordinator_module, "COORDINATOR_REFRESH_DELAY", 0.05)
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1, reaction_delay=0.3)
+    ) as simulator, async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+        await coordinator.async_refresh()
+
+        # A queued value for the field is superseded by the command
+        coordinator.journal.record("target_flow_temperature", 50.0)
+        await coordinator.async_set_flow_temperature(42.0)
+        assert not coordinator.journal
+        (actuation,) = coordinator.actuations.pending
+
+        # Even when a full refresh is due, the confirmation polls are live ones
+        coordinator._slow_updated_at -= coordinator.slow_update_interval.total_seconds()
+        await asyncio.wait_for(actuation.confirmed.wait(), 5)
+        assert simulator.counters["list_devices"] == {"200": 1}
+        assert sum(simulator.counters["device"].values()) >= 2
+        assert coordinator.data.target_flow_temperature == 42.0
+        assert actuation.latency >= 0.3
+        assert coordinator.actuations.pending == []
+
+
+async def test_gives_up_on_an_unconfirmed_command(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A command the device never confirms stops being shown after the timeout."""
+    from custom_components.ecodan_heat_pump import coordinator as coordinator_module
+
+    monkeypatch.setattr(coordinator_module, "ACTUATION_MIN_DELAY", 0.05)
+    monkeypatch.setattr(coordinator_module, "COORDINATOR_REFRESH_DELAY", 0.05)
+    monkeypatch.setattr(coordinator_module, "ACTUATION_TIMEOUT", 0.3)
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1, reaction_delay=60)
+    ), async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+        await coordinator.async_refresh()
+        target_flow_temperature = coordinator.data.target_flow_temperature
+
+        await coordinator.async_set_flow_temperature(target_flow_temperature + 5)
+        await coordinator.async_refresh()
+        assert coordinator.data.target_flow_temperature == target_flow_temperature + 5
+
+        (actuation,) = coordinator.actuations.pending
+        await asyncio.sleep(1)
+        assert not actuation.confirmed.is_set()
+        assert coordinator.actuations.pending == []
+        assert not coordinator.actuations.latencies
+
+        await coordinator.async_refresh()
+        assert coordinator.data.target_flow_temperature == target_flow_temperature
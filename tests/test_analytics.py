@@ -0,0 +1,126 @@
+"""Tests for the COP model."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from tests.common import async_test_home_assistant, heat_pump_state
+
+
+def _true_cop(outdoor, flow):
+    """Return the COP of a made-up heat pump, quadratic like the model."""
+    return 4.5 + 0.08 * outdoor - 0.05 * (flow - 35) - 0.0005 * (flow - 35) ** 2
+
+
+def _samples(count: int, seed: int = 1):
+    import numpy as np
+
+    random = np.random.default_rng(seed)
+    outdoor = random.uniform(-10, 15, count)
+    flow = random.uniform(30, 55, count)
+    return outdoor, flow, _true_cop(outdoor, flow)
+
+
+async def test_fits_the_cop_once_there_are_enough_samples(tmp_path: Path) -> None:
+    """The fit recovers the COP surface, and batches add up to one big fit."""
+    from custom_components.ecodan_heat_pump.analytics import CopModel
+    from custom_components.ecodan_heat_pump.const import COP_MIN_SAMPLES
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        model, batched = CopModel(hass, "test"), CopModel(hass, "batched")
+        outdoor, flow, cop = _samples(200)
+
+        first = COP_MIN_SAMPLES - 1
+        model.fit(outdoor[:first], flow[:first], cop[:first])
+        assert model.expected(0, 35) is None
+
+        model.fit(outdoor[first:], flow[first:], cop[first:])
+        for start in range(0, 200, 50):
+            batched.fit(
+                *(column[start : start + 50] for column in (outdoor, flow, cop))
+            )
+
+    assert model.samples == batched.samples == 200
+    assert model.coefficients == pytest.approx(batched.coefficients)
+    assert model.r_squared == pytest.approx(1, abs=1e-3)
+    for point in ((-5, 45), (0, 35), (10, 30)):
+        assert model.expected(*point) == pytest.approx(_true_cop(*point), abs=0.02)
+
+
+async def test_restores_the_saved_model(tmp_path: Path) -> None:
+    """The saved sufficient statistics give the same fit when restored."""
+    from custom_components.ecodan_heat_pump.analytics import CopModel
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        model, restored = CopModel(hass, "test"), CopModel(hass, "restored")
+        model.fit(*_samples(50))
+        restored._restore(model._data_to_save())
+
+    assert restored.samples == model.samples
+    assert restored.coefficients == pytest.approx(model.coefficients)
+    assert restored.r_squared == model.r_squared
+
+
+async def test_learns_only_from_steady_heating(tmp_path: Path) -> None:
+    """Defrosts, hot water and idle snapshots are left out of the fit."""
+    from custom_components.ecodan_heat_pump.analytics import CopModel
+    from custom_components.ecodan_heat_pump.models import HeatingStatus
+
+    steady = {
+        "has_power": True,
+        "is_defrost_mode": False,
+        "is_forced_to_heat_water": False,
+        "heating_status": HeatingStatus.HEATING,
+        "rate_of_current_energy_consumption": 1.0,
+        "current_coefficient_of_performance": 3.5,
+        "outdoor_temperature": 5.0,
+        "flow_temperature": 35.0,
+    }
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        model = CopModel(hass, "test")
+        model.add(heat_pump_state(**steady))
+        for change in (
+            {"has_power": False},
+            {"is_defrost_mode": True},
+            {"is_forced_to_heat_water": True},
+            {"heating_status": HeatingStatus.IDLE},
+            {"rate_of_current_energy_consumption": 0.0},
+        ):
+            model.add(heat_pump_state(**{**steady, **change}))
+        assert model._pending == [(5.0, 35.0, 3.5)]
+
+        await model.async_refit()
+        assert model.samples == 1
+        assert model._pending == []
+
+
+async def test_fits_history_once_per_energy_report(tmp_path: Path) -> None:
+    """Archived snapshots that repeat the energy values of the last are skipped."""
+    from custom_components.ecodan_heat_pump.analytics import HISTORY_COLUMNS, CopModel
+    from custom_components.ecodan_heat_pump.models import HeatingStatus
+
+    block = {name: [] for name in HISTORY_COLUMNS}
+    for index, (consumption, production) in enumerate(
+        [(1.0, 3.0), (1.0, 3.0), (1.2, 3.0), (1.2, 3.6), (1.2, 3.6)]
+    ):
+        row = {
+            "outdoor_temperature": 5.0 + index,
+            "flow_temperature": 35.0,
+            "current_coefficient_of_performance": production / consumption,
+            "rate_of_current_energy_consumption": consumption,
+            "rate_of_current_energy_production": production,
+            "has_power": True,
+            "is_defrost_mode": False,
+            "is_forced_to_heat_water": False,
+            "heating_status": HeatingStatus.HEATING.value,
+        }
+        for name, value in row.items():
+            block[name].append(value)
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        model = CopModel(hass, "test")
+        await model.async_fit_history([block])
+
+    assert model.samples == 3
@@ -0,0 +1,131 @@
+"""Tests for the anomaly detector."""
+
+from __future__ import annotations
+
+import random
+import statistics
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tests.common import async_test_home_assistant, heat_pump_state
+
+if TYPE_CHECKING:
+    from custom_components.ecodan_heat_pump.models import HeatPumpState
+
+
+def test_running_statistics_match_the_batch_ones() -> None:
+    """Welford's running mean and deviation match those of the whole sample."""
+    from custom_components.ecodan_heat_pump.anomaly import RunningStatistics
+
+    generator = random.Random(1)
+    values = [1e6 + generator.gauss(35, 2) for _ in range(1000)]
+    running = RunningStatistics()
+    assert running.std == 0
+    for value in values:
+        running.add(value)
+
+    assert running.count == len(values)
+    assert running.mean == pytest.approx(statistics.fmean(values))
+    assert running.std == pytest.approx(statistics.stdev(values))
+
+
+async def test_flags_a_value_that_does_not_follow_a_change(tmp_path: Path) -> None:
+    """A temperature that does not move for an hour after it should have is stuck."""
+    from custom_components.ecodan_heat_pump.anomaly import AnomalyDetector
+    from custom_components.ecodan_heat_pump.models import HeatingStatus
+
+    start = heat_pump_state().last_communication
+
+    def _at(minutes: float, **changes) -> HeatPumpState:
+        return heat_pump_state(
+            last_communication=start + timedelta(minutes=minutes), **changes
+        )
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        detector = AnomalyDetector(hass, "test")
+        flow = detector.fields["flow_temperature"]
+
+        # Holding steady at the target while heating is expected
+        for minutes in range(0, 180, 10):
+            detector.observe(_at(minutes, heating_status=HeatingStatus.HEATING))
+        assert not flow.is_stuck
+
+        # Once the target changes, the flow should follow within the hour,
+        # however few updates there are in that time
+        detector.observe(_at(180, target_flow_temperature=45.0))
+        detector.observe(_at(239, target_flow_temperature=45.0))
+        assert not flow.is_stuck
+        detector.observe(_at(241, target_flow_temperature=45.0))
+        assert flow.is_stuck
+        # The tank only has to change while heating water
+        assert not detector.fields["water_tank_temperature"].is_stuck
+
+        detector.observe(_at(250, target_flow_temperature=45.0, flow_temperature=40.0))
+        assert not flow.is_stuck
+
+
+async def test_clears_a_stuck_value_once_the_check_stops_applying(
+    tmp_path: Path,
+) -> None:
+    """A value that need not change any more is no longer stuck."""
+    from custom_components.ecodan_heat_pump.anomaly import AnomalyDetector
+    from custom_components.ecodan_heat_pump.models import HeatingStatus
+
+    start = heat_pump_state().last_communication
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        detector = AnomalyDetector(hass, "test")
+        tank = detector.fields["water_tank_temperature"]
+
+        detector.observe(heat_pump_state(last_communication=start))
+        for minutes in (1, 30, 61):
+            detector.observe(
+                heat_pump_state(
+                    last_communication=start + timedelta(minutes=minutes),
+                    is_forced_to_heat_water=True,
+                )
+            )
+        assert tank.is_stuck
+
+        detector.observe(
+            heat_pump_state(
+                last_communication=start + timedelta(minutes=62),
+                heating_status=HeatingStatus.IDLE,
+            )
+        )
+        assert not tank.is_stuck
+
+
+async def test_flags_a_drift_from_the_usual_range(tmp_path: Path) -> None:
+    """A smoothed value far outside the statistics of its bucket is deviating."""
+    from custom_components.ecodan_heat_pump.anomaly import AnomalyDetector
+    from custom_components.ecodan_heat_pump.const import ANOMALY_MIN_SAMPLES
+
+    generator = random.Random(1)
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        detector = AnomalyDetector(hass, "test")
+        flow = detector.fields["flow_temperature"]
+        for _ in range(ANOMALY_MIN_SAMPLES):
+            detector.observe(
+                heat_pump_state(flow_temperature=round(generator.gauss(35, 1), 1))
+            )
+        assert flow.z_score is None
+
+        detector.observe(heat_pump_state(flow_temperature=35.0))
+        assert not flow.is_deviating
+
+        # A single outlier is smoothed away, a lasting drift is not
+        detector.observe(heat_pump_state(flow_temperature=45.0))
+        assert not flow.is_deviating
+        for _ in range(10):
+            detector.observe(heat_pump_state(flow_temperature=45.0))
+        assert flow.is_deviating
+        # Outliers are kept out of the statistics
+        count = flow.statistics[flow.bucket].count
+        assert count == ANOMALY_MIN_SAMPLES + 1
+
+        # Defrosting is skipped altogether
+        detector.observe(heat_pump_state(flow_temperature=20.0, is_defrost_mode=True))
+        assert flow.last_value == 45.0
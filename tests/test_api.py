@@ -0,0 +1,121 @@
+"""Tests for the API client against the simulator."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from simulator import Simulator
+from tests.common import async_api_client, async_serve
+
+
+def _fail_first(simulator: Simulator, endpoint: str, status: int) -> None:
+    """Make the first request to an endpoint fail with the given status."""
+    inject_faults = simulator._inject_faults
+    failed = False
+
+    async def _inject_faults(name: str) -> web.Response | None:
+        nonlocal failed
+        if name == endpoint and not failed:
+            failed = True
+            simulator._count(name, status)
+            return web.Response(status=status)
+        return await inject_faults(name)
+
+    simulator._inject_faults = _inject_faults
+
+
+async def test_hedges_a_slow_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A request slower than the hedge delay is sent again, and the faster one wins."""
+    from custom_components.ecodan_heat_pump import api
+
+    monkeypatch.setattr(api, "HEDGE_MIN_DELAY", 0.05)
+    async with async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        await client.async_get_data()
+        client._get_latencies.extend([0.01] * api.HEDGE_MIN_SAMPLES)
+        assert client._hedge_delay() == 0.05
+
+        # Only the first request is slow
+        simulator.faults["list_devices"].latency = 1
+        start = time.monotonic()
+        request = asyncio.create_task(client.async_get_data())
+        await asyncio.sleep(0.01)
+        simulator.faults["list_devices"].latency = 0
+        state = await request
+
+        assert state.device_id == 1
+        assert time.monotonic() - start < 0.5
+        # The cancelled request is recorded too, once it has been cancelled
+        await asyncio.sleep(0)
+        assert len(client._get_latencies) == 1 + api.HEDGE_MIN_SAMPLES + 2
+        assert max(list(client._get_latencies)[-2:]) >= 0.05
+
+
+async def test_does_not_hedge_a_queued_request(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Time queued behind the scheduler neither triggers a hedge nor counts as latency."""
+    from custom_components.ecodan_heat_pump import api
+    from custom_components.ecodan_heat_pump.scheduler import RequestPriority
+
+    monkeypatch.setattr(api, "HEDGE_MIN_DELAY", 0.05)
+    async with async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        await client.async_login_all()
+        client._get_latencies.extend([0.01] * api.HEDGE_MIN_SAMPLES)
+
+        # Polls leave one slot free, so holding the other queues them
+        client.scheduler.max_concurrent = 2
+        async with client.scheduler.slot(RequestPriority.INTERACTIVE):
+            request = asyncio.create_task(client.async_get_data())
+            await asyncio.sleep(0.2)
+            assert simulator.counters["list_devices"] == {}
+        await request
+
+        # Neither a hedged request nor the time queued is recorded
+        await asyncio.sleep(0)
+        assert simulator.counters["list_devices"] == {"200": 1}
+        assert len(client._get_latencies) == api.HEDGE_MIN_SAMPLES + 1
+        assert client._get_latencies[-1] < 0.2
+
+
+async def test_retries_a_failed_request_straight_away() -> None:
+    """A request that fails before the hedge delay is retried without waiting."""
+    from custom_components.ecodan_heat_pump.const import HEDGE_DEFAULT_DELAY
+
+    async with async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        _fail_first(simulator, "list_devices", 503)
+
+        start = time.monotonic()
+        state = await client.async_get_data()
+
+        assert state.device_id == 1
+        assert time.monotonic() - start < HEDGE_DEFAULT_DELAY
+        assert simulator.counters["list_devices"] == {"503": 1, "200": 1}
+        # The failed request is censored at the hedge delay it was sent with
+        assert sorted(client._get_latencies)[-1] == HEDGE_DEFAULT_DELAY
+
+
+async def test_raises_when_every_request_fails() -> None:
+    """The first request's error is raised once the hedged request fails too."""
+    from custom_components.ecodan_heat_pump.errors import (
+        ApiClientCommunicationException,
+    )
+
+    async with async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        simulator.faults["list_devices"].server_error_rate = 1
+
+        with pytest.raises(ApiClientCommunicationException):
+            await client.async_get_data()
+
+        assert sum(simulator.counters["list_devices"].values()) == 2
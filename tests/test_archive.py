@@ -0,0 +1,99 @@
+"""Tests for the telemetry archive's encoding."""
+
+from __future__ import annotations
+
+import math
+import struct
+from datetime import date
+from pathlib import Path
+
+from tests.common import async_test_home_assistant, heat_pump_state
+
+
+def test_varints_round_trip() -> None:
+    """Signed integers survive zigzag varint encoding, small ones in a byte each."""
+    from custom_components.ecodan_heat_pump.archive import (
+        _decode_varints,
+        _encode_varints,
+    )
+
+    values = [0, 1, -1, 63, -64, 64, -65, 300, -300, 2**40, -(2**40), 2**63]
+    assert _decode_varints(_encode_varints(values)) == values
+    assert len(_encode_varints([0, 1, -1, 63, -64])) == 5
+
+
+def test_deltas_round_trip() -> None:
+    """Delta encoding turns steady timestamps into small numbers and back."""
+    from custom_components.ecodan_heat_pump.archive import _deltas, _undeltas
+
+    timestamps = [1_700_000_000 + 60 * index for index in range(10)]
+    deltas = _deltas(timestamps)
+    assert deltas[1:] == [60] * 9
+    assert _undeltas(deltas) == timestamps
+
+
+def test_float_column_round_trips_bit_for_bit() -> None:
+    """Floats are XORed with the previous value without losing any bits."""
+    from custom_components.ecodan_heat_pump.archive import (
+        _decode_column,
+        _encode_column,
+    )
+
+    values = [21.5, 21.5, 21.75, -0.0, 0.1, math.inf, -math.inf, math.nan, 3]
+    kind, data = _encode_column(values)
+    decoded = _decode_column(kind, data, len(values))
+
+    assert kind == "float"
+    assert [struct.pack(">d", value) for value in decoded] == [
+        struct.pack(">d", value) for value in values
+    ]
+    # Unchanged values leave an all zero XOR
+    assert data[8:16] == bytes(8)
+
+
+def test_block_round_trips_every_column_kind() -> None:
+    """A block decodes to the columns it was encoded from, or just those wanted."""
+    from custom_components.ecodan_heat_pump.archive import (
+        _decode_block,
+        _encode_block,
+    )
+
+    rows = [
+        {
+            "timestamp": 100 + index,
+            "on": index % 2 == 0,
+            "temperature": 20.5 + index,
+            "mode": "heat_flow",
+            "day": None if index else "2024-01-01",
+        }
+        for index in range(5)
+    ]
+    block = _encode_block(rows)
+
+    decoded = _decode_block(block, None)
+    assert decoded == {name: [row[name] for row in rows] for name in rows[0]}
+    assert list(_decode_block(block, {"timestamp", "on"})) == ["timestamp", "on"]
+
+
+async def test_archive_streams_appended_snapshots(tmp_path: Path) -> None:
+    """Snapshots appended to the archive are read back, one column or all of them."""
+    from custom_components.ecodan_heat_pump.archive import (
+        TelemetryArchive,
+        iter_rows,
+    )
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        archive = TelemetryArchive(hass, str(tmp_path / "archive"))
+        states = [heat_pump_state(flow_temperature=30.0 + index) for index in range(3)]
+        for state in states:
+            await archive.async_append(state)
+        await archive.async_flush()
+
+    rows = list(iter_rows(str(tmp_path / "archive"), columns=["flow_temperature"]))
+    assert [row["flow_temperature"] for row in rows] == [30.0, 31.0, 32.0]
+    assert set(rows[0]) == {"timestamp", "flow_temperature"}
+
+    row = next(iter_rows(str(tmp_path / "archive")))
+    assert row["heating_mode"] == states[0].heating_mode.value
+    assert row["has_power"] is True
+    assert list(iter_rows(str(tmp_path / "archive"), end=date(2000, 1, 1))) == []
@@ -0,0 +1,63 @@
+"""Tests for backfilling the daily energy reports."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from simulator import Simulator
+from tests.common import async_api_client, async_serve, async_test_home_assistant
+
+
+def test_groups_missing_days_into_chunks() -> None:
+    """Consecutive days are fetched together, at most a chunk at a time."""
+    from custom_components.ecodan_heat_pump.backfill import _chunks
+    from custom_components.ecodan_heat_pump.const import BACKFILL_CHUNK_DAYS
+
+    first = date(2025, 1, 1)
+    days = [first + timedelta(days=day) for day in range(40)]
+    days += [date(2025, 3, 1), date(2025, 3, 3)]
+
+    assert list(_chunks(days)) == [
+        (first, first + timedelta(days=BACKFILL_CHUNK_DAYS - 1)),
+        (first + timedelta(days=BACKFILL_CHUNK_DAYS), days[39]),
+        (date(2025, 3, 1), date(2025, 3, 1)),
+        (date(2025, 3, 3), date(2025, 3, 3)),
+    ]
+
+
+async def test_fetches_each_day_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Cached days are never fetched again, even by a new backfill of the entry."""
+    from homeassistant.util import dt as dt_util
+
+    from custom_components.ecodan_heat_pump import backfill
+    from custom_components.ecodan_heat_pump.backfill import EnergyBackfill
+
+    monkeypatch.setattr(backfill, "BACKFILL_CHUNK_DELAY", 0)
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        energy = EnergyBackfill(hass, client, "test")
+
+        await energy.async_run("1", date(2025, 1, 1), date(2025, 2, 15))
+        assert simulator.counters["energy_report"] == {"200": 2}
+        assert len(energy._days) == 46
+
+        await energy.async_run("1", date(2025, 2, 10), date(2025, 2, 20))
+        assert simulator.counters["energy_report"] == {"200": 3}
+        assert len(energy._days) == 51
+
+        await EnergyBackfill(hass, client, "test").async_run(
+            "1", date(2025, 1, 1), date(2025, 2, 20)
+        )
+        assert simulator.counters["energy_report"] == {"200": 3}
+
+        # Today's report is incomplete, so it is left for tomorrow
+        today = dt_util.now().date()
+        await energy.async_run("1", today - timedelta(days=1), today)
+        assert (today - timedelta(days=1)).isoformat() in energy._days
+        assert today.isoformat() not in energy._days
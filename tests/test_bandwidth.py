@@ -0,0 +1,145 @@
+"""Tests for the bandwidth budget and the polling paced by it."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from tests.common import async_api_client, async_test_home_assistant
+
+HALF_A_DAY = 12 * 60 * 60
+
+
+def test_counts_usage_against_the_budget() -> None:
+    """The budget keeps a reserve for commands, and starts again at midnight."""
+    from custom_components.ecodan_heat_pump.bandwidth import BandwidthBudget
+
+    budget = BandwidthBudget()
+    budget.record(100, 900, compressed=True)
+    assert budget.remaining is None
+    assert budget.telemetry_remaining is None
+
+    budget.daily_budget = 10_000
+    budget.record(1_000, 2_000, compressed=False)
+    assert budget.as_dict() == {
+        "daily_budget": 10_000,
+        "used": 4_000,
+        "remaining": 6_000,
+        "requests": 2,
+        "compressed_responses": 1,
+        "uncompressed_responses": 1,
+    }
+    assert budget.telemetry_remaining == 5_000
+
+    budget._day -= timedelta(days=1)
+    assert budget.remaining == 10_000
+    assert budget.total == 4_000
+
+
+def test_days_end_at_midnight_in_home_assistant_time_zone(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The day, and so the budget, follows Home Assistant's time zone, not the host's."""
+    from homeassistant.util import dt as dt_util
+
+    from custom_components.ecodan_heat_pump.bandwidth import (
+        BandwidthBudget,
+        seconds_left_today,
+    )
+
+    time_zone = dt_util.get_time_zone("Pacific/Auckland")
+    now = datetime(2024, 1, 1, 23, 0, tzinfo=time_zone)
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", time_zone)
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: now)
+    assert seconds_left_today() == 60 * 60
+
+    budget = BandwidthBudget(daily_budget=10_000)
+    budget.record(1_000, 0, compressed=None)
+    now += timedelta(minutes=59)
+    assert budget.remaining == 9_000
+    now += timedelta(minutes=2)
+    assert budget.remaining == 10_000
+
+
+def test_defers_bulk_requests_ahead_of_schedule(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Bulk requests wait while the day's usage is ahead of schedule, others never do."""
+    from custom_components.ecodan_heat_pump import bandwidth
+    from custom_components.ecodan_heat_pump.scheduler import RequestPriority
+
+    monkeypatch.setattr(bandwidth, "seconds_left_today", lambda: HALF_A_DAY)
+    budget = bandwidth.BandwidthBudget(daily_budget=10_000)
+
+    # Half way through the day, half of the budget for polling may be used
+    budget.record(4_500, 0, compressed=None)
+    assert budget.allows(RequestPriority.BULK)
+    budget.record(1, 0, compressed=None)
+    assert not budget.allows(RequestPriority.BULK)
+    assert budget.allows(RequestPriority.BACKGROUND)
+    assert budget.allows(RequestPriority.INTERACTIVE)
+
+
+async def test_paces_polling_to_last_until_midnight(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Polling slows down to spread the budget, and stops once it is used up."""
+    from custom_components.ecodan_heat_pump import coordinator
+    from custom_components.ecodan_heat_pump.analytics import CopModel
+    from custom_components.ecodan_heat_pump.anomaly import AnomalyDetector
+    from custom_components.ecodan_heat_pump.backfill import EnergyBackfill
+    from custom_components.ecodan_heat_pump.const import COORDINATOR_UPDATE_INTERVAL
+    from custom_components.ecodan_heat_pump.journal import CommandJournal
+
+    monkeypatch.setattr(coordinator, "seconds_left_today", lambda: HALF_A_DAY)
+    async with async_test_home_assistant(
+        str(tmp_path)
+    ) as hass, async_api_client() as client:
+        paced = coordinator.Coordinator(
+            hass,
+            client,
+            CommandJournal(hass, "test"),
+            EnergyBackfill(hass, client, "test"),
+            CopModel(hass, "test"),
+            AnomalyDetector(hass, "test"),
+        )
+        paced._record_update_bytes(10_000)
+        assert paced._paced_update_interval() == COORDINATOR_UPDATE_INTERVAL
+
+        # 10kB an update with 1.8MB left for polling lasts 180 updates
+        client.bandwidth.daily_budget = 2_000_000
+        assert paced._paced_update_interval() == timedelta(seconds=HALF_A_DAY / 180)
+
+        # Polling is never faster than configured
+        client.bandwidth.daily_budget = 200_000_000
+        assert paced._paced_update_interval() == COORDINATOR_UPDATE_INTERVAL
+
+        # Once the budget for polling is used up, it resumes after midnight
+        client.bandwidth.daily_budget = 2_000_000
+        client.bandwidth.record(1_795_000, 0, compressed=None)
+        assert paced._paced_update_interval() == timedelta(seconds=HALF_A_DAY + 1)
+
+
+async def test_shares_the_smallest_budget_of_an_account() -> None:
+    """Config entries sharing an account share the smallest of their budgets."""
+    from custom_components.ecodan_heat_pump.accounts import AccountRegistry
+    from custom_components.ecodan_heat_pump.models import Credentials, CredentialsId
+
+    registry = AccountRegistry()
+    credentials = [
+        Credentials(credentials_id, "test", "test") for credentials_id in CredentialsId
+    ]
+    client = registry.client("a", credentials)
+    assert registry.client("b", credentials) is client
+
+    registry.set_bandwidth_budget("a", 5_000_000)
+    registry.set_bandwidth_budget("b", None)
+    assert client.bandwidth.daily_budget == 5_000_000
+    registry.set_bandwidth_budget("b", 2_000_000)
+    assert client.bandwidth.daily_budget == 2_000_000
+
+    await registry.async_release("b")
+    assert client.bandwidth.daily_budget == 5_000_000
+    await registry.async_release("a")
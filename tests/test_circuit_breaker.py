@@ -0,0 +1,113 @@
+"""Tests for the circuit breaker."""
+
+from __future__ import annotations
+
+import pytest
+
+from simulator import Simulator
+from tests.common import async_api_client, async_serve
+
+
+def _breaker(**kwargs):
+    from custom_components.ecodan_heat_pump.circuit_breaker import CircuitBreaker
+
+    return CircuitBreaker(**kwargs)
+
+
+def test_opens_after_consecutive_failures() -> None:
+    """The circuit opens once the failure threshold is reached, and then fails fast."""
+    from custom_components.ecodan_heat_pump.circuit_breaker import CircuitState
+    from custom_components.ecodan_heat_pump.errors import (
+        ApiClientCircuitOpenException,
+    )
+
+    breaker = _breaker(failure_threshold=3)
+    for _ in range(2):
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    # A success in between starts the count again
+    breaker.before_request()
+    breaker.record_success()
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(ApiClientCircuitOpenException):
+        breaker.before_request()
+
+
+def test_lets_a_single_probe_through() -> None:
+    """Once the backoff has elapsed, one request probes while the others fail fast."""
+    from custom_components.ecodan_heat_pump.circuit_breaker import CircuitState
+    from custom_components.ecodan_heat_pump.errors import (
+        ApiClientCircuitOpenException,
+    )
+
+    breaker = _breaker(failure_threshold=1)
+    breaker.record_failure()
+    breaker.retry_at = 0
+
+    breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(ApiClientCircuitOpenException):
+        breaker.before_request()
+
+    # A cancelled probe lets the next request probe instead
+    breaker.record_cancelled()
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.trips == 0
+
+
+def test_backs_off_exponentially(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Each failed probe doubles the delay, up to the maximum."""
+    from custom_components.ecodan_heat_pump import circuit_breaker
+
+    # Take the longest delay the jitter allows
+    monkeypatch.setattr(circuit_breaker.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: 1000.0)
+    breaker = _breaker(failure_threshold=1, base_delay=10, max_delay=50)
+
+    delays = []
+    breaker.record_failure()
+    delays.append(breaker.retry_at - 1000)
+    for _ in range(3):
+        breaker.retry_at = 0
+        breaker.before_request()
+        breaker.record_failure()
+        delays.append(breaker.retry_at - 1000)
+
+    assert delays == [10, 20, 40, 50]
+
+
+async def test_fails_fast_while_melcloud_is_down() -> None:
+    """Requests stop reaching MELCloud once it fails, until a probe succeeds."""
+    from custom_components.ecodan_heat_pump.circuit_breaker import CircuitState
+    from custom_components.ecodan_heat_pump.errors import (
+        ApiClientCircuitOpenException,
+        ApiClientCommunicationException,
+    )
+
+    async with async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        await client.async_get_data()
+        simulator.faults["list_devices"].server_error_rate = 1
+        while client.circuit_breaker.state != CircuitState.OPEN:
+            with pytest.raises(ApiClientCommunicationException):
+                await client.async_get_data()
+        requests = sum(simulator.counters["list_devices"].values())
+
+        with pytest.raises(ApiClientCircuitOpenException):
+            await client.async_get_data()
+        assert sum(simulator.counters["list_devices"].values()) == requests
+
+        # MELCloud recovers, and the probe after the backoff closes the circuit
+        simulator.faults["list_devices"].server_error_rate = 0
+        client.circuit_breaker.retry_at = 0
+        state = await client.async_get_data()
+        assert state.device_id == 1
+        assert client.circuit_breaker.state == CircuitState.CLOSED
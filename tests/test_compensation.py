@@ -0,0 +1,133 @@
+"""Tests for the weather compensation controller."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from tests.common import heat_pump_state
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Replace the controller's clock with one the test moves on."""
+    from custom_components.ecodan_heat_pump import compensation
+
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(
+        compensation, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    return clock
+
+
+def _controller(writes_per_hour: int = 2):
+    from custom_components.ecodan_heat_pump.compensation import (
+        CompensationController,
+    )
+
+    return CompensationController(-10, 45, writes_per_hour)
+
+
+def test_curve_runs_from_the_balance_point_to_the_design_point() -> None:
+    """The curve is a clamped straight line, in whole steps."""
+    from custom_components.ecodan_heat_pump.const import MAX_FLOW_TEMP, MIN_FLOW_TEMP
+
+    controller = _controller()
+    assert controller.curve(20) == MIN_FLOW_TEMP
+    assert controller.curve(30) == MIN_FLOW_TEMP
+    assert controller.curve(-10) == 45
+    assert controller.curve(5) == 35
+    assert controller.curve(5.2) == 35
+    assert controller.curve(-40) == MAX_FLOW_TEMP
+
+
+def test_ignores_swings_within_the_hysteresis_band(clock: SimpleNamespace) -> None:
+    """Noise and short swings of the outdoor temperature do not cause writes."""
+    controller = _controller(writes_per_hour=100)
+    target = controller.observe(
+        heat_pump_state(outdoor_temperature=5.0, target_flow_temperature=30.0)
+    )
+    assert target == 35
+
+    for outdoor_temperature in (5.4, 4.6, 5.3, 4.7) * 5:
+        clock.now += 60
+        assert (
+            controller.observe(
+                heat_pump_state(
+                    outdoor_temperature=outdoor_temperature,
+                    target_flow_temperature=target,
+                )
+            )
+            is None
+        )
+    assert controller.reference_outdoor_temperature == 5.0
+
+    # A lasting change moves the curve once the smoothed value leaves the band
+    writes = []
+    for _ in range(30):
+        clock.now += 60
+        if (
+            written := controller.observe(
+                heat_pump_state(outdoor_temperature=0.0, target_flow_temperature=target)
+            )
+        ) is not None:
+            writes.append(written)
+            target = written
+    assert target == controller.curve(0.0) == 38
+    assert len(writes) <= 5
+
+
+def test_keeps_to_the_hourly_write_budget(clock: SimpleNamespace) -> None:
+    """Writes beyond the hourly budget are deferred until an hour has passed."""
+    controller = _controller(writes_per_hour=2)
+
+    def _observe(outdoor_temperature: float) -> float | None:
+        # Every write is ignored by the device, so each snapshot wants one
+        return controller.observe(
+            heat_pump_state(
+                outdoor_temperature=outdoor_temperature,
+                target_flow_temperature=30.0,
+            )
+        )
+
+    assert _observe(5.0) == 35
+    clock.now = 60
+    assert _observe(5.0) == 35
+    clock.now = 120
+    assert _observe(5.0) is None
+    assert controller.deferred_writes == 1
+    assert controller.writes_last_hour == 2
+
+    clock.now = 3600
+    assert controller.writes_last_hour == 1
+    assert _observe(5.0) == 35
+
+
+def test_leaves_other_heating_modes_alone() -> None:
+    """Nothing is written while the heat pump is off or follows its own curve."""
+    from custom_components.ecodan_heat_pump.models import HeatingMode
+
+    controller = _controller()
+    assert (
+        controller.observe(
+            heat_pump_state(
+                outdoor_temperature=5.0,
+                target_flow_temperature=30.0,
+                has_power=False,
+            )
+        )
+        is None
+    )
+    assert (
+        controller.observe(
+            heat_pump_state(
+                outdoor_temperature=5.0,
+                target_flow_temperature=30.0,
+                heating_mode=HeatingMode.CURVE_TEMPERATURE,
+            )
+        )
+        is None
+    )
+    # The target still follows the curve, for the sensor
+    assert controller.target == 35
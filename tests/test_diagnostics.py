@@ -0,0 +1,58 @@
+"""Tests for the diagnostics."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from simulator import Simulator
+from tests.common import (
+    async_api_client,
+    async_serve,
+    async_test_home_assistant,
+    create_coordinator,
+)
+
+CREDENTIALS = {
+    f"{field}_{index}": f"{field}-{index}-of-the-test-account"
+    for field in ("username", "password")
+    for index in (1, 2, 3)
+}
+
+
+async def test_redacts_the_credentials(tmp_path: Path) -> None:
+    """No username or password appears anywhere in the diagnostics."""
+    from homeassistant.components.diagnostics import REDACTED
+    from homeassistant.config_entries import ConfigEntry
+
+    from custom_components.ecodan_heat_pump import build_credentials
+    from custom_components.ecodan_heat_pump.const import DOMAIN
+    from custom_components.ecodan_heat_pump.diagnostics import (
+        async_get_config_entry_diagnostics,
+    )
+
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1)
+    ), async_api_client() as client:
+        client.update_credentials(build_credentials(CREDENTIALS))
+        coordinator = create_coordinator(hass, client)
+        entry = coordinator.config_entry = ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="Test",
+            data=CREDENTIALS,
+            source="user",
+            entry_id="test",
+        )
+        hass.data[DOMAIN] = {entry.entry_id: coordinator}
+        await coordinator.async_refresh()
+
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"] == dict.fromkeys(CREDENTIALS, REDACTED)
+    assert diagnostics["data"]["device_id"] == coordinator.data.device_id
+    assert diagnostics["metrics"]
+    dumped = json.dumps(diagnostics, default=str)
+    for value in CREDENTIALS.values():
+        assert value not in dumped
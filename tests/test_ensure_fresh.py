@@ -0,0 +1,101 @@
+"""Tests for the ensure_fresh service."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from simulator import Simulator
+from tests.common import (
+    async_api_client,
+    async_serve,
+    async_test_home_assistant,
+    create_coordinator,
+)
+
+
+def _requests(simulator: Simulator) -> int:
+    """Return the number of data requests the simulator has answered."""
+    return sum(
+        sum(simulator.counters[endpoint].values())
+        for endpoint in ("list_devices", "device")
+    )
+
+
+async def test_refreshes_only_stale_data(tmp_path: Path) -> None:
+    """A snapshot within max_age is returned as it is, an older one refreshed."""
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+
+        assert await coordinator.async_ensure_fresh(30)
+        assert _requests(simulator) == 1
+        assert not await coordinator.async_ensure_fresh(30)
+        assert _requests(simulator) == 1
+
+        coordinator.updated_at -= 60
+        assert await coordinator.async_ensure_fresh(30)
+        assert _requests(simulator) == 2
+        assert coordinator.age < 30
+
+
+async def test_joins_the_refresh_in_progress(tmp_path: Path) -> None:
+    """Concurrent callers, and a scheduled refresh, share a single request."""
+    simulator = Simulator(device_count=1)
+    simulator.faults["list_devices"].latency = 0.2
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        simulator
+    ), async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+
+        refresh = asyncio.create_task(coordinator.async_refresh())
+        await asyncio.sleep(0.05)
+        waited = await asyncio.gather(
+            coordinator.async_ensure_fresh(0), coordinator.async_ensure_fresh(0)
+        )
+        await refresh
+
+        assert waited == [True, True]
+        assert _requests(simulator) == 1
+        assert coordinator.last_update_success
+
+
+async def test_service_reports_the_age_of_each_entry(tmp_path: Path) -> None:
+    """The service responds with the age of every entry and whether it waited."""
+    from homeassistant.exceptions import HomeAssistantError
+
+    from custom_components.ecodan_heat_pump.const import DOMAIN, SERVICE_ENSURE_FRESH
+    from custom_components.ecodan_heat_pump.services import async_setup_services
+
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+        hass.data[DOMAIN] = {"test": coordinator}
+        async_setup_services(hass)
+
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_ENSURE_FRESH, {}, blocking=True, return_response=True
+        )
+        assert response["entries"]["test"]["refreshed"] is True
+        assert response["age"] == response["entries"]["test"]["age"] < 30
+
+        for endpoint in ("list_devices", "device"):
+            simulator.faults[endpoint].server_error_rate = 1.0
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_ENSURE_FRESH, {}, blocking=True, return_response=True
+        )
+        assert response["entries"]["test"]["refreshed"] is False
+
+        coordinator.updated_at -= 60
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_ENSURE_FRESH,
+                {"max_age": 30},
+                blocking=True,
+                return_response=True,
+            )
@@ -0,0 +1,31 @@
+"""Tests for the modules that importing the integration loads."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules that are too slow to import with the platforms
+LAZY_MODULES = ("numpy", "homeassistant.components.recorder")
+
+
+def test_heavy_modules_are_imported_lazily() -> None:
+    """Importing the platforms leaves NumPy and the recorder to their users."""
+    from benchmarks.cases import INTEGRATION_MODULES, PRELOADED_MODULES
+
+    code = "\n".join(
+        [
+            "import sys",
+            *(f"import {module}" for module in PRELOADED_MODULES),
+            *(f"import {module}" for module in INTEGRATION_MODULES),
+            f"print(*sorted(set({LAZY_MODULES!r}) & set(sys.modules)))",
+        ]
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert process.stdout.split() == []
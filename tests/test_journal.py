@@ -0,0 +1,78 @@
+"""Tests for the command journal."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from tests.common import async_test_home_assistant
+
+
+async def test_latest_value_wins(tmp_path: Path) -> None:
+    """Only the latest value queued for a field is replayed."""
+    from custom_components.ecodan_heat_pump.journal import CommandJournal
+    from custom_components.ecodan_heat_pump.models import HeatingMode
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        journal = CommandJournal(hass, "test")
+        assert not journal
+
+        journal.record("target_flow_temperature", 40.0)
+        journal.record("target_flow_temperature", 42.0)
+        journal.record("heating_mode", HeatingMode.FLOW_TEMPERATURE)
+
+        assert journal
+        assert journal.changes() == {
+            "target_flow_temperature": 42.0,
+            "heating_mode": HeatingMode.FLOW_TEMPERATURE,
+        }
+
+
+async def test_drops_commands_older_than_max_age(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Commands queued longer ago than the maximum age are not replayed."""
+    from custom_components.ecodan_heat_pump import journal as journal_module
+    from custom_components.ecodan_heat_pump.const import JOURNAL_MAX_AGE
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        journal = journal_module.CommandJournal(hass, "test")
+        journal.record("has_power", True)
+        issued_at = journal_module.dt_util.utcnow()
+
+        def _later(seconds: float) -> None:
+            now = issued_at + timedelta(seconds=seconds)
+            monkeypatch.setattr(
+                journal_module, "dt_util", SimpleNamespace(utcnow=lambda: now)
+            )
+
+        _later(JOURNAL_MAX_AGE - 60)
+        assert journal.changes() == {"has_power": True}
+        _later(JOURNAL_MAX_AGE + 60)
+        assert journal.changes() == {}
+
+
+async def test_remove_keeps_commands_queued_since(tmp_path: Path) -> None:
+    """Removing the replayed commands keeps those queued while they were replayed."""
+    from custom_components.ecodan_heat_pump.journal import CommandJournal
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        journal = CommandJournal(hass, "test")
+        journal.record("target_flow_temperature", 40.0)
+        journal.record("has_power", True)
+        queued = journal.queued()
+
+        journal.record("target_flow_temperature", 42.0)
+        journal.record("target_water_tank_temperature", 50.0)
+        await journal.async_remove(queued)
+
+        assert journal.changes() == {
+            "target_flow_temperature": 42.0,
+            "target_water_tank_temperature": 50.0,
+        }
+
+        await journal.async_remove(journal.queued())
+        assert not journal
@@ -0,0 +1,99 @@
+"""Tests for the live and full refresh tiers."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from simulator import Simulator
+from simulator import server
+from tests.common import (
+    async_api_client,
+    async_serve,
+    async_test_home_assistant,
+    create_coordinator,
+    heat_pump_state,
+)
+
+# A time zone other than that of the test host, for the devices' local time
+DEVICE_TIME_ZONE = timezone(timedelta(hours=2))
+
+
+def test_keeps_the_fields_device_get_lacks() -> None:
+    """Fields missing from a Device/Get response keep their previous values."""
+    from custom_components.ecodan_heat_pump.api import ApiClient
+    from custom_components.ecodan_heat_pump.coordinator import has_current_energy
+
+    client = ApiClient(credentials=[], session=None)
+    state = heat_pump_state(
+        flow_temperature=40.0, has_error=True, rate_of_current_energy_consumption=2.0
+    )
+    live = Simulator(device_count=1, seed=1).devices[1].live_state()
+    live["TankWaterTemperature"] = 42.0
+
+    merged = client._merge_live_response(state, live)
+    assert merged.water_tank_temperature == 42.0
+    assert merged.flow_temperature == 40.0
+    assert merged.has_error is True
+    assert merged.rate_of_current_energy_consumption == 2.0
+    assert merged.last_communication.tzinfo is timezone.utc
+    # The energy rates and so the COP are older than the temperatures
+    assert merged.current_energy_updated_at == state.last_communication
+    assert not has_current_energy(merged)
+    # The state the response was merged into is left alone
+    assert state.water_tank_temperature != 42.0
+
+    live.update(CurrentEnergyConsumed=1.0, CurrentEnergyProduced=4.0)
+    merged = client._merge_live_response(state, live)
+    assert merged.current_coefficient_of_performance == 4.0
+    assert has_current_energy(merged)
+
+
+async def test_both_tiers_report_the_last_communication_in_utc(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """ListDevices' local timestamps and Device/Get's UTC ones are the same clock."""
+    monkeypatch.setattr(
+        server,
+        "_format_timestamp",
+        lambda now: datetime.fromtimestamp(now, DEVICE_TIME_ZONE).strftime(
+            "%Y-%m-%dT%H:%M:%S"
+        ),
+    )
+    async with async_serve(Simulator(device_count=1)), async_api_client() as client:
+        client.time_zone = DEVICE_TIME_ZONE
+        full = await client.async_get_data()
+        live = await client.async_get_live_data(full)
+
+    assert full.last_communication.tzinfo is timezone.utc
+    assert live.last_communication.tzinfo is timezone.utc
+    assert timedelta(0) <= live.last_communication - full.last_communication
+    assert live.last_communication - full.last_communication < timedelta(seconds=2)
+
+
+async def test_refreshes_everything_every_slow_interval(tmp_path: Path) -> None:
+    """Refreshes request the live values, and everything once the slow interval passes."""
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1)
+    ) as simulator, async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+
+        await coordinator.async_refresh()
+        assert simulator.counters["list_devices"] == {"200": 1}
+        flow_temperature = coordinator.data.flow_temperature
+
+        simulator.devices[1].state["FlowTemperature"] = flow_temperature + 5
+        simulator.devices[1].state["TankWaterTemperature"] = 30.0
+        await coordinator.async_refresh()
+        await coordinator.async_refresh()
+        assert simulator.counters["list_devices"] == {"200": 1}
+        assert simulator.counters["device"] == {"200": 2}
+        assert coordinator.data.water_tank_temperature == 30.0
+        assert coordinator.data.flow_temperature == flow_temperature
+
+        coordinator._slow_updated_at -= coordinator.slow_update_interval.total_seconds()
+        await coordinator.async_refresh()
+        assert simulator.counters["list_devices"] == {"200": 2}
+        assert coordinator.data.flow_temperature != flow_temperature
@@ -0,0 +1,83 @@
+"""Tests for logging in with every set of credentials."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+from simulator import Simulator
+from tests.common import async_api_client, async_serve, async_test_home_assistant
+
+USER_INPUT = {
+    "username_1": "first",
+    "password_1": "secret",
+    "username_2": "second",
+    "password_2": "secret",
+    "username_3": "third",
+    "password_3": "secret",
+}
+
+
+async def test_logs_in_with_every_set_of_credentials_at_once() -> None:
+    """The logins overlap, and concurrent callers share each one."""
+    simulator = Simulator(device_count=1)
+    simulator.faults["login"].latency = 0.2
+    async with async_serve(simulator), async_api_client() as client:
+        started = time.monotonic()
+        first, second = await asyncio.gather(
+            client.async_login_all(), client.async_login_all()
+        )
+        elapsed = time.monotonic() - started
+
+    assert first == second == {}
+    assert simulator.counters["login"] == {"200": 3}
+    assert all(credentials.access_token for credentials in client.credentials)
+    assert elapsed < 0.4
+
+
+async def test_returns_the_error_of_each_rejected_set_of_credentials() -> None:
+    """Credentials that log in keep their token while others are rejected."""
+    from custom_components.ecodan_heat_pump import build_credentials
+    from custom_components.ecodan_heat_pump.errors import (
+        ApiClientAuthenticationException,
+    )
+    from custom_components.ecodan_heat_pump.models import CredentialsId
+
+    async with async_serve(
+        Simulator(device_count=1, accounts={"first": "secret", "second": "secret"})
+    ), async_api_client() as client:
+        client.update_credentials(build_credentials(USER_INPUT))
+        errors = await client.async_login_all()
+
+    assert list(errors) == [CredentialsId.CREDENTIALS_3]
+    assert isinstance(
+        errors[CredentialsId.CREDENTIALS_3], ApiClientAuthenticationException
+    )
+    assert [
+        credentials.access_token is not None for credentials in client.credentials
+    ] == [
+        True,
+        True,
+        False,
+    ]
+
+
+async def test_config_flow_shows_the_error_of_each_set(tmp_path: Path) -> None:
+    """A rejected set of credentials is flagged on its username field."""
+    from custom_components.ecodan_heat_pump.config_flow import ConfigFlowHandler
+
+    simulator = Simulator(device_count=1, accounts={"first": "secret", "third": "x"})
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(simulator):
+        flow = ConfigFlowHandler()
+        flow.hass = hass
+
+        errors = await flow._test_credentials(USER_INPUT)
+        assert errors == {"username_2": "credentials_2", "username_3": "credentials_3"}
+
+        simulator.accounts = None
+        simulator.faults["login"].server_error_rate = 1.0
+        assert await flow._test_credentials(USER_INPUT) == {"base": "connection"}
+
+        simulator.faults["login"].server_error_rate = 0.0
+        assert await flow._test_credentials(USER_INPUT) == {}
@@ -0,0 +1,110 @@
+"""Tests for planning the hot water boosts."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from tests.common import async_test_home_assistant, heat_pump_state
+
+MIDNIGHT = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+def _hours(*hours: float) -> list[datetime]:
+    return [MIDNIGHT + timedelta(hours=hour) for hour in hours]
+
+
+def test_parses_the_forecasts_of_price_integrations() -> None:
+    """Intervals come from any known attribute, ending where the next one starts."""
+    from custom_components.ecodan_heat_pump.planner import parse_price_forecast
+
+    start, next_hour, later = _hours(0, 1, 3)
+    intervals = parse_price_forecast(
+        {
+            "raw_today": [
+                {"start": start, "end": next_hour, "value": 0.1},
+                # Overlaps the previous interval
+                {"start": start + timedelta(minutes=30), "price": 0.9},
+                {"start": None, "value": 0.9},
+                "not an interval",
+            ],
+            "forecast": [
+                {"valid_from": next_hour.isoformat(), "value_inc_vat": 0.2},
+                {"valid_from": later.isoformat(), "value_inc_vat": 0.3},
+            ],
+        }
+    )
+
+    assert intervals == [
+        (start, next_hour, 0.1),
+        (next_hour, later, 0.2),
+        (later, later + timedelta(hours=1), 0.3),
+    ]
+
+
+def test_resamples_the_forecast_up_to_its_first_gap() -> None:
+    """The horizon is cut into slots from the next slot on, until a gap."""
+    from custom_components.ecodan_heat_pump.planner import _resample
+
+    midnight, one, two, three, four = _hours(0, 1, 2, 3, 4)
+    slot_starts, prices = _resample(
+        [(midnight, one, 1.0), (one, two, 2.0), (three, four, 3.0)],
+        midnight + timedelta(minutes=10),
+        timedelta(minutes=15).total_seconds(),
+    )
+
+    assert slot_starts[0] == (midnight + timedelta(minutes=15)).timestamp()
+    assert slot_starts[-1] == (two - timedelta(minutes=15)).timestamp()
+    assert prices.tolist() == [1.0] * 3 + [2.0] * 4
+
+
+def test_costs_every_window_from_the_cooled_tank() -> None:
+    """A later boost starts from a cooler tank, so it is longer and costs more."""
+    import numpy as np
+
+    from custom_components.ecodan_heat_pump.planner import window_costs
+
+    prices = np.array([1.0, 2.0, 3.0, 4.0])
+    costs, lengths = window_costs(prices, np.array([0, 0.25, 0.5, 0.75]), 50, 50, 4, 4)
+    assert lengths.tolist() == [1, 1, 2, 3]
+    assert costs.tolist() == [1.0, 2.0, 7.0, np.inf]
+
+    # Slots that have started already cannot be planned
+    costs, _ = window_costs(prices, np.array([-0.25, 0, 0.25, 0.5]), 50, 50, 4, 0)
+    assert costs.tolist() == [np.inf, 2.0, 3.0, 4.0]
+
+
+async def test_plans_the_cheapest_window_of_each_day(tmp_path: Path) -> None:
+    """Each day of the forecast gets a boost, except the day already boosted."""
+    from custom_components.ecodan_heat_pump.planner import BoostPlanner
+
+    prices = [0.3] * 48
+    prices[3] = 0.05
+    prices[24 + 14 : 24 + 17] = [0.02] * 3
+    intervals = [
+        (start, start + timedelta(hours=1), price)
+        for start, price in zip(_hours(*range(48)), prices)
+    ]
+    state = heat_pump_state(
+        water_tank_temperature=50.0,
+        target_water_tank_temperature=50.0,
+        outdoor_temperature=5.0,
+    )
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        coordinator = SimpleNamespace(config_entry=SimpleNamespace(entry_id="test"))
+        planner = BoostPlanner(hass, coordinator, "sensor.price")
+
+        first, second = planner.plan(intervals, state, MIDNIGHT)
+        # The tank cools for three hours, then takes one slot to heat back up
+        assert (first.start, first.end) == tuple(_hours(3, 3.25))
+        assert first.mean_price == pytest.approx(0.05)
+        # and then for nearly 35 hours from full, which takes seven slots
+        assert (second.start, second.end) == tuple(_hours(38, 39.75))
+        assert second.mean_price == pytest.approx(0.02)
+
+        planner._boosted_on = MIDNIGHT.date()
+        [window] = planner.plan(intervals, state, MIDNIGHT)
+        assert window.start == second.start
@@ -0,0 +1,95 @@
+"""Tests for the profiler and the profile service."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from simulator import Simulator
+from tests.common import (
+    async_api_client,
+    async_serve,
+    async_test_home_assistant,
+    create_coordinator,
+)
+
+
+def test_spans_do_nothing_without_a_session() -> None:
+    """Spans and pauses outside a session record nothing."""
+    from custom_components.ecodan_heat_pump.profiler import Profiler
+
+    profiler = Profiler()
+    with profiler.span("update"), profiler.paused():
+        pass
+
+    assert not profiler.is_active
+    assert profiler.cycle_completed() is None
+
+
+async def test_profiles_while_any_task_is_inside_a_span(tmp_path: Path) -> None:
+    """Each task keeps its own span depth, and pausing leaves its wait out."""
+    from custom_components.ecodan_heat_pump.profiler import Profiler
+
+    profiler = Profiler()
+    profiler.start(1, str(tmp_path / "profile"))
+    session = profiler._session
+    entered = [asyncio.Event(), asyncio.Event()]
+    release = asyncio.Event()
+
+    async def run(index: int) -> None:
+        with profiler.span("update"), profiler.span("request"), profiler.paused():
+            entered[index].set()
+            await release.wait()
+
+    tasks = [asyncio.create_task(run(index)) for index in range(2)]
+    await entered[0].wait()
+    await entered[1].wait()
+    assert session.running == 0
+    assert set(session.depths.values()) == {2}
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert session.running == 0
+    assert session.depths == {}
+    assert profiler.cycle_completed() is session
+    assert not profiler.is_active
+    assert {name: len(durations) for name, durations in session.spans.items()} == {
+        "update": 2,
+        "request": 2,
+    }
+
+
+async def test_service_profiles_the_next_cycles(tmp_path: Path) -> None:
+    """The service profiles the given number of refreshes and writes the results."""
+    from homeassistant.exceptions import HomeAssistantError
+
+    from custom_components.ecodan_heat_pump.const import DOMAIN, SERVICE_PROFILE
+    from custom_components.ecodan_heat_pump.services import async_setup_services
+
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1)
+    ), async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+        hass.data[DOMAIN] = {"test": coordinator}
+        async_setup_services(hass)
+
+        await hass.services.async_call(
+            DOMAIN, SERVICE_PROFILE, {"cycles": 2}, blocking=True
+        )
+        assert coordinator.profiler.is_active
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(DOMAIN, SERVICE_PROFILE, {}, blocking=True)
+
+        await coordinator.async_refresh()
+        assert not coordinator.profiler.is_active
+
+    [spans_path] = tmp_path.glob(f"{DOMAIN}_profile_*_test.spans.json")
+    prefix = str(spans_path).removesuffix(".spans.json")
+    assert Path(f"{prefix}.pstats").exists()
+    assert Path(f"{prefix}.folded").exists()
+    spans = json.loads(spans_path.read_text())
+    assert spans["_async_update_data"]["count"] == 2
+    assert {"api_request", "map_response", "entity_writes"} <= set(spans)
@@ -0,0 +1,112 @@
+"""Tests for the entity profiles."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from simulator import Simulator
+from tests.common import (
+    async_api_client,
+    async_serve,
+    async_test_home_assistant,
+    create_coordinator,
+)
+
+
+def test_larger_profiles_enable_more_entities() -> None:
+    """Each profile enables the entities of the smaller ones, and the climate entity."""
+    from custom_components.ecodan_heat_pump.profiles import EntityProfile, is_enabled
+
+    entities = {
+        "minimal": "sensor.heat_pump_flow_temperature",
+        "standard": "sensor.heat_pump_return_temperature",
+        "full": "sensor.heat_pump_last_communication_timestamp",
+    }
+    for profile in EntityProfile:
+        enabled = {
+            smallest
+            for smallest, unique_id in entities.items()
+            if is_enabled(profile, "entry", unique_id)
+        }
+        assert (
+            enabled
+            == {
+                "minimal": {"minimal"},
+                "standard": {"minimal", "standard"},
+                "full": {"minimal", "standard", "full"},
+            }[profile.value]
+        )
+        assert is_enabled(profile, "entry", "entry")
+
+
+async def test_profiles_name_the_platforms_entities(tmp_path: Path) -> None:
+    """Every entity listed in the profiles is created by a platform."""
+    from custom_components.ecodan_heat_pump import binary_sensor, sensor
+    from custom_components.ecodan_heat_pump.const import DOMAIN
+    from custom_components.ecodan_heat_pump.profiles import ENTITY_PROFILES
+
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1)
+    ), async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+        entry = coordinator.config_entry
+        hass.data[DOMAIN] = {entry.entry_id: coordinator}
+        await coordinator.async_refresh()
+
+        entities = []
+        for platform in (sensor, binary_sensor):
+            await platform.async_setup_entry(hass, entry, entities.extend)
+
+    assert set(ENTITY_PROFILES) <= {entity.unique_id for entity in entities}
+
+
+async def test_applies_a_profile_to_the_registered_entities(tmp_path: Path) -> None:
+    """Changing the profile disables and enables entities, except the user's."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.helpers import entity_registry as er
+
+    from custom_components.ecodan_heat_pump.const import DOMAIN
+    from custom_components.ecodan_heat_pump.profiles import (
+        EntityProfile,
+        async_apply_entity_profile,
+    )
+
+    async with async_test_home_assistant(str(tmp_path)) as hass:
+        await er.async_load(hass)
+        registry = er.async_get(hass)
+        entry = ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="Test",
+            data={},
+            source="user",
+            entry_id="test",
+        )
+        minimal, standard, disabled_by_user = (
+            registry.async_get_or_create(
+                "sensor",
+                DOMAIN,
+                unique_id,
+                config_entry=entry,
+                disabled_by=disabled_by,
+            ).entity_id
+            for unique_id, disabled_by in (
+                ("sensor.heat_pump_flow_temperature", None),
+                ("sensor.heat_pump_return_temperature", None),
+                ("sensor.heat_pump_outdoor_temperature", er.RegistryEntryDisabler.USER),
+            )
+        )
+
+        def disabler(entity_id: str) -> er.RegistryEntryDisabler | None:
+            return registry.async_get(entity_id).disabled_by
+
+        async_apply_entity_profile(hass, entry, EntityProfile.MINIMAL)
+        assert disabler(minimal) is None
+        assert disabler(standard) is er.RegistryEntryDisabler.INTEGRATION
+        assert disabler(disabled_by_user) is er.RegistryEntryDisabler.USER
+
+        async_apply_entity_profile(hass, entry, EntityProfile.FULL)
+        assert disabler(minimal) is None
+        assert disabler(standard) is None
+        assert disabler(disabled_by_user) is er.RegistryEntryDisabler.USER
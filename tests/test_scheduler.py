@@ -0,0 +1,154 @@
+"""Tests for the request scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+
+
+class Requests:
+    """Requests that hold their scheduler slot until they are released."""
+
+    def __init__(self, scheduler) -> None:  # noqa: D107
+        self.scheduler = scheduler
+        self.started = []
+        self.release = asyncio.Event()
+        self.tasks = []
+
+    def make(self, priority, name: str) -> asyncio.Task:
+        """Start waiting for a slot for a request."""
+
+        async def _request() -> None:
+            async with self.scheduler.slot(priority):
+                self.started.append(name)
+                await self.release.wait()
+
+        task = asyncio.create_task(_request())
+        self.tasks.append(task)
+        return task
+
+    async def finish(self) -> None:
+        """Release every request and wait for them to finish."""
+        self.release.set()
+        await asyncio.gather(*self.tasks)
+
+
+async def _settle() -> None:
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def test_holds_polls_at_the_reserve() -> None:
+    """Background and bulk requests wait once the budget is down to its reserve."""
+    from custom_components.ecodan_heat_pump.scheduler import (
+        RequestPriority,
+        RequestScheduler,
+    )
+
+    scheduler = RequestScheduler(max_concurrent=10, rate=10, burst=3, reserve=1.5)
+    requests = Requests(scheduler)
+    requests.make(RequestPriority.BACKGROUND, "poll")
+    requests.make(RequestPriority.BULK, "backfill")
+    await _settle()
+    assert requests.started == ["poll", "backfill"]
+
+    requests.make(RequestPriority.BULK, "held backfill")
+    requests.make(RequestPriority.BACKGROUND, "held poll")
+    await _settle()
+    assert scheduler.as_dict()["waiting"] == {
+        "interactive": 0,
+        "background": 1,
+        "bulk": 1,
+    }
+
+    # Commands are not held back by the budget, nor by the requests waiting
+    requests.make(RequestPriority.INTERACTIVE, "command")
+    await _settle()
+    assert requests.started[-1] == "command"
+
+    # The held requests start as the budget refills, most urgent first
+    await asyncio.sleep(1)
+    assert requests.started[-2:] == ["held poll", "held backfill"]
+    await requests.finish()
+    assert scheduler.in_flight == 0
+
+
+async def test_keeps_a_slot_free_for_commands() -> None:
+    """Polls leave one slot free, which a command may take, and queue by priority."""
+    from custom_components.ecodan_heat_pump.scheduler import (
+        RequestPriority,
+        RequestScheduler,
+    )
+
+    scheduler = RequestScheduler(max_concurrent=2, rate=1000, burst=1000)
+    requests = Requests(scheduler)
+    requests.make(RequestPriority.BACKGROUND, "poll")
+    requests.make(RequestPriority.BULK, "backfill")
+    requests.make(RequestPriority.BACKGROUND, "second poll")
+    await _settle()
+    assert requests.started == ["poll"]
+
+    requests.make(RequestPriority.INTERACTIVE, "command")
+    requests.make(RequestPriority.INTERACTIVE, "second command")
+    await _settle()
+    assert requests.started == ["poll", "command"]
+    assert scheduler.in_flight == 2
+
+    await requests.finish()
+    assert requests.started == [
+        "poll",
+        "command",
+        "second command",
+        "second poll",
+        "backfill",
+    ]
+    assert scheduler.in_flight == 0
+
+
+async def test_cancelled_waits_leave_the_queue() -> None:
+    """A request cancelled while it waits neither keeps its place nor a slot."""
+    from custom_components.ecodan_heat_pump.scheduler import (
+        RequestPriority,
+        RequestScheduler,
+    )
+
+    scheduler = RequestScheduler(max_concurrent=1, rate=1000, burst=1000)
+    requests = Requests(scheduler)
+    requests.make(RequestPriority.INTERACTIVE, "command")
+    waiting = requests.make(RequestPriority.INTERACTIVE, "cancelled")
+    await _settle()
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert scheduler.as_dict()["waiting"]["interactive"] == 0
+
+    requests.tasks.remove(waiting)
+    await requests.finish()
+    assert requests.started == ["command"]
+    assert scheduler.in_flight == 0
+
+
+async def test_priority_follows_the_task_into_subtasks() -> None:
+    """A priority set on a coroutine applies to the tasks it starts, and no further."""
+    from custom_components.ecodan_heat_pump.scheduler import (
+        REQUEST_PRIORITY,
+        RequestPriority,
+        with_priority,
+    )
+
+    async def _priority() -> RequestPriority:
+        return REQUEST_PRIORITY.get()
+
+    @with_priority(RequestPriority.INTERACTIVE)
+    async def _command() -> tuple[RequestPriority, RequestPriority]:
+        return await _priority(), await asyncio.create_task(_priority())
+
+    @with_priority(RequestPriority.BULK)
+    async def _backfill() -> tuple[RequestPriority, RequestPriority, RequestPriority]:
+        return (*await _command(), await _priority())
+
+    assert await _command() == (RequestPriority.INTERACTIVE,) * 2
+    assert await _backfill() == (
+        RequestPriority.INTERACTIVE,
+        RequestPriority.INTERACTIVE,
+        RequestPriority.BULK,
+    )
+    assert REQUEST_PRIORITY.get() == RequestPriority.BACKGROUND
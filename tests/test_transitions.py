@@ -0,0 +1,111 @@
+"""Tests for the transition events."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from tests.common import heat_pump_state
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Replace the detector's clock with one the test moves on."""
+    from custom_components.ecodan_heat_pump import transitions
+
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(
+        transitions, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    return clock
+
+
+def _detector():
+    """Return a detector, and the events it fires, on a stand-in event bus."""
+    from custom_components.ecodan_heat_pump.transitions import TransitionDetector
+
+    events = []
+    hass = SimpleNamespace(
+        bus=SimpleNamespace(
+            async_fire=lambda event_type, data: events.append((event_type, data))
+        )
+    )
+    return TransitionDetector(hass), events
+
+
+def test_fires_nothing_for_the_first_snapshot(clock: SimpleNamespace) -> None:
+    """The values at start-up are no transitions."""
+    detector, events = _detector()
+    detector.observe(heat_pump_state(is_defrost_mode=True, has_error=True))
+    detector.observe(heat_pump_state(is_defrost_mode=True, has_error=True))
+
+    assert events == []
+
+
+def test_fires_an_event_on_each_change(clock: SimpleNamespace) -> None:
+    """Entering and leaving a state fire their events, with how long it lasted."""
+    detector, events = _detector()
+    state = heat_pump_state(is_defrost_mode=False)
+    detector.observe(state)
+
+    clock.now = 100.0
+    detector.observe(heat_pump_state(is_defrost_mode=True))
+    clock.now = 400.0
+    detector.observe(heat_pump_state(is_defrost_mode=True))
+    clock.now = 500.0
+    detector.observe(heat_pump_state(is_defrost_mode=False))
+
+    assert events == [
+        (
+            "ecodan_heat_pump_defrost_started",
+            {
+                "device_id": state.device_id,
+                "field": "is_defrost_mode",
+                "previous": False,
+                "new": True,
+                "duration": None,
+            },
+        ),
+        (
+            "ecodan_heat_pump_defrost_ended",
+            {
+                "device_id": state.device_id,
+                "field": "is_defrost_mode",
+                "previous": True,
+                "new": False,
+                "duration": 400.0,
+            },
+        ),
+    ]
+
+
+def test_fires_an_event_per_field(clock: SimpleNamespace) -> None:
+    """Fields changing in one snapshot fire one event each."""
+    detector, events = _detector()
+    detector.observe(
+        heat_pump_state(has_error=False, is_offline=True, is_forced_to_heat_water=True)
+    )
+    detector.observe(
+        heat_pump_state(has_error=True, is_offline=False, is_forced_to_heat_water=False)
+    )
+
+    assert sorted(event_type for event_type, _ in events) == [
+        "ecodan_heat_pump_boost_completed",
+        "ecodan_heat_pump_came_online",
+        "ecodan_heat_pump_error_raised",
+    ]
+
+
+def test_tracks_changes_without_firing(clock: SimpleNamespace) -> None:
+    """Snapshots fired for another entry still move the values and their start."""
+    detector, events = _detector()
+    detector.observe(heat_pump_state(has_error=False))
+    clock.now = 60.0
+    detector.observe(heat_pump_state(has_error=True), fire=False)
+    clock.now = 90.0
+    detector.observe(heat_pump_state(has_error=False))
+
+    [(event_type, data)] = events
+    assert event_type == "ecodan_heat_pump_error_cleared"
+    assert data["duration"] == 30.0
@@ -0,0 +1,68 @@
+"""Tests for keeping the connection to MELCloud warm."""
+
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from simulator import Simulator
+from tests.common import (
+    async_api_client,
+    async_serve,
+    async_test_home_assistant,
+    create_coordinator,
+)
+
+
+async def test_warms_up_only_a_connection_about_to_close() -> None:
+    """A warm-up request is only made shortly before the keep-alive expires."""
+    from custom_components.ecodan_heat_pump.const import (
+        KEEPALIVE_TIMEOUT,
+        WARM_UP_MARGIN,
+    )
+
+    async with async_serve(Simulator(device_count=1)), async_api_client() as client:
+        last_request_at = client._last_request_at
+        await client.async_warm_up()
+        assert client._last_request_at == last_request_at
+
+        client._last_request_at -= KEEPALIVE_TIMEOUT - WARM_UP_MARGIN
+        await client.async_warm_up()
+        assert client.keepalive_left > KEEPALIVE_TIMEOUT - 1
+
+        # Not on a metered connection
+        client._last_request_at -= KEEPALIVE_TIMEOUT
+        client.bandwidth.daily_budget = 1_000_000
+        await client.async_warm_up()
+        assert client.keepalive_left < 0
+
+
+async def test_keeps_the_connection_warm_for_a_while_after_a_command(
+    tmp_path: Path,
+) -> None:
+    """Polling alone never warms up the connection, but a recent command does."""
+    from custom_components.ecodan_heat_pump.const import WARM_UP_AFTER_COMMAND
+
+    async with async_test_home_assistant(str(tmp_path)) as hass, async_serve(
+        Simulator(device_count=1)
+    ), async_api_client() as client:
+        coordinator = create_coordinator(hass, client)
+        await coordinator.async_refresh()
+        assert coordinator._unsub_warm_up is None
+
+        # Polls every 100s outlast the keep-alive, so the connection is warmed
+        coordinator._command_sent_at = time.monotonic()
+        coordinator._async_schedule_warm_up()
+        assert coordinator._unsub_warm_up is not None
+
+        # but not if a poll will reuse it anyway
+        coordinator.update_interval = timedelta(seconds=30)
+        coordinator._async_schedule_warm_up()
+        assert coordinator._unsub_warm_up is None
+
+        # nor once no command is expected any more
+        coordinator.update_interval = timedelta(seconds=100)
+        coordinator._command_sent_at -= WARM_UP_AFTER_COMMAND + 1
+        coordinator._async_schedule_warm_up()
+        assert coordinator._unsub_warm_up is None